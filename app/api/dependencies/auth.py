@@ -1,12 +1,17 @@
+import hmac
+
 from fastapi import Request, HTTPException
 from jose import JWTError
 
 from database.models.user import User
 
 from api.auth_config import JWT_ACCESS_COOKIE_NAME, JWT_REFRESH_COOKIE_NAME
+from exceptions.auth import MetricsAuthError
 from exceptions.users import UserNotFoundError
 from exceptions.base import PermissionError, ValidationError
+from core.config import settings
 from core.jwt import decode_token
+from core.request_context import set_request_user
 from database.managers.user_manager import UserManager
 
 from core.logger import app_logger  
@@ -15,7 +20,9 @@ user_manager = UserManager()
 
 async def get_current_user(request: Request) -> User:
     """
-    Получает пользователя из БД по access token из cookies
+    Получает пользователя по access token из cookies.
+    Пользователь берётся из кэша (user_cache), а при auth_trust_token_claims
+    строится из claims токена без обращения к БД.
     """
     token = request.cookies.get(JWT_ACCESS_COOKIE_NAME)
     if not token:
@@ -25,20 +32,36 @@ async def get_current_user(request: Request) -> User:
         payload = decode_token(token)
         sub = payload.get("sub")
         if sub is None:
-            app_logger.error(f"Неверный токен sub: {sub} token: {token}")
+            app_logger.error("Неверный токен sub: %s token: %s", sub, token)
             raise ValidationError("Неверный токен")
         user_id = int(sub)
     except (JWTError, ValueError):
-        app_logger.error(f"Неверный токен: {token}")
+        app_logger.error("Неверный токен: %s", token)
         raise ValidationError("Неверный токен")
+    set_request_user(user_id)
+    if settings.auth_trust_token_claims and "login" in payload:
+        return User(id=user_id, login=payload["login"], role=payload.get("role", 1))
     try:
-        user = await user_manager.get_obj_by_id(id=user_id)
+        user = await user_manager.get_principal(user_id)
     except UserNotFoundError as e:
-        app_logger.error(f"Пользователь {user_id} не найден")
+        app_logger.error("Пользователь %s не найден", user_id)
         raise UserNotFoundError()
     return user
 
 
+async def get_optional_user(request: Request) -> User | None:
+    """
+    Возвращает текущего пользователя для публичных эндпоинтов
+    или None, если access токена нет или он недействителен
+    """
+    if not request.cookies.get(JWT_ACCESS_COOKIE_NAME):
+        return None
+    try:
+        return await get_current_user(request)
+    except HTTPException:
+        return None
+
+
 async def validate_refresh_token(request: Request) -> int:
     """
     Проверяет refresh токен и возвращает ID пользователя
@@ -56,8 +79,18 @@ async def validate_refresh_token(request: Request) -> int:
         raise ValidationError(f"Неверный токен refresh_token: {refresh_token}")
 
     try:
-        user = await user_manager.get_obj_by_id(user_id)
+        await user_manager.get_principal(user_id)
     except UserNotFoundError:
         raise UserNotFoundError()
 
     return user_id
+
+
+async def require_metrics_token(request: Request) -> None:
+    """
+    Пропускает запрос метрик только с заголовком Authorization: Bearer <settings.metrics_token>
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.metrics_token.encode()):
+        app_logger.warning("Запрос метрик без верного токена с адреса %s", request.client.host if request.client else None)
+        raise MetricsAuthError()
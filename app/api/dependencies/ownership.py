@@ -6,17 +6,20 @@ from database.models.history_like import HistoryLike
 from database.managers.comment_manager import CommentManager
 from database.managers.history_manager import HistoryManager
 from database.managers.like_manager import LikeManager
+from database.managers.message_manager import MessageManager
 
 from core.logger import app_logger
 
 from exceptions.comment import CommentNotFoundError, OwnershipCommentError
 from exceptions.histories import HistoryNotFoundError, OwnershipHistoryError
 from exceptions.like import LikeNotFoundError, OwnershipLikeError
+from exceptions.message import RoomAccessError
 from exceptions.users import UserNotFoundError
 
 comment_manager = CommentManager()
 history_manager = HistoryManager()
 like_manager = LikeManager()
+message_manager = MessageManager()
 
 
 async def get_comment_or_error(id: int, user: User) -> Comment:
@@ -25,14 +28,14 @@ async def get_comment_or_error(id: int, user: User) -> Comment:
     """
     comment = await comment_manager.get_obj_by_id(id=id)
     if not comment:
-        app_logger.error(f"Комментарий {id} не найден")
+        app_logger.error("Комментарий %s не найден", id)
         raise CommentNotFoundError()
     user_id = getattr(comment, 'user_id', None)
     if user_id is None:
-        app_logger.error(f"Пользователь {user_id} не найден")
+        app_logger.error("Пользователь %s не найден", user_id)
         raise UserNotFoundError()
     if user_id != user.id:
-        app_logger.warning(f"Пользователь {user.id} попытался получить доступ к комментарию {id}")
+        app_logger.warning("Пользователь %s попытался получить доступ к комментарию %s", user.id, id)
         raise OwnershipCommentError()
     return comment
 
@@ -43,14 +46,14 @@ async def get_history_or_error(id: int, user: User) -> History:
     """
     history = await history_manager.get_obj_by_id(id=id)
     if not history:
-        app_logger.error(f"История {id} не найдена")
+        app_logger.error("История %s не найдена", id)
         raise HistoryNotFoundError()
     author_id = getattr(history, 'author_id', None) 
     if author_id is None:
-        app_logger.error(f"Пользователь {author_id} не найден")
+        app_logger.error("Пользователь %s не найден", author_id)
         raise UserNotFoundError()
     if author_id != user.id:
-        app_logger.warning(f"Пользователь {user.id} попытался получить доступ к истории {id}")
+        app_logger.warning("Пользователь %s попытался получить доступ к истории %s", user.id, id)
         raise OwnershipHistoryError()
     return history
 
@@ -61,13 +64,22 @@ async def get_like_or_error(id: int, user: User) -> HistoryLike:
     """
     like = await like_manager.get_obj_by_id(id=id)
     if not like:
-        app_logger.error(f"Лайк {id} не найден")
+        app_logger.error("Лайк %s не найден", id)
         raise LikeNotFoundError()
     user_id = getattr(like, 'user_id', None)
     if user_id is None:
-        app_logger.error(f"Пользователь {user_id} не найден")
+        app_logger.error("Пользователь %s не найден", user_id)
         raise UserNotFoundError()
     if user_id != user.id:
-        app_logger.warning(f"Пользователь {user.id} попытался получить доступ к лайку {id}")
+        app_logger.warning("Пользователь %s попытался получить доступ к лайку %s", user.id, id)
         raise OwnershipLikeError()
     return like
+
+
+async def check_room_member_or_error(room_id: str, user: User) -> None:
+    """
+    Проверяет, что пользователь участвует в переписке комнаты
+    """
+    if not await message_manager.is_room_member(room_id, getattr(user, 'id', 0)):
+        app_logger.warning("Пользователь %s попытался получить доступ к комнате %s", user.id, room_id)
+        raise RoomAccessError()
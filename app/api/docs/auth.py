@@ -61,6 +61,22 @@ auth_register_responses = {
             }
         }
     },
+    status.HTTP_400_BAD_REQUEST: {
+        "description": "avatar_url - не URL и не base64-изображение PNG/JPEG/GIF/WebP (InvalidAvatarError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Поддерживаются аватары PNG, JPEG, GIF и WebP"}
+            }
+        }
+    },
+    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {
+        "description": "Аватар больше avatar_max_bytes (AvatarTooLargeError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Аватар слишком большой"}
+            }
+        }
+    },
     status.HTTP_409_CONFLICT: {
         "description": "Пользователь с таким логином уже существует (UserAlreadyExistsError)",
         "content": {
@@ -0,0 +1,37 @@
+avatar_get_responses_raw = {
+    "200": {
+        "description": "Файл аватара. Ключ - sha256 содержимого, поэтому ответ кэшируется навсегда (Cache-Control: immutable). "
+                       "С параметром size (32, 64, 256) отдаётся квадратная WebP-копия.",
+        "content": {
+            "image/png": {},
+            "image/jpeg": {},
+            "image/gif": {},
+            "image/webp": {}
+        }
+    },
+    "304": {
+        "description": "Аватар не изменился (If-None-Match совпадает с ETag)."
+    },
+    "400": {
+        "description": "Недопустимый размер (ValidationError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Доступные размеры аватара: [32, 64, 256]"}
+            }
+        }
+    },
+    "404": {
+        "description": "Аватар не найден (AvatarNotFoundError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Аватар не найден"}
+            }
+        }
+    },
+}
+avatar_get_responses = {
+    200: avatar_get_responses_raw["200"],
+    304: avatar_get_responses_raw["304"],
+    400: avatar_get_responses_raw["400"],
+    404: avatar_get_responses_raw["404"],
+}
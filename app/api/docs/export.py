@@ -0,0 +1,21 @@
+from fastapi import status
+
+export_responses = {
+    status.HTTP_200_OK: {
+        "description": "Поток NDJSON: одна JSON-запись на строку.",
+        "content": {
+            "application/x-ndjson": {
+                "example": '{"id":1,"title":"Заголовок","description":null,"likes":0,'
+                           '"created_at":"2024-05-01T12:00:00","updated_at":null,"author_id":2}\n'
+            }
+        }
+    },
+    status.HTTP_403_FORBIDDEN: {
+        "description": "Отсутствует access токен (PermissionError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Отсутствует access токен"}
+            }
+        }
+    },
+}
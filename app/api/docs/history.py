@@ -40,20 +40,36 @@ history_create_responses = {
 
 history_get_all_responses_raw = {
     "200": {
-        "description": "Список всех историй.",
-        "content": {
-            "application/json": {
-                "example": [
-                    {
-                        "id": 1,
-                        "title": "Заголовок",
-                        "description": "Описание статьи",
-                        "likes": 5,
-                        "author": {"id": 2, "login": "author"},
-                        "created_at": "2024-05-01T12:00:00",
-                        "updated_at": None
-                    }
-                ]
+        "description": "Страница ленты историй от новых к старым. "
+                       "Для следующей страницы передайте next_cursor в параметре cursor. "
+                       "С with_liked=true для авторизованного пользователя заполняется liked_by_me.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "items": [
+                        {
+                            "id": 1,
+                            "title": "Заголовок",
+                            "description": "Описание статьи",
+                            "likes": 5,
+                            "author": {"id": 2, "login": "author"},
+                            "created_at": "2024-05-01T12:00:00",
+                            "updated_at": None,
+                            "liked_by_me": True,
+                            "comments_count": 3,
+                            "likes_count": 5
+                        }
+                    ],
+                    "next_cursor": "WyIyMDI0LTA1LTAxVDEyOjAwOjAwIiwxXQ"
+                }
+            }
+        }
+    },
+    "400": {
+        "description": "Неверный курсор пагинации (ValidationError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Неверный курсор пагинации"}
             }
         }
     },
@@ -68,12 +84,13 @@ history_get_all_responses_raw = {
 }
 history_get_all_responses = {
     200: history_get_all_responses_raw["200"],
+    400: history_get_all_responses_raw["400"],
     500: history_get_all_responses_raw["500"],
 }
 
 history_get_responses_raw = {
     "200": {
-        "description": "История найдена.",
+        "description": "История найдена. С with_comments=true в comments встраивается первая страница комментариев.",
         "content": {
             "application/json": {
                 "example": {
@@ -83,11 +100,29 @@ history_get_responses_raw = {
                     "likes": 5,
                     "author": {"id": 2, "login": "author"},
                     "created_at": "2024-05-01T12:00:00",
-                    "updated_at": None
+                    "updated_at": None,
+                    "liked_by_me": None,
+                    "comments": {
+                        "items": [
+                            {
+                                "id": 1,
+                                "user_id": 3,
+                                "history_id": 1,
+                                "content": "Комментарий",
+                                "created_at": "2024-05-01T12:30:00",
+                                "updated_at": None,
+                                "author": {"id": 3, "login": "reader"}
+                            }
+                        ],
+                        "next_cursor": None
+                    }
                 }
             }
         }
     },
+    "304": {
+        "description": "История не изменилась с версии из If-None-Match.",
+    },
     "404": {
         "description": "История не найдена (HistoryNotFoundError)",
         "content": {
@@ -107,10 +142,45 @@ history_get_responses_raw = {
 }
 history_get_responses = {
     200: history_get_responses_raw["200"],
+    304: history_get_responses_raw["304"],
     404: history_get_responses_raw["404"],
     500: history_get_responses_raw["500"],
 }
 
+history_get_comments_responses_raw = {
+    "200": {
+        "description": "Страница комментариев истории от старых к новым с авторами. "
+                       "Для следующей страницы передайте next_cursor в параметре cursor.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "items": [
+                        {
+                            "id": 1,
+                            "user_id": 3,
+                            "history_id": 1,
+                            "content": "Комментарий",
+                            "created_at": "2024-05-01T12:30:00",
+                            "updated_at": None,
+                            "author": {"id": 3, "login": "reader"}
+                        }
+                    ],
+                    "next_cursor": "WyIyMDI0LTA1LTAxVDEyOjMwOjAwIiwxXQ"
+                }
+            }
+        }
+    },
+    "400": history_get_all_responses_raw["400"],
+    "404": history_get_responses_raw["404"],
+    "500": history_get_responses_raw["500"],
+}
+history_get_comments_responses = {
+    200: history_get_comments_responses_raw["200"],
+    400: history_get_comments_responses_raw["400"],
+    404: history_get_comments_responses_raw["404"],
+    500: history_get_comments_responses_raw["500"],
+}
+
 history_update_responses_raw = {
     "200": {
         "description": "История успешно обновлена.",
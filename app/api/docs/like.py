@@ -12,11 +12,24 @@ like_create_responses_raw = {
             }
         }
     },
-    "409": {
-        "description": "Лайк уже существует (LikeAlreadyExistsError)",
+    "200": {
+        "description": "Лайк уже был поставлен ранее, возвращается существующий. Счётчик лайков истории не меняется.",
+        "content": {
+            "application/json": {
+                "example": {
+                    "id": 1,
+                    "user_id": 2,
+                    "history_id": 3,
+                    "created_at": "2024-05-01T12:00:00"
+                }
+            }
+        }
+    },
+    "404": {
+        "description": "История не найдена (HistoryNotFoundError)",
         "content": {
             "application/json": {
-                "example": {"detail": "Лайк уже существует."}
+                "example": {"detail": "История не найдена"}
             }
         }
     },
@@ -39,7 +52,8 @@ like_create_responses_raw = {
 }
 like_create_responses = {
     201: like_create_responses_raw["201"],
-    409: like_create_responses_raw["409"],
+    200: like_create_responses_raw["200"],
+    404: like_create_responses_raw["404"],
     422: like_create_responses_raw["422"],
     500: like_create_responses_raw["500"],
 }
@@ -111,4 +125,111 @@ like_delete_responses = {
     204: like_delete_responses_raw["204"],
     404: like_delete_responses_raw["404"],
     500: like_delete_responses_raw["500"],
-} 
+}
+
+like_put_history_responses_raw = {
+    "204": {
+        "description": "Лайк поставлен (повторный лайк не ошибка).",
+        "content": {
+            "application/json": {
+                "example": None
+            }
+        }
+    },
+    "202": {
+        "description": "Лайк принят в буфер отложенной записи (like_buffer_enabled) и будет записан в течение like_buffer_flush_ms.",
+        "content": {
+            "application/json": {
+                "example": None
+            }
+        }
+    },
+    "404": {
+        "description": "История не найдена (HistoryNotFoundError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "История не найдена"}
+            }
+        }
+    },
+    "500": {
+        "description": "Внутренняя ошибка сервера (DatabaseError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Внутренняя ошибка сервера."}
+            }
+        }
+    },
+    "503": {
+        "description": "Буфер лайков остановлен или переполнен, повторить после Retry-After (ServiceUnavailableError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Буфер лайков остановлен"}
+            }
+        }
+    },
+}
+like_put_history_responses = {
+    204: like_put_history_responses_raw["204"],
+    202: like_put_history_responses_raw["202"],
+    404: like_put_history_responses_raw["404"],
+    500: like_put_history_responses_raw["500"],
+    503: like_put_history_responses_raw["503"],
+}
+
+like_delete_history_responses_raw = {
+    "204": {
+        "description": "Лайк снят (если лайка не было - тоже 204).",
+        "content": {
+            "application/json": {
+                "example": None
+            }
+        }
+    },
+    "202": {
+        "description": "Снятие лайка принято в буфер отложенной записи (like_buffer_enabled).",
+        "content": {
+            "application/json": {
+                "example": None
+            }
+        }
+    },
+    "404": like_put_history_responses_raw["404"],
+    "500": like_put_history_responses_raw["500"],
+    "503": like_put_history_responses_raw["503"],
+}
+like_delete_history_responses = {
+    204: like_delete_history_responses_raw["204"],
+    202: like_delete_history_responses_raw["202"],
+    404: like_delete_history_responses_raw["404"],
+    500: like_delete_history_responses_raw["500"],
+    503: like_delete_history_responses_raw["503"],
+}
+
+like_status_responses_raw = {
+    "200": {
+        "description": "Статус лайка текущего пользователя для каждой запрошенной истории (одним запросом к БД).",
+        "content": {
+            "application/json": {
+                "example": [
+                    {"history_id": 1, "liked": True},
+                    {"history_id": 2, "liked": False}
+                ]
+            }
+        }
+    },
+    "400": {
+        "description": "Запрошено больше page_size_max историй (ValidationError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Можно запросить не более 100 историй"}
+            }
+        }
+    },
+    "500": like_put_history_responses_raw["500"],
+}
+like_status_responses = {
+    200: like_status_responses_raw["200"],
+    400: like_status_responses_raw["400"],
+    500: like_status_responses_raw["500"],
+}
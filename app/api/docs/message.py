@@ -44,7 +44,8 @@ message_send_responses = {
 
 get_chats_responses_raw = {
     "200": {
-        "description": "Список чатов пользователя.",
+        "description": "Список чатов пользователя, отсортированный по времени последнего сообщения. "
+                       "Если передан limit и есть следующая страница, её курсор возвращается в заголовке X-Next-Cursor.",
         "content": {
             "application/json": {
                 "example": [
@@ -53,12 +54,21 @@ get_chats_responses_raw = {
                         "companion_avatar_url": "https://example.com/avatar.png",
                         "last_message": "Привет!",
                         "last_message_time": "2024-05-01T12:00:00",
+                        "room_id": "5d41402abc4b2a76b9719d911017c592",
                         "from_me": True
                     }
                 ]
             }
         }
     },
+    "400": {
+        "description": "Неверный курсор пагинации (ValidationError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Неверный курсор пагинации"}
+            }
+        }
+    },
     "404": {
         "description": "Пользователь не найден (UserNotFoundError)",
         "content": {
@@ -78,6 +88,63 @@ get_chats_responses_raw = {
 }
 get_chats_responses = {
     200: get_chats_responses_raw["200"],
+    400: get_chats_responses_raw["400"],
     404: get_chats_responses_raw["404"],
     500: get_chats_responses_raw["500"],
 }
+
+get_room_messages_responses_raw = {
+    "200": {
+        "description": "Страница сообщений комнаты в хронологическом порядке. "
+                       "Без курсоров возвращаются последние сообщения; before_cursor загружает более старые, "
+                       "after_cursor - более новые (для дозагрузки после переподключения).",
+        "content": {
+            "application/json": {
+                "example": {
+                    "items": [
+                        {
+                            "id": 1,
+                            "sender_id": 2,
+                            "receiver_id": 3,
+                            "text": "Привет!",
+                            "timestamp": "2024-05-01T12:00:00",
+                            "from_me": True
+                        }
+                    ],
+                    "before_cursor": None,
+                    "after_cursor": "WyIyMDI0LTA1LTAxVDEyOjAwOjAwIiwxXQ"
+                }
+            }
+        }
+    },
+    "400": {
+        "description": "Неверный курсор или переданы одновременно before и after (ValidationError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Неверный курсор пагинации"}
+            }
+        }
+    },
+    "403": {
+        "description": "Пользователь не участвует в переписке комнаты (RoomAccessError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "У вас нет доступа к этой комнате"}
+            }
+        }
+    },
+    "500": {
+        "description": "Внутренняя ошибка сервера (DatabaseError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Внутренняя ошибка сервера."}
+            }
+        }
+    },
+}
+get_room_messages_responses = {
+    200: get_room_messages_responses_raw["200"],
+    400: get_room_messages_responses_raw["400"],
+    403: get_room_messages_responses_raw["403"],
+    500: get_room_messages_responses_raw["500"],
+}
@@ -15,6 +15,9 @@ user_get_responses = {
             }
         }
     },
+    status.HTTP_304_NOT_MODIFIED: {
+        "description": "Профиль не изменился с версии из If-None-Match.",
+    },
     status.HTTP_404_NOT_FOUND: {
         "description": "Пользователь не найден (UserNotFoundError)",
         "content": {
@@ -92,6 +95,9 @@ user_histories_responses_raw = {
             }
         }
     },
+    "304": {
+        "description": "Данные не изменились с версии из If-None-Match.",
+    },
     "404": {
         "description": "Пользователь не найден (UserNotFoundError)",
         "content": {
@@ -112,6 +118,7 @@ user_histories_responses_raw = {
 
 user_histories_responses = {
     200: user_histories_responses_raw["200"],
+    304: user_histories_responses_raw["304"],
     404: user_histories_responses_raw["404"],
     500: user_histories_responses_raw["500"],
 }
@@ -148,3 +155,38 @@ user_delete_responses = {
     404: user_delete_responses_raw["404"],
     500: user_delete_responses_raw["500"],
 } 
+
+user_avatar_update_responses_raw = {
+    "200": {
+        "description": "Аватар сохранён в хранилище, в профиле хранится только короткий URL.",
+        "content": {
+            "application/json": {
+                "example": {"avatar_url": "/avatars/9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08.png"}
+            }
+        }
+    },
+    "400": {
+        "description": "Строка не base64 или не изображение PNG/JPEG/GIF/WebP (InvalidAvatarError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Поддерживаются аватары PNG, JPEG, GIF и WebP"}
+            }
+        }
+    },
+    "413": {
+        "description": "Аватар больше avatar_max_bytes (AvatarTooLargeError)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Аватар слишком большой"}
+            }
+        }
+    },
+    "500": user_delete_responses_raw["500"],
+}
+
+user_avatar_update_responses = {
+    200: user_avatar_update_responses_raw["200"],
+    400: user_avatar_update_responses_raw["400"],
+    413: user_avatar_update_responses_raw["413"],
+    500: user_avatar_update_responses_raw["500"],
+}
@@ -6,6 +6,9 @@ from api.routers.auth import auth_router
 from api.routers.comment import comment_router
 from api.routers.like import like_router
 from api.routers.message import message_router
+from api.routers.chat import chat_router
+from api.routers.export import export_router
+from api.routers.avatar import avatar_router
 
 main_router = APIRouter()
 
@@ -15,3 +18,6 @@ main_router.include_router(history_router)
 main_router.include_router(comment_router)
 main_router.include_router(like_router)
 main_router.include_router(message_router)
+main_router.include_router(chat_router)
+main_router.include_router(export_router)
+main_router.include_router(avatar_router)
@@ -4,18 +4,17 @@ from fastapi import (
     status,
     Depends,
 )
-from fastapi.responses import JSONResponse
 
 from api.auth_config import JWT_ACCESS_COOKIE_NAME
 from api.dependencies.auth import validate_refresh_token
 
-from core.jwt import create_access_token
 from core.cookie import set_auth_cookies, clear_auth_cookies
 from core.logger import app_logger
+from core.responses import ORJSONResponse
 
 from schemas.user import UserCreate, UserAuth
 
-from services.auth_service import register_user, login_user
+from services.auth_service import register_user, login_user, issue_access_token
 
 from exceptions.users import UserAlreadyExistsError, InvalidCredentialsError
 from exceptions.base import DatabaseError
@@ -37,9 +36,9 @@ async def create_user(new_user: UserCreate, response: Response) -> Response:
     """Создаёт нового пользователя и выдает токены"""
     try:
         access_token, refresh_token = await register_user(new_user)
-        response = JSONResponse(content={"message": "Пользователь успешно создан"})
+        response = ORJSONResponse(content={"message": "Пользователь успешно создан"})
         set_auth_cookies(response, access_token, refresh_token)
-        app_logger.info(f"Пользователь {new_user.login} успешно создан")
+        app_logger.info("Пользователь %s успешно создан", new_user.login)
     except UserAlreadyExistsError as e:
         raise UserAlreadyExistsError(e.detail)
     except DatabaseError as e:
@@ -53,9 +52,9 @@ async def create_user(new_user: UserCreate, response: Response) -> Response:
 async def login(user: UserAuth, response: Response) -> Response:
     try:
         access_token, refresh_token = await login_user(user)
-        response = JSONResponse(content={"message": "Вы успешно вошли в аккаунт"})
+        response = ORJSONResponse(content={"message": "Вы успешно вошли в аккаунт"})
         set_auth_cookies(response, access_token, refresh_token)
-        app_logger.info(f"Пользователь {user.login} успешно вошел в аккаунт")
+        app_logger.info("Пользователь %s успешно вошел в аккаунт", user.login)
     except InvalidCredentialsError as e:
         raise InvalidCredentialsError(e.detail)
     except DatabaseError as e:
@@ -69,10 +68,10 @@ async def login(user: UserAuth, response: Response) -> Response:
 async def refresh_access_token(response: Response,
                                user_id: int = Depends(validate_refresh_token)) -> Response:
     try:
-        access_token = create_access_token({"sub": str(user_id)})
-        response = JSONResponse(content={"message": "Access токен обновлен"})
+        access_token = await issue_access_token(user_id)
+        response = ORJSONResponse(content={"message": "Access токен обновлен"})
         response.set_cookie(JWT_ACCESS_COOKIE_NAME, access_token, httponly=True)
-        app_logger.info(f"Access токен обновлен для пользователя {user_id}")
+        app_logger.info("Access токен обновлен для пользователя %s", user_id)
     except DatabaseError as e:
         raise DatabaseError(e.detail)
     return response
@@ -83,5 +82,5 @@ async def refresh_access_token(response: Response,
                   responses=logout_responses)
 async def logout(response: Response) -> Response:
     clear_auth_cookies(response)
-    app_logger.info(f"Пользователь вышел из аккаунта")
+    app_logger.info("Пользователь вышел из аккаунта")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,50 @@
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    Query,
+    Request,
+    Response,
+    status
+)
+from fastapi.responses import FileResponse
+
+from services.avatar_storage import get_avatar_path, media_type_for, THUMBNAIL_EXT
+
+from api.docs.avatar import avatar_get_responses
+
+from core.config import settings
+from core.etag import etag_matches
+
+from exceptions.avatar import AvatarNotFoundError
+from exceptions.base import ValidationError
+
+avatar_router = APIRouter(prefix=settings.avatar_url_prefix, tags=['Аватары'])
+
+@avatar_router.get('/{key}',
+                   summary='Получить аватар по ключу',
+                   status_code=status.HTTP_200_OK,
+                   response_class=FileResponse,
+                   responses=avatar_get_responses)
+async def get_avatar(key: str,
+                     request: Request,
+                     size: Optional[int] = Query(None)) -> Response:
+    if size is not None and size not in settings.avatar_thumbnail_sizes:
+        raise ValidationError(f"Доступные размеры аватара: {settings.avatar_thumbnail_sizes}")
+    path = await get_avatar_path(key, size)
+    if path is None:
+        raise AvatarNotFoundError()
+    # Ключ - хэш содержимого: файл по ключу никогда не меняется
+    is_variant = path.name.endswith(f".{THUMBNAIL_EXT}") and path.name != key
+    etag = f'"{key.split(".", 1)[0]}-{size}"' if is_variant else f'"{key.split(".", 1)[0]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.avatar_cache_max_age_seconds}, immutable",
+    }
+    if size is not None and not is_variant:
+        # Копия ещё не построена - отдаём оригинал, но не закрепляем его в кэше под этим URL
+        headers["Cache-Control"] = "public, max-age=60"
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    media_type = f"image/{THUMBNAIL_EXT}" if is_variant else media_type_for(key)
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -0,0 +1,113 @@
+import json
+
+from fastapi import (
+    APIRouter,
+    WebSocket,
+    WebSocketDisconnect,
+    status
+)
+from jose import JWTError
+from pydantic import ValidationError as PydanticValidationError
+
+from database.managers.connection_manager import connection_manager
+from database.managers.message_manager import MessageManager, direct_room_id
+from database.managers.user_manager import UserManager
+from schemas.message import MessageIn, RoomMessageOut
+
+from api.auth_config import JWT_ACCESS_COOKIE_NAME
+
+from core.jwt import decode_token
+from core.logger import app_logger
+
+from exceptions.base import DatabaseError, ValidationError
+
+chat_router = APIRouter(tags=["Чат"])
+
+message_manager = MessageManager()
+user_manager = UserManager()
+
+
+async def _authenticate(websocket: WebSocket) -> int | None:
+    """
+    Возвращает id пользователя по JWT из query-параметра token или из access cookie
+    """
+    token = websocket.query_params.get("token") or websocket.cookies.get(JWT_ACCESS_COOKIE_NAME)
+    if not token:
+        return None
+    try:
+        user_id = int(decode_token(token)["sub"])
+        await user_manager.get_principal(user_id)
+    except (JWTError, ValidationError, DatabaseError, ValueError, KeyError):
+        return None
+    return user_id
+
+
+async def _get_companion_id(websocket: WebSocket, room_id: str, user_id: int) -> int | None:
+    """
+    Возвращает id собеседника в комнате или None, если доступа к комнате нет.
+    Участнику переписки собеседник известен по сообщениям комнаты. Комнату без сообщений
+    можно занять, передав query-параметр receiver_id, только если room_id - direct_room_id этой пары
+    """
+    if await message_manager.is_room_member(room_id, user_id):
+        return await message_manager.get_companion_id(room_id, user_id)
+    try:
+        receiver_id = int(websocket.query_params["receiver_id"])
+    except (KeyError, ValueError):
+        return None
+    if receiver_id == user_id or room_id != direct_room_id(user_id, receiver_id):
+        return None
+    try:
+        await user_manager.get_principal(receiver_id)
+    except (ValidationError, DatabaseError):
+        return None
+    return receiver_id
+
+
+async def _send_error(websocket: WebSocket, detail: str) -> None:
+    await websocket.send_text(json.dumps({"error": detail}, ensure_ascii=False))
+
+
+@chat_router.websocket("/ws/{room_id}")
+async def chat_websocket(websocket: WebSocket, room_id: str):
+    user_id = await _authenticate(websocket)
+    if user_id is None:
+        app_logger.warning("Отклонено подключение к комнате %s: неверный токен", room_id)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    companion_id = await _get_companion_id(websocket, room_id, user_id)
+    if companion_id is None:
+        app_logger.warning("Пользователь %s попытался подключиться к чужой комнате %s", user_id, room_id)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await connection_manager.connect(room_id, str(user_id), websocket)
+    app_logger.info("Пользователь %s подключился к комнате %s", user_id, room_id)
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                incoming = MessageIn.model_validate_json(raw)
+            except PydanticValidationError:
+                await _send_error(websocket, "Неверный формат сообщения")
+                continue
+            text = incoming.text.strip()
+            if not text:
+                continue
+            if incoming.receiver_id is not None and incoming.receiver_id != companion_id:
+                await _send_error(websocket, "Получатель не участвует в переписке комнаты")
+                continue
+            try:
+                message = await message_manager.save_message(
+                    sender_id=user_id,
+                    receiver_id=companion_id,
+                    text=text,
+                    room_id=room_id,
+                )
+            except DatabaseError as e:
+                await _send_error(websocket, e.detail)
+                continue
+            await connection_manager.send_to_room(room_id, RoomMessageOut.model_validate(message).model_dump_json())
+    except WebSocketDisconnect:
+        app_logger.info("Пользователь %s отключился от комнаты %s", user_id, room_id)
+    finally:
+        await connection_manager.disconnect(str(user_id), room_id, websocket)
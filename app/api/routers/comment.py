@@ -40,12 +40,12 @@ async def create_comment(comment: CommentCreate,
         data = comment.model_dump()
         new_comment = Comment(**data, user_id=user.id)
         await comment_manager.create_obj(obj=new_comment)
-        app_logger.info(f"Комментарий {new_comment.id} создан пользователем {user.login}")
+        app_logger.info("Комментарий %s создан пользователем %s", new_comment.id, user.login)
         return CommentOut.model_validate(new_comment)
     except (CommentNotFoundError, OwnershipCommentError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при создании комментария: {e}")
+        app_logger.error("Ошибка при создании комментария: %s", e)
         raise DatabaseError("Ошибка при создании комментария")
 
 @comment_router.get("/{id}",
@@ -55,12 +55,12 @@ async def create_comment(comment: CommentCreate,
 async def get_comment(id: int, user: User = Depends(get_current_user)) -> CommentOut:
     try:
         comment = await get_comment_or_error(id, user)
-        app_logger.info(f"Комментарий {comment.id} получен пользователем {user.login}")
+        app_logger.info("Комментарий %s получен пользователем %s", comment.id, user.login)
         return CommentOut.model_validate(comment)
     except (CommentNotFoundError, OwnershipCommentError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при получении комментария: {e}")
+        app_logger.error("Ошибка при получении комментария: %s", e)
         raise DatabaseError("Ошибка при получении комментария")
 
 @comment_router.put("/{id}",
@@ -73,12 +73,12 @@ async def update_comment(id: int,
     try:
         await get_comment_or_error(id, user)
         updated_comment = await comment_manager.update_obj(id, comment_update)
-        app_logger.info(f"Комментарий {updated_comment.id} обновлен пользователем {user.login}")
+        app_logger.info("Комментарий %s обновлен пользователем %s", updated_comment.id, user.login)
         return CommentOut.model_validate(updated_comment)
     except (CommentNotFoundError, OwnershipCommentError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при обновлении комментария: {e}")
+        app_logger.error("Ошибка при обновлении комментария: %s", e)
         raise DatabaseError("Ошибка при обновлении комментария")
 
 @comment_router.delete("/{id}",
@@ -89,10 +89,10 @@ async def delete_comment(id: int, user: User = Depends(get_current_user)) -> Res
     try:
         await get_comment_or_error(id, user)
         await comment_manager.delete_obj(id)
-        app_logger.info(f"Комментарий {id} удален пользователем {user.login}")
+        app_logger.info("Комментарий %s удален пользователем %s", id, user.login)
         return Response(status_code=204)
     except (CommentNotFoundError, OwnershipCommentError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при удалении комментария: {e}")
+        app_logger.error("Ошибка при удалении комментария: %s", e)
         raise DatabaseError("Ошибка при удалении комментария")
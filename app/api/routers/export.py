@@ -0,0 +1,93 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Optional, Type
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Query
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from database.managers.comment_manager import CommentManager
+from database.managers.history_manager import HistoryManager
+from database.managers.message_manager import MessageManager
+from database.models.user import User
+from schemas.comment import CommentOut
+from schemas.history import HistoryExportOut
+from schemas.message import RoomMessageOut
+
+from api.dependencies.auth import get_current_user
+from api.docs.export import export_responses
+
+from core.config import settings
+from core.logger import app_logger
+
+export_router = APIRouter(prefix="/export", tags=["Экспорт"])
+
+history_manager = HistoryManager()
+comment_manager = CommentManager()
+message_manager = MessageManager()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def _ndjson(rows: AsyncIterator, schema: Type[BaseModel], name: str) -> AsyncIterator[bytes]:
+    """Сериализует строки по одной в NDJSON, отдавая их пачками по export_batch_size"""
+    buffer: list[bytes] = []
+    count = 0
+    try:
+        async for row in rows:
+            buffer.append(schema.model_validate(row).model_dump_json().encode("utf-8"))
+            if len(buffer) >= settings.export_batch_size:
+                count += len(buffer)
+                yield b"\n".join(buffer) + b"\n"
+                buffer = []
+        if buffer:
+            count += len(buffer)
+            yield b"\n".join(buffer) + b"\n"
+    except Exception as e:
+        app_logger.exception("Ошибка при экспорте %s после %s строк: %r", name, count, e)
+        raise
+    app_logger.info("Экспорт %s завершён, строк: %s", name, count)
+
+
+@export_router.get("/histories",
+                   summary="Экспорт историй в NDJSON",
+                   response_class=StreamingResponse,
+                   responses=export_responses)
+async def export_histories(since: Optional[datetime] = Query(None),
+                           until: Optional[datetime] = Query(None),
+                           author_id: Optional[int] = Query(None),
+                           user: User = Depends(get_current_user)) -> StreamingResponse:
+    app_logger.info("Пользователь %s запустил экспорт историй", user.login)
+    rows = history_manager.stream_histories(since=since, until=until, author_id=author_id)
+    return StreamingResponse(_ndjson(rows, HistoryExportOut, "историй"), media_type=NDJSON_MEDIA_TYPE)
+
+
+@export_router.get("/comments",
+                   summary="Экспорт комментариев в NDJSON",
+                   response_class=StreamingResponse,
+                   responses=export_responses)
+async def export_comments(since: Optional[datetime] = Query(None),
+                          until: Optional[datetime] = Query(None),
+                          author_id: Optional[int] = Query(None),
+                          history_id: Optional[int] = Query(None),
+                          user: User = Depends(get_current_user)) -> StreamingResponse:
+    app_logger.info("Пользователь %s запустил экспорт комментариев", user.login)
+    rows = comment_manager.stream_comments(since=since, until=until, user_id=author_id, history_id=history_id)
+    return StreamingResponse(_ndjson(rows, CommentOut, "комментариев"), media_type=NDJSON_MEDIA_TYPE)
+
+
+@export_router.get("/messages",
+                   summary="Экспорт своих сообщений в NDJSON",
+                   response_class=StreamingResponse,
+                   responses=export_responses)
+async def export_messages(since: Optional[datetime] = Query(None),
+                          until: Optional[datetime] = Query(None),
+                          room_id: Optional[str] = Query(None),
+                          user: User = Depends(get_current_user)) -> StreamingResponse:
+    app_logger.info("Пользователь %s запустил экспорт сообщений", user.login)
+    rows = message_manager.stream_messages(user_id=getattr(user, 'id', 0), since=since, until=until, room_id=room_id)
+    return StreamingResponse(_ndjson(rows, RoomMessageOut, "сообщений"), media_type=NDJSON_MEDIA_TYPE)
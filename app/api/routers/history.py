@@ -1,33 +1,45 @@
-from typing import Sequence
+from typing import Optional
 
 from fastapi import (
     APIRouter,
     Depends,
     status,
-    Response
+    Request,
+    Response,
+    Query
 )
 
+from database.managers.comment_manager import CommentManager
 from database.managers.history_manager import HistoryManager
 from database.models.user import User
 from database.models.history import History
-from schemas.history import HistoryCreate, HistoryUpdate, HistoryOut
+from schemas.comment import CommentPage
+from schemas.history import HistoryCreate, HistoryUpdate, HistoryOut, HistoryDetailOut, HistoryPage
 
-from api.dependencies.auth import get_current_user
+from api.dependencies.auth import get_current_user, get_optional_user
 from api.dependencies.ownership import get_history_or_error
 from api.docs.history import (
     history_create_responses, 
     history_get_all_responses, 
     history_get_responses, 
+    history_get_comments_responses,
     history_update_responses,
     history_delete_responses
 )
 
+from core.config import settings
+from core.etag import check_etag, weak_etag
 from core.logger import app_logger
+from core.query_budget import query_budget
+from core.responses import dump_json, json_response
 
-from exceptions.base import DatabaseError
+from exceptions.base import DatabaseError, ValidationError
 from exceptions.histories import HistoryNotFoundError, OwnershipHistoryError
 
+from services.history_cache import get_feed_page, get_history_detail, invalidate_history
+
 history_manager = HistoryManager()
+comment_manager = CommentManager()
 
 history_router = APIRouter(prefix='/history', tags=['Истории'])
 
@@ -41,44 +53,103 @@ async def create_history(new_history: HistoryCreate,
         data = new_history.model_dump(exclude={"author_id"})
         result = History(**data, author_id=user.id)
         history_out = await history_manager.create_history_with_response(result)
-        app_logger.info(f"История {result.id} создана пользователем {user.login}")
+        await invalidate_history()
+        app_logger.info("История %s создана пользователем %s", result.id, user.login)
         return history_out
     except (HistoryNotFoundError, OwnershipHistoryError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при создании истории: {e}")
+        app_logger.error("Ошибка при создании истории: %s", e)
         raise DatabaseError("Ошибка при создании истории")
 
 @history_router.get('/',
-                    summary='Получить все истории',
+                    summary='Получить ленту историй',
                     status_code=status.HTTP_200_OK,
                     responses=history_get_all_responses)
-async def get_histories() -> Sequence[HistoryOut]:
+@query_budget(1)
+async def get_histories(limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+                        cursor: Optional[str] = Query(None),
+                        with_liked: bool = Query(False),
+                        user: Optional[User] = Depends(get_optional_user)) -> HistoryPage:
     try:
-        return await history_manager.get_histories_with_authors()
-    except (HistoryNotFoundError, OwnershipHistoryError) as e:
+        if with_liked and user is not None:
+            # liked_by_me зависит от пользователя - такие страницы не кэшируются
+            page = await history_manager.get_histories_with_authors(limit=limit, cursor=cursor, viewer_id=user.id)
+            return json_response(page)
+
+        async def load() -> bytes:
+            page = await history_manager.get_histories_with_authors(limit=limit, cursor=cursor)
+            return dump_json(page)
+
+        return json_response(await get_feed_page(limit, cursor, load))
+    except (HistoryNotFoundError, OwnershipHistoryError, ValidationError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при получении всех историй: {e}")
+        app_logger.error("Ошибка при получении всех историй: %s", e)
         raise DatabaseError("Ошибка при получении всех историй")
 
 @history_router.get('/{id}',
                     summary='Получить историю по ID',
                     status_code=status.HTTP_200_OK,
                     responses=history_get_responses)
-async def get_history(id: int, user: User = Depends(get_current_user)) -> HistoryOut:
+# Версия и деталь; с комментариями ещё их агрегат для версии и первая страница
+@query_budget(lambda with_comments, **_: 4 if with_comments else 2)
+async def get_history(id: int,
+                      request: Request,
+                      response: Response,
+                      with_comments: bool = Query(False),
+                      user: User = Depends(get_current_user)) -> HistoryDetailOut:
     try:
-        history_out = await history_manager.get_history_by_id_with_author(id)
-        if history_out is None:
+        version = await history_manager.get_history_version(id, with_comments=with_comments)
+        if version is None:
             raise HistoryNotFoundError()
-        app_logger.info(f"История {id} получена пользователем {user.login}")
-        return history_out
+        etag = weak_etag("history", with_comments, version)
+        not_modified = check_etag(request, response, etag)
+        if not_modified:
+            return not_modified
+
+        async def load() -> bytes:
+            history_out = await history_manager.get_history_by_id_with_author(id)
+            if history_out is None:
+                raise HistoryNotFoundError()
+            history_detail = HistoryDetailOut(**history_out.model_dump())
+            if with_comments:
+                history_detail.comments = await comment_manager.get_comments_by_history_id(
+                    history_id=id,
+                    limit=settings.page_size_default,
+                )
+            return dump_json(history_detail)
+
+        body = await get_history_detail(id, with_comments, etag, load)
+        app_logger.info("История %s получена пользователем %s", id, user.login)
+        return json_response(body, headers=response.headers)
     except (HistoryNotFoundError, OwnershipHistoryError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при получении истории: {e}")
+        app_logger.error("Ошибка при получении истории: %s", e)
         raise DatabaseError("Ошибка при получении истории")
 
+@history_router.get('/{id}/comments',
+                    summary='Получить комментарии истории',
+                    status_code=status.HTTP_200_OK,
+                    responses=history_get_comments_responses)
+@query_budget(2)
+async def get_history_comments(id: int,
+                               limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+                               cursor: Optional[str] = Query(None),
+                               user: User = Depends(get_current_user)) -> CommentPage:
+    try:
+        page = await comment_manager.get_comments_by_history_id(history_id=id, limit=limit, cursor=cursor)
+        if not page.items and cursor is None and not await history_manager.history_exists(id):
+            raise HistoryNotFoundError()
+        app_logger.info("Комментарии истории %s получены пользователем %s", id, user.login)
+        return json_response(page)
+    except (HistoryNotFoundError, ValidationError) as e:
+        raise e
+    except Exception as e:
+        app_logger.error("Ошибка при получении комментариев истории: %s", e)
+        raise DatabaseError("Ошибка при получении комментариев истории")
+
 @history_router.put('/{id}',
                     summary='Изменить историю по ID',
                     status_code=status.HTTP_200_OK,
@@ -89,15 +160,16 @@ async def update_history(id: int,
     try:
         await get_history_or_error(id=id, user=user)
         await history_manager.update_obj(id=id, updated_obj=history_update)
+        await invalidate_history(id)
         history_out = await history_manager.get_history_by_id_with_author(id)
         if history_out is None:
             raise HistoryNotFoundError()
-        app_logger.info(f"История {id} обновлена пользователем {user.login}")
+        app_logger.info("История %s обновлена пользователем %s", id, user.login)
         return history_out
     except (HistoryNotFoundError, OwnershipHistoryError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при обновлении истории: {e}")
+        app_logger.error("Ошибка при обновлении истории: %s", e)
         raise DatabaseError("Ошибка при обновлении истории")
 
 @history_router.delete('/{id}',
@@ -108,10 +180,11 @@ async def delete_history(id: int, user: User = Depends(get_current_user)) -> Res
     try:
         await get_history_or_error(id=id, user=user)
         await history_manager.delete_obj(id)
-        app_logger.info(f"История {id} удалена пользователем {user.login}")
+        await invalidate_history(id)
+        app_logger.info("История %s удалена пользователем %s", id, user.login)
         return Response(status_code=204)
     except (HistoryNotFoundError, OwnershipHistoryError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при удалении истории: {e}")
+        app_logger.error("Ошибка при удалении истории: %s", e)
         raise DatabaseError("Ошибка при удалении истории")
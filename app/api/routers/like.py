@@ -1,50 +1,88 @@
+from typing import List
+
 from fastapi import (
     APIRouter,
     Depends,
     status,
-    Response
+    Response,
+    Query
 )
 
+from database.managers.history_manager import HistoryManager
 from database.managers.like_manager import LikeManager
 from database.models.user import User
-from database.models.history_like import HistoryLike
-from schemas.like import LikeCreate, LikeOut
+from schemas.like import LikeCreate, LikeOut, LikeStatusOut
 
 from api.dependencies.auth import get_current_user
+from services.like_aggregator import like_aggregator
 from api.dependencies.ownership import get_like_or_error
 from api.docs.like import (
     like_create_responses, 
     like_get_responses, 
-    like_delete_responses
+    like_delete_responses,
+    like_put_history_responses,
+    like_delete_history_responses,
+    like_status_responses
 )
 
+from core.config import settings
 from core.logger import app_logger
+from core.query_budget import query_budget
+from core.responses import json_response
 
-from exceptions.base import DatabaseError
+from exceptions.base import DatabaseError, ModelNotFoundError, ServiceUnavailableError, ValidationError
+from exceptions.histories import HistoryNotFoundError
 from exceptions.like import LikeNotFoundError, OwnershipLikeError
 
 like_router = APIRouter(prefix="/likes", tags=["Лайки"])
 
 like_manager = LikeManager()
+history_manager = HistoryManager()
 
 @like_router.post("/",
                   summary='Создать лайк',
                   status_code=status.HTTP_201_CREATED,
                   responses=like_create_responses)
 async def create_like(like: LikeCreate,
+                response: Response,
                 user: User = Depends(get_current_user)) -> LikeOut:
     try:
-        data = like.model_dump()
-        result = HistoryLike(**data, user_id=user.id)
-        await like_manager.create_obj(obj=result)
-        app_logger.info(f"Лайк {result.id} создан пользователем {user.login}")
+        result, created = await like_manager.create_like(user_id=user.id, history_id=like.history_id)
+        if created:
+            app_logger.info("Лайк %s создан пользователем %s", result.id, user.login)
+        else:
+            response.status_code = status.HTTP_200_OK
+            app_logger.info("Лайк %s уже был поставлен пользователем %s", result.id, user.login)
         return LikeOut.model_validate(result)
+    except ModelNotFoundError:
+        raise HistoryNotFoundError()
     except (LikeNotFoundError, OwnershipLikeError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при создании лайка: {e}")
+        app_logger.error("Ошибка при создании лайка: %s", e)
         raise DatabaseError("Ошибка при создании лайка")
 
+@like_router.get("/status",
+                 summary='Статус лайков текущего пользователя для списка историй',
+                 status_code=status.HTTP_200_OK,
+                 responses=like_status_responses)
+@query_budget(1)
+async def get_like_status(history_ids: List[int] = Query(...),
+                          user: User = Depends(get_current_user)) -> List[LikeStatusOut]:
+    try:
+        if len(history_ids) > settings.page_size_max:
+            raise ValidationError(f"Можно запросить не более {settings.page_size_max} историй")
+        liked = await like_manager.get_liked_history_ids(user_id=user.id, history_ids=history_ids)
+        return json_response([
+            LikeStatusOut(history_id=history_id, liked=history_id in liked)
+            for history_id in dict.fromkeys(history_ids)
+        ])
+    except ValidationError as e:
+        raise e
+    except Exception as e:
+        app_logger.error("Ошибка при получении статуса лайков: %s", e)
+        raise DatabaseError("Ошибка при получении статуса лайков")
+
 @like_router.get("/{id}",
                  summary='Получить лайк по ID',
                  status_code=status.HTTP_200_OK,
@@ -52,12 +90,12 @@ async def create_like(like: LikeCreate,
 async def get_like(id: int, user: User = Depends(get_current_user)) -> LikeOut:
     try:
         result = await get_like_or_error(id=id, user=user)
-        app_logger.info(f"Лайк {result.id} получен пользователем {user.login}")
+        app_logger.info("Лайк %s получен пользователем %s", result.id, user.login)
         return LikeOut.model_validate(result)
     except (LikeNotFoundError, OwnershipLikeError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при получении лайка: {e}")
+        app_logger.error("Ошибка при получении лайка: %s", e)
         raise DatabaseError("Ошибка при получении лайка")
 
 @like_router.delete("/{id}",
@@ -68,10 +106,59 @@ async def delete_like(id: int, user: User = Depends(get_current_user)) -> Respon
     try:
         await get_like_or_error(id=id, user=user)
         await like_manager.delete_obj(id)
-        app_logger.info(f"Лайк {id} удален пользователем {user.login}")
+        app_logger.info("Лайк %s удален пользователем %s", id, user.login)
         return Response(status_code=204)
     except (LikeNotFoundError, OwnershipLikeError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при удалении лайка: {e}")
+        app_logger.error("Ошибка при удалении лайка: %s", e)
+        raise DatabaseError("Ошибка при удалении лайка")
+
+@like_router.put("/history/{history_id}",
+                 summary='Поставить лайк истории',
+                 status_code=status.HTTP_204_NO_CONTENT,
+                 responses=like_put_history_responses)
+async def like_history(history_id: int, user: User = Depends(get_current_user)) -> Response:
+    try:
+        if settings.like_buffer_enabled:
+            # Буфер не видит БД: без этой проверки лайк несуществующей истории ответил бы 202
+            if not await history_manager.history_exists(history_id):
+                raise HistoryNotFoundError()
+            await like_aggregator.like(user_id=user.id, history_id=history_id)
+            if not like_aggregator.wait_for_flush:
+                return Response(status_code=status.HTTP_202_ACCEPTED)
+        else:
+            await like_manager.create_like(user_id=user.id, history_id=history_id)
+        app_logger.info("Пользователь %s поставил лайк истории %s", user.login, history_id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except ModelNotFoundError:
+        raise HistoryNotFoundError()
+    except (HistoryNotFoundError, ServiceUnavailableError) as e:
+        raise e
+    except Exception as e:
+        app_logger.error("Ошибка при создании лайка: %s", e)
+        raise DatabaseError("Ошибка при создании лайка")
+
+@like_router.delete("/history/{history_id}",
+                    summary='Снять лайк с истории',
+                    status_code=status.HTTP_204_NO_CONTENT,
+                    responses=like_delete_history_responses)
+async def unlike_history(history_id: int, user: User = Depends(get_current_user)) -> Response:
+    try:
+        if settings.like_buffer_enabled:
+            if not await history_manager.history_exists(history_id):
+                raise HistoryNotFoundError()
+            await like_aggregator.unlike(user_id=user.id, history_id=history_id)
+            if not like_aggregator.wait_for_flush:
+                return Response(status_code=status.HTTP_202_ACCEPTED)
+        elif not await like_manager.delete_like(user_id=user.id, history_id=history_id):
+            # Лайка не было: отличаем это от несуществующей истории только на этом редком пути
+            if not await history_manager.history_exists(history_id):
+                raise HistoryNotFoundError()
+        app_logger.info("Пользователь %s снял лайк с истории %s", user.login, history_id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except (HistoryNotFoundError, ServiceUnavailableError) as e:
+        raise e
+    except Exception as e:
+        app_logger.error("Ошибка при удалении лайка: %s", e)
         raise DatabaseError("Ошибка при удалении лайка")
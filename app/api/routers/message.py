@@ -1,72 +1,93 @@
-import datetime
-from typing import List
+from typing import List, Optional
 
 from fastapi import (
     APIRouter,
     Depends,
-    status
+    status,
+    Query,
+    Response
 )
 
 from database.managers.message_manager import MessageManager
-from database.managers.user_manager import UserManager
 from database.models.user import User
 from schemas.chat import ChatOut
+from schemas.message import MessagePage
 
 from api.dependencies.auth import get_current_user
+from api.dependencies.ownership import check_room_member_or_error
+from services.avatar_storage import sized_avatar_url
 
+from core.config import settings
 from core.logger import app_logger
+from core.query_budget import query_budget
+from core.responses import json_response
 
-from exceptions.base import DatabaseError
-from exceptions.message import MessageNotFoundError, OwnershipMessageError
+from exceptions.base import DatabaseError, ValidationError
+from exceptions.message import MessageNotFoundError, OwnershipMessageError, RoomAccessError
 from exceptions.users import UserNotFoundError
 
-from api.docs.message import get_chats_responses
+from api.docs.message import get_chats_responses, get_room_messages_responses
 
 message_router = APIRouter(prefix="/messages", tags=["Сообщения"])
 
 message_manager = MessageManager()
-user_manager = UserManager()
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 @message_router.get("/chats",
                     summary="Получить все чаты",
                     status_code=status.HTTP_200_OK,
                     responses=get_chats_responses)
-async def get_chats(user: User = Depends(get_current_user)) -> List[ChatOut]:
+@query_budget(1)
+async def get_chats(response: Response,
+                    user: User = Depends(get_current_user),
+                    limit: Optional[int] = Query(None, ge=1, le=settings.page_size_max),
+                    cursor: Optional[str] = Query(None)) -> List[ChatOut]:
     try:
-        user_id = getattr(user, 'id', 0)
         if not user:
             raise UserNotFoundError()
-        room_ids = await message_manager.get_room_ids_by_user_id(getattr(user, 'id', 0))
-        app_logger.info(f"Получены чаты для пользователя {user.login}")
-        app_logger.info(f"room_ids: {room_ids}")
-
-        companion_ids = []
-        last_messages = []
-
-        for room_id in room_ids:
-            last_msg = await message_manager.get_last_message_by_room_id(room_id)
-            companion_ids.append(last_msg.sender_id if last_msg.sender_id != user_id else last_msg.receiver_id)
-            last_messages.append(last_msg)
-
-        companions = [await user_manager.get_obj_by_id(uid) for uid in companion_ids]
-
-        app_logger.info(f"Получены собеседники для пользователя {user.login}")
-        chats_out = []
-
-        for i, comp in enumerate(companions):
-            last_msg = last_messages[i]
-            chats_out.append(ChatOut(
-                companion_login=str(comp.login),
-                companion_avatar_url=str(comp.avatar_url) if comp.avatar_url is not None else None,
-                last_message=str(getattr(last_msg, 'text', None)),
-                last_message_time=getattr(last_msg, 'timestamp', datetime.datetime.now()),
-                from_me=bool(getattr(last_msg, 'sender_id', 0) == user_id),
-                room_id=getattr(last_msg, 'room_id', None)
-            ))
-        app_logger.info(f"Получены последние сообщения для пользователя {user.login}")
+        chats_out, next_cursor = await message_manager.get_chats_by_user_id(
+            user_id=getattr(user, 'id', 0),
+            limit=limit,
+            cursor=cursor,
+        )
+        for chat in chats_out:
+            # В списке чатов аватар показывается миниатюрой
+            chat.companion_avatar_url = sized_avatar_url(chat.companion_avatar_url, settings.avatar_chat_list_size)
+        if next_cursor is not None:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        app_logger.info("Получены чаты для пользователя %s", user.login)
         return chats_out
-    except (MessageNotFoundError, OwnershipMessageError, UserNotFoundError) as e:
+    except (MessageNotFoundError, OwnershipMessageError, UserNotFoundError, ValidationError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при получении чатов: {e}")
+        app_logger.error("Ошибка при получении чатов: %s", e)
         raise DatabaseError("Ошибка при получении чатов")
+
+
+@message_router.get("/{room_id}",
+                    summary="Получить историю сообщений комнаты",
+                    status_code=status.HTTP_200_OK,
+                    responses=get_room_messages_responses)
+@query_budget(2)
+async def get_room_messages(room_id: str,
+                            user: User = Depends(get_current_user),
+                            limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+                            before: Optional[str] = Query(None),
+                            after: Optional[str] = Query(None)) -> MessagePage:
+    try:
+        await check_room_member_or_error(room_id, user)
+        page = await message_manager.get_room_messages(
+            room_id=room_id,
+            user_id=getattr(user, 'id', 0),
+            limit=limit,
+            before=before,
+            after=after,
+        )
+        app_logger.info("Получена история комнаты %s для пользователя %s", room_id, user.login)
+        return json_response(page)
+    except (RoomAccessError, ValidationError) as e:
+        raise e
+    except Exception as e:
+        app_logger.error("Ошибка при получении истории комнаты %s: %s", room_id, e)
+        raise DatabaseError("Ошибка при получении истории сообщений")
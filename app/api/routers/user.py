@@ -4,6 +4,7 @@ from fastapi import (
     APIRouter,
     Depends,
     status,
+    Request,
     Response,
     Query,
     Body
@@ -11,6 +12,7 @@ from fastapi import (
 
 from exceptions.base import DatabaseError
 from exceptions.users import UserNotFoundError
+from exceptions.avatar import InvalidAvatarError, AvatarTooLargeError
 
 from database.managers.user_manager import UserManager
 from database.managers.history_manager import HistoryManager
@@ -20,15 +22,20 @@ from schemas.user import UserOut, UpdateUser, UpdateMe
 from schemas.history import HistoryOutShort
 
 from api.dependencies.auth import get_current_user
+from services.avatar_storage import store_avatar, is_avatar_url
 
 from core.cookie import clear_auth_cookies
+from core.etag import check_etag, weak_etag
 from core.logger import app_logger
+from core.query_budget import query_budget
+from core.responses import json_response
 
 from api.docs.user import (
     user_get_responses, 
     user_update_responses, 
     user_histories_responses, 
-    user_delete_responses
+    user_delete_responses,
+    user_avatar_update_responses
 )
 
 user_manager = UserManager()
@@ -40,61 +47,76 @@ user_router = APIRouter(prefix='/user', tags=['Пользователи'])
                  summary='Получить все истории пользователя по ID',
                  status_code=status.HTTP_200_OK,
                  responses=user_histories_responses)
-async def get_histories_by_id(id: int) -> List[HistoryOutShort]:
+@query_budget(2)
+async def get_histories_by_id(id: int, request: Request, response: Response) -> List[HistoryOutShort]:
     try:
-        app_logger.info(f"Получены истории пользователя {id}")
-        return await history_manager.get_histories_by_author_id(author_id=id)
+        digest = await history_manager.get_histories_digest_by_author_id(author_id=id)
+        not_modified = check_etag(request, response, weak_etag("histories", id, digest))
+        if not_modified:
+            return not_modified
+        app_logger.info("Получены истории пользователя %s", id)
+        return json_response(await history_manager.get_histories_by_author_id(author_id=id), headers=response.headers)
     except UserNotFoundError as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при получении историй пользователя: {e}")
+        app_logger.error("Ошибка при получении историй пользователя: %s", e)
         raise DatabaseError("Ошибка при получении историй пользователя")
 
 @user_router.get('/me',
                  summary='Получить данные о себе',
                  status_code=status.HTTP_200_OK,
                  responses=user_get_responses)
-async def get_me(user: User = Depends(get_current_user)) -> UserOut:
+@query_budget(1)
+async def get_me(request: Request, response: Response, user: User = Depends(get_current_user)) -> UserOut:
     try:
-        app_logger.info(f"Получены данные о себе для пользователя {user.login}")
-        db_user = await user_manager.get_obj_by_id(getattr(user, 'id', 0))
-        if not db_user:
-            app_logger.error(f"Пользователь {user.login} не найден")
+        app_logger.info("Получены данные о себе для пользователя %s", user.login)
+        profile = await user_manager.get_profile(getattr(user, 'id', 0))
+        if not profile:
+            app_logger.error("Пользователь %s не найден", user.login)
             raise UserNotFoundError()
-        return UserOut.model_validate(db_user, from_attributes=True)
+        not_modified = check_etag(request, response, weak_etag(*profile.model_dump().values()),
+                                  cache_control="private, no-cache")
+        if not_modified:
+            return not_modified
+        return profile
     except UserNotFoundError as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при получении данных о себе: {e}")
+        app_logger.error("Ошибка при получении данных о себе: %s", e)
         raise DatabaseError("Ошибка при получении данных о себе")
 
 @user_router.get('/me/histories',
                  summary="Получить свои истории",
                  status_code=status.HTTP_200_OK,
                  responses=user_histories_responses)
+@query_budget(1)
 async def get_histories(user: User = Depends(get_current_user),
                         skip: int = Query(0, ge=0),
                         limit: int = Query(100, ge=1, le=100)) -> List[HistoryOutShort]:
     try:
-        app_logger.info(f"Получены истории пользователя {user.login}")
-        return await history_manager.get_histories_by_author_id(author_id=getattr(user, 'id', 0), skip=skip, limit=limit)
+        app_logger.info("Получены истории пользователя %s", user.login)
+        return json_response(
+            await history_manager.get_histories_by_author_id(author_id=getattr(user, 'id', 0), skip=skip, limit=limit)
+        )
     except UserNotFoundError as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при получении своих историй: {e}")
+        app_logger.error("Ошибка при получении своих историй: %s", e)
         raise DatabaseError("Ошибка при получении своих историй")
 
 @user_router.get('/{login}/avatar', summary='Получить аватар пользователя по логину', status_code=status.HTTP_200_OK)
-async def get_avatar_by_login(login: str):
+async def get_avatar_by_login(login: str, request: Request, response: Response):
     try:
-        user = await user_manager.get_user_by_login(login)
-        if not user or not user.avatar_url:
-            return {"avatar_url": None}
-        return {"avatar_url": user.avatar_url}
-    except UserNotFoundError as e:
-        return {"avatar_url": None}
+        try:
+            avatar_url = await user_manager.get_avatar_url_by_login(login)
+        except UserNotFoundError as e:
+            avatar_url = None
+        not_modified = check_etag(request, response, weak_etag("avatar", login, avatar_url))
+        if not_modified:
+            return not_modified
+        return {"avatar_url": avatar_url or None}
     except Exception as e:
-        app_logger.error(f"Ошибка при получении аватара: {e}")
+        app_logger.error("Ошибка при получении аватара: %s", e)
         raise DatabaseError("Ошибка при получении аватара")
 
 @user_router.patch('/me',
@@ -105,26 +127,33 @@ async def patch_me(updated_user: UpdateMe,
                    user: User = Depends(get_current_user)) -> UserOut:
     try:
         update_data = UpdateUser(**updated_user.model_dump())
+        if not is_avatar_url(update_data.avatar_url):
+            # Встроенное изображение в users.avatar_url не храним
+            update_data.avatar_url = await store_avatar(update_data.avatar_url)
         result = await user_manager.update_obj(id=getattr(user, 'id', 0), updated_obj=update_data)
-        app_logger.info(f"Данные о себе для пользователя {user.login} обновлены")
+        app_logger.info("Данные о себе для пользователя %s обновлены", user.login)
         return UserOut.model_validate(result, from_attributes=True)
-    except UserNotFoundError as e:
+    except (UserNotFoundError, InvalidAvatarError, AvatarTooLargeError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при обновлении данных о себе: {e}")
+        app_logger.error("Ошибка при обновлении данных о себе: %s", e)
         raise DatabaseError("Ошибка при обновлении данных о себе")
 
-@user_router.patch('/me/avatar', summary='Обновить аватар (base64-строка)', status_code=status.HTTP_200_OK)
+@user_router.patch('/me/avatar',
+                   summary='Обновить аватар (base64-строка)',
+                   status_code=status.HTTP_200_OK,
+                   responses=user_avatar_update_responses)
 async def update_avatar(avatar_base64: str = Body(..., embed=True), user: User = Depends(get_current_user)):
     try:
-        update_data = UpdateUser(avatar_url=avatar_base64)
+        avatar_url = await store_avatar(avatar_base64)
+        update_data = UpdateUser(avatar_url=avatar_url)
         result = await user_manager.update_obj(id=getattr(user, 'id', 0), updated_obj=update_data)
-        app_logger.info(f"Аватар пользователя {user.login} обновлён")
+        app_logger.info("Аватар пользователя %s обновлён: %s", user.login, avatar_url)
         return {"avatar_url": result.avatar_url}
-    except UserNotFoundError as e:
+    except (UserNotFoundError, InvalidAvatarError, AvatarTooLargeError) as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при обновлении аватара: {e}")
+        app_logger.error("Ошибка при обновлении аватара: %s", e)
         raise DatabaseError("Ошибка при обновлении аватара")
 
 @user_router.delete('/me',
@@ -135,10 +164,10 @@ async def delete_user(response: Response, user: User = Depends(get_current_user)
     try:
         await user_manager.delete_obj(id=getattr(user, 'id', 0))
         clear_auth_cookies(response)
-        app_logger.info(f"Аккаунт пользователя {user.login} удален")
+        app_logger.info("Аккаунт пользователя %s удален", user.login)
         return response
     except UserNotFoundError as e:
         raise e
     except Exception as e:
-        app_logger.error(f"Ошибка при удалении аккаунта: {e}")
+        app_logger.error("Ошибка при удалении аккаунта: %s", e)
         raise DatabaseError("Ошибка при удалении аккаунта")
@@ -0,0 +1,105 @@
+"""
+Бенчмарк накладных расходов middleware обработки ошибок на пропускную способность.
+
+Запросы идут напрямую в ASGI-приложение через httpx.ASGITransport, без сети и сервера.
+Сравниваются три стека middleware:
+    - без middleware ошибок
+    - BaseHTTPMiddleware - прежняя реализация ErrorHandlerMiddleware (try/except вокруг call_next)
+    - чистый ASGI - core.error_middleware.ErrorHandlerMiddleware
+
+Запуск из каталога app:
+    python -m benchmarks.error_middleware [--requests 3000] [--concurrency 1 16]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def _legacy_middleware():
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from core.responses import ORJSONResponse
+
+    class LegacyErrorHandlerMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            try:
+                return await call_next(request)
+            except Exception:
+                return ORJSONResponse(status_code=500, content={"error": "Внутренняя ошибка сервера"})
+
+    return LegacyErrorHandlerMiddleware
+
+
+def _use_error_middleware(app, middleware_class, candidates: tuple) -> None:
+    """Меняет middleware ошибок в стеке приложения; стек пересобирается при следующем запросе"""
+    from starlette.middleware import Middleware
+
+    app.user_middleware = [middleware for middleware in app.user_middleware if middleware.cls not in candidates]
+    if middleware_class is not None:
+        app.user_middleware.insert(0, Middleware(middleware_class))
+    app.middleware_stack = None
+
+
+async def _measure(client, url: str, requests: int, concurrency: int) -> float:
+    """Запросов в секунду"""
+    per_worker = requests // concurrency
+
+    async def worker() -> None:
+        for _ in range(per_worker):
+            response = await client.get(url)
+            assert response.status_code == 200, response.text
+
+    await worker()  # прогрев
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - started)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    import httpx
+
+    from core.error_middleware import ErrorHandlerMiddleware
+    from database.config import engine
+    from database.init_db import init_db
+    from main import app
+
+    await init_db()
+    stacks = {
+        "без middleware": None,
+        "BaseHTTPMiddleware": _legacy_middleware(),
+        "чистый ASGI": ErrorHandlerMiddleware,
+    }
+    candidates = tuple(cls for cls in stacks.values() if cls is not None)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/auth/register", json={"login": "bench", "password": "bench-password"})
+        client.cookies.update(response.cookies)
+        history = await client.post("/history/", json={"title": "История", "description": "Описание"})
+        urls = ["/health", f"/history/{history.json()['id']}"]
+
+        print(f"{'эндпоинт':>16}{'параллельно':>13}{'middleware':>22}{'запросов/с':>13}")
+        for url in urls:
+            for concurrency in args.concurrency:
+                for name, middleware_class in stacks.items():
+                    _use_error_middleware(app, middleware_class, candidates)
+                    rps = await _measure(client, url, args.requests, concurrency)
+                    print(f"{url:>16}{concurrency:>13}{name:>22}{rps:>13.0f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Движок создаётся при импорте по DATABASE_URL, поэтому модули приложения импортируются после
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{directory}/bench.db"
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Бенчмарк страницы ленты историй с comments_count и likes_count.
+
+Сравнивает страницу ленты, где счётчики считаются сгруппированными подзапросами
+по id страницы (HistoryManager.get_histories_with_authors), с подсчётом
+отдельными запросами на каждую историю (N+1). Данные создаются во временной SQLite БД
+и дорастают до каждого из размеров по очереди.
+
+Запуск из каталога app:
+    python -m benchmarks.history_counts [--comments 10000 100000 1000000] [--histories 1000] [--pages 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BATCH_SIZE = 50000
+START = datetime(2024, 1, 1)
+
+
+async def _seed_histories(n_histories: int, n_users: int) -> None:
+    from sqlalchemy import insert
+
+    from database.config import engine
+    from database.init_db import init_db
+    from database.models.history import History
+    from database.models.user import User
+
+    await init_db()
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [
+            {"id": i, "login": f"user{i}", "password_hash": "-", "role": 1} for i in range(1, n_users + 1)
+        ])
+        await conn.execute(insert(History), [
+            {"id": i, "title": f"История {i}", "likes": 0, "author_id": 1,
+             "created_at": START + timedelta(minutes=i)}
+            for i in range(1, n_histories + 1)
+        ])
+
+
+async def _grow(n_histories: int, comments: range, likes: range) -> None:
+    """Добавляет комментарии и лайки с номерами из диапазонов"""
+    from sqlalchemy import insert
+
+    from database.config import engine
+    from database.models.comments import Comment
+    from database.models.history_like import HistoryLike
+
+    async with engine.begin() as conn:
+        for offset in range(comments.start, comments.stop, BATCH_SIZE):
+            await conn.execute(insert(Comment), [
+                {"content": "комментарий", "user_id": 1, "history_id": random.randint(1, n_histories),
+                 "created_at": START + timedelta(seconds=i)}
+                for i in range(offset, min(offset + BATCH_SIZE, comments.stop))
+            ])
+        for offset in range(likes.start, likes.stop, BATCH_SIZE):
+            await conn.execute(insert(HistoryLike), [
+                {"user_id": i // n_histories + 1, "history_id": i % n_histories + 1}
+                for i in range(offset, min(offset + BATCH_SIZE, likes.stop))
+            ])
+
+
+async def _count_per_history(history_ids: list[int]) -> None:
+    from sqlalchemy import func, select
+
+    from database.managers.session_manager import manager
+    from database.models.comments import Comment
+    from database.models.history_like import HistoryLike
+
+    async with manager.get_async_session() as session:
+        for history_id in history_ids:
+            await session.scalar(select(func.count()).where(Comment.history_id == history_id))
+            await session.scalar(select(func.count()).where(HistoryLike.history_id == history_id))
+
+
+async def _measure(pages: int, page_size: int) -> tuple[float, float]:
+    """Среднее время страницы в мс: счётчики в запросе ленты и N+1"""
+    from database.managers.history_manager import HistoryManager
+
+    history_manager = HistoryManager()
+    # Прогрев: компиляция запросов и кэш страниц SQLite
+    warmup = await history_manager.get_histories_with_authors(limit=page_size)
+    await _count_per_history([history.id for history in warmup.items])
+    grouped = naive = 0.0
+    cursor = None
+    for _ in range(pages):
+        started = time.perf_counter()
+        page = await history_manager.get_histories_with_authors(limit=page_size, cursor=cursor)
+        grouped += time.perf_counter() - started
+
+        started = time.perf_counter()
+        await _count_per_history([history.id for history in page.items])
+        naive += time.perf_counter() - started
+        cursor = page.next_cursor
+    return grouped / pages * 1000, naive / pages * 1000
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from database.config import engine
+
+    sizes = sorted(args.comments)
+    max_likes = sizes[-1] // 10
+    await _seed_histories(args.histories, max_likes // args.histories + 1)
+    print(f"{'комментариев':>14}{'лайков':>10}{'в запросе, мс':>16}{'N+1, мс':>12}")
+    seeded = 0
+    for n_comments in sizes:
+        await _grow(args.histories, range(seeded, n_comments), range(seeded // 10, n_comments // 10))
+        seeded = n_comments
+        grouped, naive = await _measure(args.pages, args.page_size)
+        print(f"{n_comments:>14}{n_comments // 10:>10}{grouped:>16.2f}{naive:>12.2f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--histories", type=int, default=1000)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Движок создаётся при импорте по DATABASE_URL, поэтому модули приложения импортируются после
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{directory}/bench.db"
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
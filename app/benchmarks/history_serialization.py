@@ -0,0 +1,102 @@
+"""
+Бенчмарк сериализации страницы ленты GET /history/ в расчёте на одну историю.
+
+Страница берётся из HistoryManager.get_histories_with_authors (истории уже провалидированы
+менеджером) и превращается в тело ответа разными способами:
+    - jsonable_encoder + json.dumps - JSONResponse со стандартным json
+    - response_model - путь FastAPI для маршрута с моделью ответа: повторная валидация и dump_json
+    - orjson - model_dump и orjson.dumps (ORJSONResponse поверх модели)
+    - json_response - core.responses.dump_json: один проход сериализатора Pydantic без валидации
+
+Запуск из каталога app:
+    python -m benchmarks.history_serialization [--page-sizes 20 100] [--rounds 500]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+START = datetime(2024, 1, 1)
+
+
+async def _seed(n_histories: int) -> None:
+    from sqlalchemy import insert
+
+    from database.config import engine
+    from database.init_db import init_db
+    from database.models.history import History
+    from database.models.user import User
+
+    await init_db()
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [{"id": 1, "login": "author", "password_hash": "-", "role": 1}])
+        await conn.execute(insert(History), [
+            {"id": i, "title": f"История {i}", "description": "Описание истории. " * 20, "likes": i % 50,
+             "author_id": 1, "created_at": START + timedelta(minutes=i)}
+            for i in range(1, n_histories + 1)
+        ])
+
+
+def _serializers() -> dict:
+    from fastapi._compat import ModelField
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.utils import create_model_field
+
+    from core.responses import dump_json, orjson
+    from schemas.history import HistoryPage
+
+    field: ModelField = create_model_field(name="response", type_=HistoryPage, mode="serialization")
+
+    def response_model(page: HistoryPage) -> bytes:
+        value, _ = field.validate(page, {}, loc=("response",))
+        return field.serialize_json(value)
+
+    serializers = {
+        "jsonable_encoder + json.dumps": lambda page: json.dumps(jsonable_encoder(page)).encode("utf-8"),
+        "response_model": response_model,
+        "json_response": dump_json,
+    }
+    if orjson is not None:
+        serializers["orjson"] = lambda page: orjson.dumps(page.model_dump(mode="json"))
+    return serializers
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from database.config import engine
+    from database.managers.history_manager import HistoryManager
+
+    await _seed(max(args.page_sizes))
+    history_manager = HistoryManager()
+    serializers = _serializers()
+    print(f"{'размер страницы':>16}{'способ':>32}{'мкс на историю':>18}")
+    for page_size in args.page_sizes:
+        page = await history_manager.get_histories_with_authors(limit=page_size)
+        bodies = {name: serialize(page) for name, serialize in serializers.items()}
+        # Все способы должны давать один и тот же документ
+        assert len({json.dumps(json.loads(body), sort_keys=True) for body in bodies.values()}) == 1
+        for name, serialize in serializers.items():
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                serialize(page)
+            elapsed = time.perf_counter() - started
+            print(f"{page_size:>16}{name:>32}{elapsed / args.rounds / page_size * 1e6:>18.2f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Движок создаётся при импорте по DATABASE_URL, поэтому модули приложения импортируются после
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{directory}/bench.db"
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
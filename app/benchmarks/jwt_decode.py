@@ -0,0 +1,39 @@
+"""
+Бенчмарк проверки access токена: python-jose, облегчённый HS256 и decode_token с кэшем.
+
+Запуск из каталога app:
+    python -m benchmarks.jwt_decode [--iterations 20000]
+"""
+import argparse
+import timeit
+
+from core.config import settings
+from core.jwt import HS256Signer, JoseSigner, create_access_token, decode_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "1", "login": "user", "role": 1})
+    jose_signer = JoseSigner(settings.jwt_secret_key, "HS256")
+    native_signer = HS256Signer(settings.jwt_secret_key)
+    decode_token(token)
+
+    cases = {
+        "jose decode": lambda: jose_signer.decode(token),
+        "native HS256 decode": lambda: native_signer.decode(token),
+        "decode_token (кэш)": lambda: decode_token(token),
+    }
+    baseline = None
+    print(f"{'вариант':<24}{'мкс/вызов':>12}{'ускорение':>12}")
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=args.iterations, repeat=3))
+        per_call = seconds / args.iterations * 1e6
+        baseline = baseline or per_call
+        print(f"{name:<24}{per_call:>12.2f}{baseline / per_call:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Бенчмарк накладных расходов метрик (/metrics) на GET /history/{id}.
+
+Каждый раунд запускает отдельный процесс с METRICS_ENABLED=true и false: настройка читается
+при импорте, а обёртки методов менеджеров ставятся при создании классов. Запросы идут напрямую
+в ASGI-приложение через httpx.ASGITransport. Режимы чередуются, сравниваются медианы.
+
+Запуск из каталога app:
+    python -m benchmarks.metrics_overhead [--requests 3000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+async def _serve(requests: int) -> float:
+    """Запросов в секунду в текущем процессе"""
+    import httpx
+
+    from database.config import engine
+    from database.init_db import init_db
+    from main import app
+
+    await init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/auth/register", json={"login": "bench", "password": "bench-password"})
+        client.cookies.update(response.cookies)
+        history = await client.post("/history/", json={"title": "История", "description": "Описание"})
+        url = f"/history/{history.json()['id']}"
+        for _ in range(requests // 10):  # прогрев
+            await client.get(url)
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(url)
+            assert response.status_code == 200, response.text
+        rps = requests / (time.perf_counter() - started)
+    await engine.dispose()
+    return rps
+
+
+def _worker(requests: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        # Движок создаётся при импорте по DATABASE_URL, поэтому модули приложения импортируются после
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{directory}/bench.db"
+        print(asyncio.run(_serve(requests)))
+
+
+def _round(metrics_enabled: bool, requests: int) -> float:
+    env = {**os.environ, "METRICS_ENABLED": str(metrics_enabled).lower(), "LOG_HANDLERS": '["file"]'}
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.metrics_overhead", "--worker", "--requests", str(requests)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.requests)
+        return
+
+    results: dict[bool, list[float]] = {False: [], True: []}
+    for _ in range(args.rounds):
+        for metrics_enabled in (False, True):
+            results[metrics_enabled].append(_round(metrics_enabled, args.requests))
+    without, with_metrics = statistics.median(results[False]), statistics.median(results[True])
+    print(f"{'метрики':>10}{'запросов/с (медиана)':>24}{'раунды':>40}")
+    for metrics_enabled, label in ((False, "выкл"), (True, "вкл")):
+        rounds = " ".join(f"{rps:.0f}" for rps in results[metrics_enabled])
+        print(f"{label:>10}{statistics.median(results[metrics_enabled]):>24.0f}{rounds:>40}")
+    print(f"Накладные расходы: {(without - with_metrics) / without * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
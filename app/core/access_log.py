@@ -0,0 +1,63 @@
+import time
+from datetime import datetime, timezone
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.logger import access_logger
+from core.request_context import RequestStats, start_request
+from core.responses import dumps
+
+
+def route_template(scope: Scope) -> str | None:
+    """Шаблон пути маршрута (/history/{id}) или None, если маршрут не найден"""
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+class AccessLogMiddleware:
+    """
+    Чистый ASGI-middleware access-лога: начинает сбор статистики запроса (request_context)
+    и после каждого HTTP-запроса пишет одну строку JSON с методом, шаблоном маршрута, статусом,
+    временем ответа, числом SQL-запросов, временем в БД и id пользователя.
+    Строка уходит в очередь access_logger и пишется в фоновом потоке.
+    Подключается всегда: статистика нужна и поиску N+1; access_log_enabled отключает только запись строки
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_request(f"{scope['method']} {scope['path']}")
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if settings.access_log_enabled:
+                self._write(scope, status_code, time.perf_counter() - started, stats)
+
+    @staticmethod
+    def _write(scope: Scope, status_code: int, duration: float, stats: RequestStats) -> None:
+        access_logger.info(dumps({
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "method": scope["method"],
+            "route": route_template(scope),
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "db_queries": stats.db_queries,
+            "db_ms": round(stats.db_time * 1000, 3),
+            "user_id": stats.user_id,
+        }).decode("utf-8"))
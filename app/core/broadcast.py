@@ -0,0 +1,151 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from core.config import settings
+from core.logger import app_logger
+from core.redis import RedisConnection, RedisPubSub
+
+MessageHandler = Callable[[str, str], None]
+
+
+class BroadcastBackend(ABC):
+    """
+    Бэкенд рассылки сообщений по комнатам.
+    Опубликованное сообщение передаётся обработчику (set_handler) в каждом процессе,
+    подписанном на комнату, включая процесс-отправитель.
+    Обработчик синхронный: он только раскладывает сообщение по очередям подключений,
+    поэтому медленная комната не задерживает чтение подписки для остальных.
+    """
+
+    def __init__(self) -> None:
+        self._handler: MessageHandler | None = None
+
+    def set_handler(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def subscribe(self, room_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, room_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, room_id: str, message: str) -> None:
+        ...
+
+    def _dispatch(self, room_id: str, message: str) -> None:
+        if self._handler is None:
+            return
+        try:
+            self._handler(room_id, message)
+        except Exception:
+            app_logger.exception("Ошибка при доставке сообщения в комнату %s", room_id)
+
+
+class MemoryBroadcastBackend(BroadcastBackend):
+    """Рассылка внутри одного процесса"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._rooms: set[str] = set()
+
+    async def subscribe(self, room_id: str) -> None:
+        self._rooms.add(room_id)
+
+    async def unsubscribe(self, room_id: str) -> None:
+        self._rooms.discard(room_id)
+
+    async def publish(self, room_id: str, message: str) -> None:
+        if room_id in self._rooms:
+            self._dispatch(room_id, message)
+
+
+class RedisBroadcastBackend(BroadcastBackend):
+    """
+    Рассылка между процессами через Redis pub/sub: каждая комната — отдельный канал,
+    процесс подписан только на комнаты, в которых у него есть подключения
+    """
+
+    def __init__(self, url: str, channel_prefix: str, reconnect_delay: float = 1.0) -> None:
+        super().__init__()
+        self._url = url
+        self._prefix = channel_prefix
+        self._reconnect_delay = reconnect_delay
+        self._rooms: set[str] = set()
+        self._publisher = RedisConnection(url)
+        self._pubsub: RedisPubSub | None = None
+        self._listener: asyncio.Task | None = None
+
+    def _channel(self, room_id: str) -> str:
+        return f"{self._prefix}{room_id}"
+
+    async def start(self) -> None:
+        await self._publisher.connect()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._publisher.close()
+
+    async def subscribe(self, room_id: str) -> None:
+        self._rooms.add(room_id)
+        if self._pubsub is not None and self._pubsub.is_connected:
+            await self._pubsub.subscribe(self._channel(room_id))
+
+    async def unsubscribe(self, room_id: str) -> None:
+        self._rooms.discard(room_id)
+        if self._pubsub is not None and self._pubsub.is_connected:
+            await self._pubsub.unsubscribe(self._channel(room_id))
+
+    async def publish(self, room_id: str, message: str) -> None:
+        try:
+            if not self._publisher.is_connected:
+                await self._publisher.connect()
+            await self._publisher.execute("PUBLISH", self._channel(room_id), message)
+        except (ConnectionError, OSError):
+            await self._publisher.close()
+            raise
+
+    async def _listen(self) -> None:
+        """Читает сообщения подписки; при обрыве соединения переподключается и восстанавливает подписки"""
+        while True:
+            pubsub = RedisPubSub(self._url)
+            try:
+                await pubsub.connect()
+                self._pubsub = pubsub
+                if self._rooms:
+                    await pubsub.subscribe(*(self._channel(room_id) for room_id in self._rooms))
+                async for channel, data in pubsub.listen():
+                    self._dispatch(channel[len(self._prefix):], data.decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                app_logger.error("Потеряно соединение с Redis pub/sub: %r", e)
+            finally:
+                self._pubsub = None
+                await pubsub.close()
+            await asyncio.sleep(self._reconnect_delay)
+
+
+def create_broadcast_backend() -> BroadcastBackend:
+    """Создаёт бэкенд рассылки согласно settings.broadcast_backend"""
+    if settings.broadcast_backend == "memory":
+        return MemoryBroadcastBackend()
+    if settings.broadcast_backend == "redis":
+        return RedisBroadcastBackend(settings.redis_url, settings.broadcast_channel_prefix)
+    raise ValueError(f"Неизвестный бэкенд рассылки: {settings.broadcast_backend}")
@@ -7,6 +7,20 @@ class Settings(BaseSettings):
 
     LOG_DIR: str = "logs"
     LOG_FILE: str = "app.log"
+    log_level: str = "INFO"
+    log_handlers: List[str] = ["file", "console"]
+    log_file_max_bytes: int = 5 * 1024 * 1024
+    log_file_backup_count: int = 3
+    log_queue_size: int = 10000  # 0 - запись в обработчики прямо в вызывающем потоке
+    access_log_enabled: bool = True
+    ACCESS_LOG_FILE: str = "access.log"
+    access_log_handlers: List[str] = ["file"]
+    metrics_enabled: bool = True
+    metrics_token: str = ""  # Bearer-токен для GET /metrics; пустой - эндпоинт не подключается
+
+    slow_query_threshold_ms: float = 200  # 0 - медленные запросы не логируются
+    n_plus_one_threshold: int = 10  # повторов одной формы запроса за HTTP-запрос; 0 - поиск N+1 отключён
+    query_budget_strict: bool = False  # True в тестах: превышение бюджета запросов маршрута - ошибка 500
 
     app_name: str = "Syrup Chat API"
     debug: bool = False
@@ -17,15 +31,62 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_access_token_expire_minutes: int = 15
     jwt_refresh_token_expire_days: int = 7
+    jwt_signer: str = "jose"  # jose | native (облегчённый HS256)
+    jwt_cache_ttl_seconds: float = 300
+    jwt_cache_max_size: int = 10000
 
     jwt_access_cookie_name: str = "access_token"
     jwt_refresh_cookie_name: str = "refresh_token"
 
+    user_cache_ttl_seconds: float = 60
+    user_cache_max_size: int = 10000
+    auth_trust_token_claims: bool = False
+
+    bcrypt_rounds: int = 12
+    bcrypt_max_workers: int = 4
+    bcrypt_max_pending: int = 32
+
     cors_origins: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
     host: str = "127.0.0.1"
     port: int = 8000
-    
+
+    page_size_default: int = 20
+    page_size_max: int = 100
+
+    export_batch_size: int = 1000
+
+    like_reconcile_interval_seconds: float = 3600  # 0 - фоновая сверка счётчиков лайков отключена
+    like_buffer_enabled: bool = False
+    like_buffer_flush_ms: int = 200
+    like_buffer_max_pending: int = 10000
+    like_buffer_wait_for_flush: bool = False  # True - ответ только после записи пачки в БД
+
+    avatar_storage_backend: str = "local"
+    avatar_storage_dir: str = "media/avatars"
+    avatar_url_prefix: str = "/avatars"
+    avatar_max_bytes: int = 2 * 1024 * 1024
+    avatar_cache_max_age_seconds: int = 31536000
+    avatar_thumbnail_sizes: List[int] = [32, 64, 256]
+    avatar_thumbnail_quality: int = 80
+    avatar_thumbnail_max_workers: int = 2
+    avatar_thumbnail_max_pending: int = 16
+    avatar_chat_list_size: int = 64
+
+    response_cache_backend: str = "memory"  # memory | redis | none
+    response_cache_ttl_seconds: float = 60
+    response_cache_max_size: int = 5000
+    response_cache_key_prefix: str = "syrup:cache:"
+    history_feed_cache_ttl_seconds: float = 5  # счётчики лайков и комментариев в ленте отстают не больше чем на это время
+
+    ws_send_timeout_seconds: float = 5.0
+    ws_send_queue_size: int = 100
+    ws_send_queue_policy: str = "drop_oldest"  # drop_oldest | coalesce | disconnect
+
+    broadcast_backend: str = "memory"  # memory | redis
+    redis_url: str = "redis://localhost:6379/0"
+    broadcast_channel_prefix: str = "syrup:room:"
+
     model_config = {
         "env_file": ".env",
         "case_sensitive": False,
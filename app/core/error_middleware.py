@@ -1,43 +1,70 @@
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI, HTTPException, Request
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from exceptions.base import ValidationError, PermissionError, DatabaseError, UnknownDatabaseError
-from exceptions.users import UserNotFoundError, UserAlreadyExistsError, InvalidCredentialsError, InvalidUserDataError
-from exceptions.comment import CommentNotFoundError, OwnershipCommentError
-from exceptions.histories import HistoryNotFoundError, OwnershipHistoryError
-from exceptions.like import LikeNotFoundError, OwnershipLikeError
-from exceptions.message import MessageNotFoundError, OwnershipMessageError
+from exceptions import APP_EXCEPTIONS
 
-from core.logger import app_logger  
+from core.logger import app_logger
+from core.responses import ORJSONResponse, dumps
+
+
+async def app_exception_handler(request: Request, exc: HTTPException) -> ORJSONResponse:
+    """Ответ для исключений приложения: статус, detail и заголовки исключения (например, Retry-After)"""
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers=exc.headers,
+    )
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    """Регистрирует обработчик для каждого исключения из реестра exceptions.APP_EXCEPTIONS"""
+    for exc_class in APP_EXCEPTIONS:
+        app.add_exception_handler(exc_class, app_exception_handler)
+
+
+_INTERNAL_ERROR_BODY = dumps({
+    "error": "Внутренняя ошибка сервера. Попробуйте позже.",
+    "status_code": HTTP_500_INTERNAL_SERVER_ERROR
+})
+
+
+class ErrorHandlerMiddleware:
+    """
+    Чистый ASGI-middleware для необработанных исключений: логирует их и отвечает 500.
+    Исключения приложения обрабатываются раньше, зарегистрированными обработчиками.
+    В отличие от BaseHTTPMiddleware не создаёт задачу и поток на запрос и не буферизует потоковые ответы
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
         try:
-            response = await call_next(request)
-            return response
-        except (
-            ValidationError, PermissionError, DatabaseError, UnknownDatabaseError,
-            UserNotFoundError, UserAlreadyExistsError, InvalidCredentialsError, InvalidUserDataError,
-            CommentNotFoundError, OwnershipCommentError,
-            HistoryNotFoundError, OwnershipHistoryError,
-            LikeNotFoundError, OwnershipLikeError,
-            MessageNotFoundError, OwnershipMessageError
-        ) as exc:
-            return JSONResponse(
-                status_code=exc.status_code,
-                content={
-                    "error": exc.detail,
-                    "status_code": exc.status_code
-                }
-            )
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            app_logger.exception(f"Неизвестная ошибка Traceback: {exc.__traceback__}")
-            return JSONResponse(
-                status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-                content={
-                    "error": "Внутренняя ошибка сервера. Попробуйте позже.",
-                    "status_code": HTTP_500_INTERNAL_SERVER_ERROR
-                }
-            ) 
+            app_logger.exception("Неизвестная ошибка при обработке %s %s: %r", scope['method'], scope['path'], exc)
+            if response_started:
+                # Заголовки уже отправлены - ответ 500 отдать нельзя, соединение закроет сервер
+                raise
+            await send({
+                "type": "http.response.start",
+                "status": HTTP_500_INTERNAL_SERVER_ERROR,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_INTERNAL_ERROR_BODY)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": _INTERNAL_ERROR_BODY})
@@ -0,0 +1,46 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+def weak_etag(*parts: Any) -> str:
+    """Слабый ETag из версии ресурса: (id, updated_at), дайджест страницы и т.п."""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def _opaque(etag: str) -> str:
+    """Значение ETag без префикса W/ - для слабого сравнения"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Проверяет If-None-Match (слабое сравнение, список значений и *)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    expected = _opaque(etag)
+    return any(_opaque(candidate) == expected for candidate in header.split(","))
+
+
+def check_etag(request: Request,
+               response: Response,
+               etag: str,
+               cache_control: str = "no-cache") -> Optional[Response]:
+    """
+    Выставляет валидаторы ответа и возвращает готовый 304, если версия у клиента совпадает.
+    Вызывается до загрузки и сериализации тела:
+
+        not_modified = check_etag(request, response, weak_etag(id, updated_at))
+        if not_modified:
+            return not_modified
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
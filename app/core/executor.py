@@ -0,0 +1,37 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from exceptions.base import ServiceUnavailableError
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    Пул потоков для блокирующих CPU-задач с ограничением очереди
+        - max_workers - число потоков
+        - max_pending - максимум задач в работе и в очереди; сверх него сразу ServiceUnavailableError
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int) -> None:
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._max_pending = max_pending
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self._max_pending:
+            raise ServiceUnavailableError()
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
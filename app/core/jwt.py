@@ -1,18 +1,137 @@
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 
-from jose import jwt
+from jose import jwt, JWTError, ExpiredSignatureError
 
+from core.cache import TTLCache
 from core.config import settings
 from core.logger import app_logger
 from exceptions.base import ValidationError
 
 
+class TokenSigner(ABC):
+    """Кодирование токена и проверка подписи; ошибки проверки — JWTError"""
+
+    @abstractmethod
+    def encode(self, claims: dict) -> str:
+        ...
+
+    @abstractmethod
+    def decode(self, token: str) -> dict:
+        ...
+
+
+class JoseSigner(TokenSigner):
+    """Подпись через python-jose (любой поддерживаемый алгоритм)"""
+
+    def __init__(self, secret: str, algorithm: str) -> None:
+        self.secret = secret
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        return jwt.decode(token, self.secret, algorithms=[self.algorithm])
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class HS256Signer(TokenSigner):
+    """Облегчённая реализация HS256 на hmac/hashlib, совместимая с токенами python-jose"""
+
+    _header = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+    def __init__(self, secret: str) -> None:
+        self._key = secret.encode("utf-8")
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._key, signing_input, hashlib.sha256).digest()
+
+    def encode(self, claims: dict) -> str:
+        claims = {
+            key: calendar.timegm(value.utctimetuple()) if isinstance(value, datetime) else value
+            for key, value in claims.items()
+        }
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        signing_input = self._header + b"." + payload
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode("ascii")
+
+    def decode(self, token: str) -> dict:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            signing_input = f"{header_segment}.{payload_segment}".encode("ascii")
+            signature = _b64decode(signature_segment)
+            header = json.loads(_b64decode(header_segment))
+        except ValueError:
+            raise JWTError("Неверный формат токена")
+        if not isinstance(header, dict):
+            raise JWTError("Неверный формат токена")
+        if header.get("alg") != "HS256":
+            raise JWTError("Неподдерживаемый алгоритм токена")
+        if not hmac.compare_digest(signature, self._sign(signing_input)):
+            raise JWTError("Неверная подпись токена")
+        try:
+            payload = json.loads(_b64decode(payload_segment))
+        except ValueError:
+            raise JWTError("Неверный формат токена")
+        if not isinstance(payload, dict):
+            raise JWTError("Неверный формат токена")
+        exp = payload.get("exp")
+        if exp is not None:
+            # Как и python-jose: exp - число секунд (bool - подкласс int, но не время)
+            if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+                raise JWTError("Неверное значение exp в токене")
+            if exp < time.time():
+                raise ExpiredSignatureError("Срок действия токена истёк")
+        return payload
+
+
+def create_signer() -> TokenSigner:
+    """Создаёт подписчик согласно settings.jwt_signer (jose | native)"""
+    if settings.jwt_signer == "native":
+        if settings.jwt_algorithm != "HS256":
+            raise ValueError(f"Облегчённый подписчик поддерживает только HS256, указан {settings.jwt_algorithm}")
+        return HS256Signer(settings.jwt_secret_key)
+    if settings.jwt_signer == "jose":
+        return JoseSigner(settings.jwt_secret_key, settings.jwt_algorithm)
+    raise ValueError(f"Неизвестный подписчик JWT: {settings.jwt_signer}")
+
+
+signer: TokenSigner = create_signer()
+
+# Проверенные токены: token -> payload; запись живёт не дольше exp токена
+_verified_tokens: TTLCache[str, dict] = TTLCache(
+    max_size=settings.jwt_cache_max_size,
+    ttl=settings.jwt_cache_ttl_seconds,
+)
+
+
+def set_signer(new_signer: TokenSigner) -> None:
+    """Заменяет подписчик и сбрасывает кэш проверенных токенов"""
+    global signer
+    signer = new_signer
+    _verified_tokens.clear()
+
+
 def create_access_token(data: dict) -> str:
     """Создает access токен"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.jwt_access_token_expire_minutes)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return signer.encode(to_encode)
 
 
 def create_refresh_token(data: dict) -> str:
@@ -20,14 +139,18 @@ def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.jwt_refresh_token_expire_days)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return signer.encode(to_encode)
 
 
 def decode_token(token: str) -> dict:
-    """Декодирует токен"""
-    payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-    sub = payload.get("sub")
-    if not sub:
-        app_logger.warning(f"В токене отсутствует sub {payload=}")
-        raise ValidationError("Invalid token")
-    return payload
+    """Декодирует токен; повторная проверка одного и того же токена берётся из кэша"""
+    payload = _verified_tokens.get(token)
+    if payload is None:
+        payload = signer.decode(token)
+        sub = payload.get("sub")
+        if not sub:
+            app_logger.warning("В токене отсутствует sub payload=%r", payload)
+            raise ValidationError("Invalid token")
+        exp = payload.get("exp")
+        _verified_tokens.set(token, payload, ttl=exp - time.time() if exp is not None else None)
+    return dict(payload)
@@ -1,40 +1,125 @@
+import atexit
+import copy
 import os
+import queue
 
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from colorlog import ColoredFormatter
 
+from core.config import settings
+from core.metrics import metrics_registry
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Кладёт записи в ограниченную очередь, не блокируя вызывающий код.
+    При переполнении запись отбрасывается и учитывается в dropped; когда место освобождается,
+    в лог уходит предупреждение с числом пропущенных записей
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._reported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # В вызывающем потоке только подставляются аргументы: форматирование, время и traceback -
+        # в потоке QueueListener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Вызывается под блокировкой обработчика, поэтому счётчики без отдельного lock
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped > self._reported:
+            missed = self.dropped - self._reported
+            warning = logging.LogRecord(
+                record.name, logging.WARNING, __file__, 0,
+                f"Очередь логов была переполнена, пропущено записей: {missed}", None, None,
+            )
+            try:
+                self.queue.put_nowait(warning)
+                self._reported = self.dropped
+            except queue.Full:
+                pass
+
+
 class AppLogger:
-    def __init__(self, name: str = "app", log_dir: str = "logs"):
+    """
+    Логгер приложения. Уровень и обработчики по умолчанию берутся из настроек (log_level, log_handlers).
+    При log_queue_size > 0 запись в файл и консоль идёт в фоновом потоке QueueListener,
+    а вызовы логгера в обработчиках запросов только кладут запись в очередь.
+        - message_only - писать только текст записи, без времени и уровня (строки JSON access-лога)
+    """
+
+    def __init__(self,
+                 name: str = "app",
+                 log_dir: str = settings.LOG_DIR,
+                 log_file: str = settings.LOG_FILE,
+                 handlers: list[str] = settings.log_handlers,
+                 level: str = settings.log_level,
+                 message_only: bool = False):
         self.name = name
         self.log_dir = log_dir
+        self.log_file = log_file
+        self.handler_names = handlers
+        self.message_only = message_only
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(level.upper())
         self.logger.propagate = False
-
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        self.queue_handler: DroppingQueueHandler | None = None
+        self.listener: QueueListener | None = None
 
         if not self.logger.handlers:
-            self._setup_file_handler()
-            self._setup_console_handler()
+            handlers = self._create_handlers()
+            if settings.log_queue_size > 0:
+                self.queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+                self.listener = QueueListener(self.queue_handler.queue, *handlers, respect_handler_level=True)
+                self.listener.start()
+                atexit.register(self.stop)
+                self.logger.addHandler(self.queue_handler)
+            else:
+                for handler in handlers:
+                    self.logger.addHandler(handler)
+
+    def _create_handlers(self) -> list[logging.Handler]:
+        factories = {"file": self._create_file_handler, "console": self._create_console_handler}
+        unknown = set(self.handler_names) - factories.keys()
+        if unknown:
+            raise ValueError(f"Неизвестные обработчики логов: {sorted(unknown)}")
+        return [factories[name]() for name in self.handler_names]
 
-    def _setup_file_handler(self):
+    def _create_file_handler(self) -> logging.Handler:
+        if not os.path.exists(self.log_dir):
+            os.makedirs(self.log_dir)
         file_handler = RotatingFileHandler(
-            filename=os.path.join(self.log_dir, f"{self.name}.log"),
-            maxBytes=5 * 1024 * 1024,  # 5 MB
-            backupCount=3,
+            filename=os.path.join(self.log_dir, self.log_file),
+            maxBytes=settings.log_file_max_bytes,
+            backupCount=settings.log_file_backup_count,
             encoding="utf-8"
         )
-        formatter = logging.Formatter(
-            fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
+        if self.message_only:
+            formatter = logging.Formatter(fmt="%(message)s")
+        else:
+            formatter = logging.Formatter(
+                fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S"
+            )
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        return file_handler
 
-    def _setup_console_handler(self):
+    def _create_console_handler(self) -> logging.Handler:
         console_handler = logging.StreamHandler()
+        if self.message_only:
+            console_handler.setFormatter(logging.Formatter(fmt="%(message)s"))
+            return console_handler
         color_formatter = ColoredFormatter(
             fmt="%(log_color)s%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
             datefmt="%H:%M:%S",
@@ -47,7 +132,18 @@ class AppLogger:
             }
         )
         console_handler.setFormatter(color_formatter)
-        self.logger.addHandler(console_handler)
+        return console_handler
+
+    @property
+    def dropped(self) -> int:
+        """Число записей, отброшенных из-за переполнения очереди"""
+        return self.queue_handler.dropped if self.queue_handler is not None else 0
+
+    def stop(self) -> None:
+        """Дописывает оставшиеся в очереди записи и останавливает фоновый поток"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
 
     def get_logger(self):
         return self.logger
@@ -67,4 +163,21 @@ class AppLogger:
     def critical(self, msg, *args, **kwargs):
         self.logger.critical(msg, *args, **kwargs)
 
-app_logger = AppLogger(__name__).get_logger()
+app_logging = AppLogger(__name__)
+app_logger = app_logging.get_logger()
+
+# Access-лог: одна строка JSON на запрос (core.access_log.AccessLogMiddleware)
+access_logging = AppLogger(
+    "access",
+    log_file=settings.ACCESS_LOG_FILE,
+    handlers=settings.access_log_handlers,
+    level="INFO",
+    message_only=True,
+)
+access_logger = access_logging.get_logger()
+
+
+@metrics_registry.collector("log_records_dropped_total", "Записи лога, отброшенные из-за переполнения очереди", "counter")
+def _collect_dropped_records():
+    yield {"logger": "app"}, app_logging.dropped
+    yield {"logger": "access"}, access_logging.dropped
@@ -0,0 +1,213 @@
+"""
+Метрики приложения в текстовом формате Prometheus без сторонних зависимостей.
+
+Метрики обновляются только из потока event loop, поэтому обходятся без блокировок:
+наблюдение - это поиск корзины (bisect) и увеличение счётчиков в словаре по кортежу меток.
+Значения, которые дешевле прочитать при сборе (пул соединений, WebSocket-подключения),
+отдаются через коллекторы - функции, вызываемые при рендеринге /metrics
+"""
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence
+
+LabelValues = tuple[str, ...]
+Sample = tuple[str, dict[str, str], float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        """Сэмплы метрики: имя ряда, метки и значение"""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+    def _labels(self, values: LabelValues) -> dict[str, str]:
+        return dict(zip(self.label_names, values))
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        for values, value in self._values.items():
+            yield self.name, self._labels(values), value
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    """Гистограмма: на каждое наблюдение увеличивается одна корзина, накопительные суммы считаются при рендеринге"""
+    type_name = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # {метки: [счётчики корзин..., счётчик +Inf, сумма]}
+        self._values: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        counts = self._values.get(label_values)
+        if counts is None:
+            counts = self._values[label_values] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for values, counts in self._values.items():
+            labels = self._labels(values)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, counts[-1]
+
+
+class Summary(Metric):
+    """Число и сумма наблюдений без квантилей"""
+    type_name = "summary"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        entry = self._values.get(label_values)
+        if entry is None:
+            self._values[label_values] = [1, value]
+        else:
+            entry[0] += 1
+            entry[1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for values, (count, total) in self._values.items():
+            labels = self._labels(values)
+            yield f"{self.name}_count", labels, count
+            yield f"{self.name}_sum", labels, total
+
+
+class CollectedMetric(Metric):
+    """Метрика, значения которой вычисляются при сборе функцией collect() -> [(метки, значение)]"""
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 type_name: str,
+                 collect: Callable[[], Iterable[tuple[dict[str, str], float]]]) -> None:
+        super().__init__(name, documentation)
+        self.type_name = type_name
+        self._collect = collect
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._collect():
+            yield self.name, labels, value
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self,
+                  name: str,
+                  documentation: str,
+                  labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def summary(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Summary:
+        return self.register(Summary(name, documentation, labels))
+
+    def collector(self,
+                  name: str,
+                  documentation: str,
+                  type_name: str = "gauge") -> Callable[[Callable], Callable]:
+        """Декоратор: регистрирует функцию как источник значений метрики"""
+        def decorator(collect: Callable[[], Iterable[tuple[dict[str, str], float]]]) -> Callable:
+            self.register(CollectedMetric(name, documentation, type_name, collect))
+            return collect
+        return decorator
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+http_requests_in_flight = metrics_registry.gauge(
+    "http_requests_in_flight", "Число HTTP-запросов в обработке"
+)
+http_requests_total = metrics_registry.counter(
+    "http_requests_total", "Число HTTP-запросов", ("method", "route", "status")
+)
+http_request_duration_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route")
+)
+db_manager_call_seconds = metrics_registry.summary(
+    "db_manager_call_seconds", "Время вызовов методов менеджеров БД", ("manager", "method")
+)
+db_manager_queries_total = metrics_registry.counter(
+    "db_manager_queries_total", "Число SQL-запросов, выполненных методами менеджеров БД", ("manager", "method")
+)
@@ -0,0 +1,21 @@
+import base64
+import json
+from datetime import datetime
+
+from exceptions.base import ValidationError
+
+
+def encode_cursor(timestamp: datetime, id: int) -> str:
+    """Кодирует позицию (timestamp, id) в непрозрачный курсор"""
+    raw = json.dumps([timestamp.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Декодирует курсор обратно в позицию (timestamp, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(timestamp), int(id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValidationError("Неверный курсор пагинации")
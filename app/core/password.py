@@ -0,0 +1,36 @@
+import bcrypt
+
+from core.config import settings
+from core.executor import BoundedExecutor
+
+password_executor = BoundedExecutor(
+    name="bcrypt",
+    max_workers=settings.bcrypt_max_workers,
+    max_pending=settings.bcrypt_max_pending,
+)
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+async def hash_password(password: str) -> str:
+    """Хэширует пароль в пуле потоков с текущей стоимостью bcrypt_rounds"""
+    return await password_executor.run(_hash, password, settings.bcrypt_rounds)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    """Проверяет пароль в пуле потоков"""
+    return await password_executor.run(_verify, password, password_hash)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Хэш создан с другой стоимостью, чем bcrypt_rounds (формат $2b$<cost>$...)"""
+    try:
+        return int(password_hash.split("$")[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
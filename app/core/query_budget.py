@@ -0,0 +1,40 @@
+from functools import wraps
+from typing import Callable, Union
+
+from core.config import settings
+from core.logger import app_logger
+from core.request_context import track_operation
+from exceptions.base import QueryBudgetExceededError
+
+Budget = Union[int, Callable[..., int]]
+
+
+def query_budget(max_queries: Budget) -> Callable[[Callable], Callable]:
+    """
+    Декоратор обработчика маршрута: ограничивает число SQL-запросов, выполненных в теле обработчика
+    (зависимости вроде get_current_user не учитываются).
+        - max_queries - число или функция от аргументов обработчика, если число запросов зависит от них:
+          @query_budget(lambda with_comments, **_: 4 if with_comments else 2)
+    При превышении в режиме query_budget_strict выбрасывается QueryBudgetExceededError -
+    так регрессия вида N+1 роняет тесты; иначе в лог пишется предупреждение.
+    Ставится под декоратором маршрута:
+        @router.get(...)
+        @query_budget(2)
+        async def handler(...): ...
+    Бюджет доступен как атрибут обработчика query_budget (для тестов маршрутов)
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        @wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            with track_operation() as stats:
+                result = await endpoint(*args, **kwargs)
+            budget = max_queries(**kwargs) if callable(max_queries) else max_queries
+            if stats.queries > budget:
+                message = f"{endpoint.__qualname__}: выполнено SQL-запросов {stats.queries}, бюджет {budget}"
+                if settings.query_budget_strict:
+                    raise QueryBudgetExceededError(message)
+                app_logger.warning("Превышен бюджет запросов: %s", message)
+            return result
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, AsyncIterator
+from urllib.parse import urlsplit
+
+
+class RedisError(Exception):
+    """Ошибка, возвращённая сервером Redis"""
+
+
+def _encode_command(*args: Any) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        else:
+            data = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Соединение с Redis закрыто")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode("utf-8")
+    if prefix == b"-":
+        raise RedisError(payload.decode("utf-8"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length == -1:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Неизвестный ответ Redis: {line!r}")
+
+
+class RedisConnection:
+    """
+    Минимальный асинхронный клиент Redis (протокол RESP2) поверх asyncio streams
+        - url - строка подключения вида redis://[:password@]host[:port][/db]
+    """
+
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip("/") or 0)
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self.execute("AUTH", self.password)
+        if self.db:
+            await self.execute("SELECT", self.db)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._reader = self._writer = None
+
+    async def execute(self, *args: Any) -> Any:
+        """Отправляет команду и возвращает ответ сервера"""
+        async with self._lock:
+            if not self.is_connected:
+                raise ConnectionError("Нет соединения с Redis")
+            self._writer.write(_encode_command(*args))
+            await self._writer.drain()
+            return await _read_reply(self._reader)
+
+
+class RedisPubSub(RedisConnection):
+    """
+    Соединение Redis в режиме подписки: команды отправляются без ожидания ответа,
+    подтверждения и сообщения читаются через listen()
+    """
+
+    async def subscribe(self, *channels: str) -> None:
+        await self._send("SUBSCRIBE", *channels)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        await self._send("UNSUBSCRIBE", *channels)
+
+    async def _send(self, *args: Any) -> None:
+        if not self.is_connected:
+            raise ConnectionError("Нет соединения с Redis")
+        self._writer.write(_encode_command(*args))
+        await self._writer.drain()
+
+    async def listen(self) -> AsyncIterator[tuple[str, bytes]]:
+        """Отдаёт пары (канал, данные) для пришедших сообщений"""
+        while True:
+            reply = await _read_reply(self._reader)
+            if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                yield reply[1].decode("utf-8"), reply[2]
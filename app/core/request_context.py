@@ -0,0 +1,73 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class RequestStats:
+    """
+    Статистика текущего запроса, которую собирают слои ниже HTTP:
+        - label - метод и путь запроса для сообщений в логе
+        - db_queries, db_time - число SQL-запросов и время в БД (события курсора SQLAlchemy)
+        - statement_counts - сколько раз выполнялся запрос каждой формы (поиск N+1)
+        - user_id - пользователь, если запрос аутентифицирован
+    """
+    label: str = ""
+    db_queries: int = 0
+    db_time: float = 0.0
+    statement_counts: dict[str, int] = field(default_factory=dict)
+    user_id: Optional[int] = None
+
+
+@dataclass
+class OperationStats:
+    """Статистика вызова метода менеджера БД: число SQL-запросов, включая вложенные вызовы"""
+    queries: int = 0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_operation_stats: ContextVar[Optional[OperationStats]] = ContextVar("operation_stats", default=None)
+
+
+def start_request(label: str = "") -> RequestStats:
+    """Начинает сбор статистики для запроса в текущем контексте"""
+    stats = RequestStats(label=label)
+    _request_stats.set(stats)
+    return stats
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Статистика текущего запроса или None вне запроса (фоновые задачи, миграции)"""
+    return _request_stats.get()
+
+
+@contextmanager
+def track_operation() -> Iterator[OperationStats]:
+    """Считает SQL-запросы внутри блока; по выходу они добавляются и к объемлющему блоку"""
+    parent = _operation_stats.get()
+    stats = OperationStats()
+    token = _operation_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _operation_stats.reset(token)
+        if parent is not None:
+            parent.queries += stats.queries
+
+
+def record_query(elapsed: float) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_time += elapsed
+    operation = _operation_stats.get()
+    if operation is not None:
+        operation.queries += 1
+
+
+def set_request_user(user_id: int) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.user_id = user_id
@@ -0,0 +1,207 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional
+
+from core.cache import TTLCache
+from core.config import settings
+from core.logger import app_logger
+from core.redis import RedisConnection, RedisError
+
+Loader = Callable[[], Awaitable[bytes]]
+
+
+class ResponseCacheBackend(ABC):
+    """Хранилище готовых тел ответов (bytes) и счётчиков поколений"""
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def get_generation(self, name: str) -> int:
+        ...
+
+    @abstractmethod
+    async def bump_generation(self, name: str) -> None:
+        ...
+
+
+class MemoryResponseCacheBackend(ResponseCacheBackend):
+    """Кэш в памяти процесса; другие процессы о сбросе не узнают - их записи живут до конца TTL"""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._entries: TTLCache[str, bytes] = TTLCache(max_size=max_size, ttl=ttl)
+        self._generations: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key)
+
+    async def get_generation(self, name: str) -> int:
+        return self._generations.get(name, 0)
+
+    async def bump_generation(self, name: str) -> None:
+        self._generations[name] = self._generations.get(name, 0) + 1
+
+
+class RedisResponseCacheBackend(ResponseCacheBackend):
+    """
+    Общий кэш процессов в Redis: записи с PX-временем жизни, поколения - счётчики INCR.
+    Соединение открывается при первом обращении и переоткрывается после обрыва
+    """
+
+    def __init__(self, url: str, key_prefix: str) -> None:
+        self._prefix = key_prefix
+        self._connection = RedisConnection(url)
+
+    async def _execute(self, *args) -> object:
+        try:
+            if not self._connection.is_connected:
+                await self._connection.connect()
+            return await self._connection.execute(*args)
+        except (ConnectionError, OSError):
+            await self._connection.close()
+            raise
+
+    async def close(self) -> None:
+        await self._connection.close()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._execute("GET", self._prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._execute("SET", self._prefix + key, value, "PX", max(int(ttl * 1000), 1))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._execute("DEL", *(self._prefix + key for key in keys))
+
+    async def get_generation(self, name: str) -> int:
+        value = await self._execute("GET", f"{self._prefix}gen:{name}")
+        return int(value) if value is not None else 0
+
+    async def bump_generation(self, name: str) -> None:
+        await self._execute("INCR", f"{self._prefix}gen:{name}")
+
+
+class ResponseCache:
+    """
+    Read-through кэш сериализованных ответов.
+        - get_or_load - отдаёт тело из кэша, иначе вызывает loader; одновременные промахи по одному ключу
+          ждут одну загрузку (single-flight), а не идут в БД каждый
+        - version - версия ресурса (например ETag): запись другой версии считается промахом
+        - поколения (generation) сбрасывают разом все ключи, в которые они входят, например страницы ленты
+    Ошибки бэкенда не роняют запрос: чтение превращается в промах, запись пропускается
+    """
+
+    def __init__(self, backend: ResponseCacheBackend | None, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    async def get_or_load(self,
+                          key: str,
+                          loader: Loader,
+                          ttl: Optional[float] = None,
+                          version: Optional[str] = None) -> bytes:
+        if not self.enabled:
+            return await loader()
+        prefix = f"{version}\n".encode("utf-8") if version is not None else b""
+        cached = await self._get(key)
+        if cached is not None and cached.startswith(prefix):
+            self.hits += 1
+            return cached[len(prefix):]
+        self.misses += 1
+        flight_key = f"{key}\n{version}"
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, ttl, prefix))
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda done: self._finish(flight_key, done))
+        # shield: отмена одного ожидающего не прерывает загрузку для остальных
+        return await asyncio.shield(task)
+
+    def _finish(self, flight_key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(flight_key, None)
+        if not task.cancelled():
+            # Исключение забирают ожидающие; если их не осталось - не пишем предупреждение в лог asyncio
+            task.exception()
+
+    async def _load(self, key: str, loader: Loader, ttl: Optional[float], prefix: bytes) -> bytes:
+        value = await loader()
+        try:
+            await self.backend.set(key, prefix + value, self.ttl if ttl is None else min(ttl, self.ttl))
+        except (ConnectionError, OSError, RedisError) as e:
+            app_logger.warning("Не удалось записать %s в кэш ответов: %r", key, e)
+        return value
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.backend.get(key)
+        except (ConnectionError, OSError, RedisError) as e:
+            app_logger.warning("Кэш ответов недоступен, %s загружается из БД: %r", key, e)
+            return None
+
+    async def invalidate(self, *keys: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            await self.backend.delete(*keys)
+        except (ConnectionError, OSError, RedisError) as e:
+            app_logger.error("Не удалось сбросить %s в кэше ответов: %r", keys, e)
+
+    async def generation(self, name: str) -> Optional[int]:
+        """Текущее поколение или None, если бэкенд недоступен - тогда кэш нужно обойти"""
+        if not self.enabled:
+            return None
+        try:
+            return await self.backend.get_generation(name)
+        except (ConnectionError, OSError, RedisError) as e:
+            app_logger.warning("Кэш ответов недоступен, поколение %s не получено: %r", name, e)
+            return None
+
+    async def bump_generation(self, name: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            await self.backend.bump_generation(name)
+        except (ConnectionError, OSError, RedisError) as e:
+            app_logger.error("Не удалось сменить поколение %s в кэше ответов: %r", name, e)
+
+
+def create_response_cache_backend() -> ResponseCacheBackend | None:
+    """Создаёт бэкенд кэша ответов согласно settings.response_cache_backend"""
+    if settings.response_cache_backend == "none":
+        return None
+    if settings.response_cache_backend == "memory":
+        return MemoryResponseCacheBackend(settings.response_cache_max_size, settings.response_cache_ttl_seconds)
+    if settings.response_cache_backend == "redis":
+        return RedisResponseCacheBackend(settings.redis_url, settings.response_cache_key_prefix)
+    raise ValueError(f"Неизвестный бэкенд кэша ответов: {settings.response_cache_backend}")
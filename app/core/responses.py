@@ -0,0 +1,51 @@
+import json
+from typing import Any, Mapping, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson не установлен: словари сериализуются стандартным json
+    orjson = None
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def dumps(content: Any) -> bytes:
+    """JSON в bytes: orjson, если установлен, иначе стандартный json"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class ORJSONResponse(Response):
+    """
+    JSON-ответ для словарей (сообщения, ошибки), сериализуемый через orjson.
+    Не назначается приложению по умолчанию: для маршрутов с моделью ответа FastAPI сам
+    сериализует её в bytes через Pydantic, а собственный response_class отключил бы этот путь
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """JSON-ответ с уже сериализованным телом: FastAPI не валидирует и не сериализует его повторно"""
+    media_type = "application/json"
+
+
+def dump_json(payload: BaseModel | list[BaseModel]) -> bytes:
+    """Сериализует уже провалидированную модель (или список моделей) в bytes одним проходом Pydantic"""
+    return to_json(payload)
+
+
+def json_response(payload: BaseModel | list[BaseModel] | bytes,
+                  status_code: int = 200,
+                  headers: Optional[Mapping[str, str]] = None) -> RawJSONResponse:
+    """
+    Ответ из модели, которую менеджер уже собрал и провалидировал, или из готовых bytes (например, из кэша).
+    Модель ответа маршрута остаётся в аннотации для документации, но к телу не применяется
+    """
+    body = payload if isinstance(payload, bytes) else dump_json(payload)
+    return RawJSONResponse(content=body, status_code=status_code, headers=headers)
@@ -3,6 +3,8 @@ from sqlalchemy.orm import declarative_base
 
 from core.config import settings
 from core.logger import app_logger
+from core.metrics import metrics_registry
+from database.instrumentation import instrument_engine
 
 engine = create_async_engine(
     url=settings.database_url, 
@@ -10,7 +12,22 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
-app_logger.info(f"Создан движок базы данных {settings.database_url}")
+app_logger.info("Создан движок базы данных %s", settings.database_url)
+
+instrument_engine(engine.sync_engine)
+
+
+@metrics_registry.collector("db_pool_connections", "Соединения пула SQLAlchemy по состоянию")
+def _collect_pool_stats():
+    pool = engine.pool
+    # NullPool/StaticPool (например, SQLite в памяти) не ведут учёт соединений
+    for state, reader in (("checked_out", "checkedout"), ("checked_in", "checkedin"), ("size", "size")):
+        if hasattr(pool, reader):
+            yield {"state": state}, getattr(pool, reader)()
+    if hasattr(pool, "overflow"):
+        # QueuePool ведёт overflow от -size: отрицательное значение - свободные места в пуле
+        yield {"state": "overflow"}, max(pool.overflow(), 0)
+
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -18,6 +35,6 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
-app_logger.info(f"Создана асинхронная сессия базы данных")
+app_logger.info("Создана асинхронная сессия базы данных")
 
 Base = declarative_base()
@@ -1,8 +1,16 @@
 from database.config import engine, Base
 from core.logger import app_logger
 
+def _create_missing_indexes(connection):
+    """create_all не добавляет новые индексы в уже существующие таблицы"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
 async def init_db():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all) 
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
 
-app_logger.info(f"База данных инициализирована")   
+app_logger.info("База данных инициализирована")   
@@ -0,0 +1,77 @@
+"""
+Инструментация движка SQLAlchemy через события курсора:
+    - время и число SQL-запросов в статистике текущего HTTP-запроса (access-лог, бюджет запросов)
+    - медленные запросы (slow_query_threshold_ms) пишутся в лог с формой запроса и типами параметров
+    - повтор одной формы запроса n_plus_one_threshold раз за HTTP-запрос помечается как возможный N+1
+Значения параметров в лог не попадают - только их типы
+"""
+import re
+import time
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+from core.logger import app_logger
+from core.request_context import current_request_stats, record_query
+
+_PLACEHOLDER_RE = re.compile(r"\?|\$\d+|%\(\w+\)s|%s|:\w+")
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    """
+    Форма запроса: плейсхолдеры всех драйверов приведены к ?, списки IN (?, ?, ...) свёрнуты,
+    пробелы схлопнуты. Запросы, отличающиеся только значениями параметров, имеют одну форму
+    """
+    shape = _PLACEHOLDER_RE.sub("?", statement)
+    shape = _PLACEHOLDER_LIST_RE.sub("(?, ...)", shape)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+def parameters_shape(parameters: Any, executemany: bool) -> str:
+    """Типы связанных параметров без значений: (int, str) или [N x (int, str)] для executemany"""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"[{len(parameters)} x {parameters_shape(parameters[0], False)}]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время начала хранится в контексте выполнения: при ошибке запроса after_cursor_execute не вызывается,
+    # и значение уходит вместе с контекстом, не накапливаясь на соединении пула
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started_at
+    record_query(elapsed)
+
+    if settings.slow_query_threshold_ms and elapsed * 1000 >= settings.slow_query_threshold_ms:
+        app_logger.warning(
+            "Медленный SQL-запрос %.1f мс: %s; параметры %s",
+            elapsed * 1000, statement_shape(statement), parameters_shape(parameters, executemany),
+        )
+
+    stats = current_request_stats()
+    if stats is None or not settings.n_plus_one_threshold:
+        return
+    shape = statement_shape(statement)
+    count = stats.statement_counts.get(shape, 0) + 1
+    stats.statement_counts[shape] = count
+    # Предупреждение один раз на форму запроса, когда повторов становится ровно столько, сколько в пороге
+    if count == settings.n_plus_one_threshold:
+        app_logger.warning("Возможный N+1 в %s: запрос выполнен %d раз: %s", stats.label, count, shape)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключает обработчики событий курсора к синхронному движку (engine.sync_engine для async)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
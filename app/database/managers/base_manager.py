@@ -1,5 +1,8 @@
+import functools
+import inspect
+import time
 from abc import ABC
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from typing import Generic, TypeVar, Type, Optional, List
 
 from pydantic import BaseModel
@@ -7,15 +10,48 @@ from sqlalchemy.future import select
 
 from database.managers.session_manager import Manager
 from exceptions.base import DatabaseError, ModelNotFoundError
+from core.config import settings
 from core.logger import app_logger
+from core.metrics import db_manager_call_seconds, db_manager_queries_total
+from core.request_context import track_operation
 
 TModel = TypeVar('TModel')
 TUpdate = TypeVar('TUpdate', bound=BaseModel)
 
 
+def _instrument(method):
+    """Обёртка метода менеджера: время вызова и число SQL-запросов по (менеджер, метод) для /metrics"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        with track_operation() as operation:
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                labels = (type(self).__name__, method.__name__)
+                db_manager_call_seconds.observe(time.perf_counter() - started, *labels)
+                if operation.queries:
+                    db_manager_queries_total.inc(*labels, amount=operation.queries)
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def _instrument_methods(cls: type) -> None:
+    """Оборачивает публичные корутины, объявленные в самом классе"""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(attr) or getattr(attr, "__instrumented__", False):
+            continue
+        setattr(cls, name, _instrument(attr))
+
+
 class BaseManager(ABC, Generic[TModel, TUpdate]):
     """Базовый менеджер для работы с моделями (асинхронный)"""
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if settings.metrics_enabled:
+            _instrument_methods(cls)
+
     def __init__(self, model: Type[TModel]) -> None:
         self._model = model
         self.manager = Manager()
@@ -30,7 +66,7 @@ class BaseManager(ABC, Generic[TModel, TUpdate]):
                 return obj
             except Exception as e:
                 await session.rollback()
-                app_logger.exception(f"{self._model.__name__} не создан Traceback: {e.__traceback__}")
+                app_logger.exception("%s не создан Traceback: %s", self._model.__name__, e.__traceback__)
                 raise DatabaseError
 
     async def get_obj_by_id(self, id: int, options: Optional[List] = None) -> TModel:
@@ -47,18 +83,23 @@ class BaseManager(ABC, Generic[TModel, TUpdate]):
                 )
                 obj = result.scalars().first()
                 if not obj:
-                    app_logger.error(f"{self._model.__name__} с id {id} не найден")
+                    app_logger.error("%s с id %s не найден", self._model.__name__, id)
                     raise ModelNotFoundError(f"{self._model.__name__} с id {id} не найден")
                 return obj
         except Exception as e:
-            app_logger.exception(f"{self._model.__name__} с id {id} не найден Traceback: {e.__traceback__}")
+            app_logger.exception("%s с id %s не найден Traceback: %s", self._model.__name__, id, e.__traceback__)
             raise DatabaseError
 
     async def get_all_obj(self,
                           options: Optional[List] = None,
                           skip: int = 0,
-                          limit: int = 100) -> Sequence[TModel]:
-        """Получение всех объектов с опциями и пагинацией (асинхронно)"""
+                          limit: int = 100,
+                          after_id: Optional[int] = None) -> Sequence[TModel]:
+        """
+        Получение всех объектов с опциями и пагинацией (асинхронно).
+        Если передан after_id, используется keyset-пагинация по id (объекты с id > after_id),
+        и skip игнорируется: глубокие страницы не сканируют пропущенные строки.
+        """
         if options is None:
             options = []
         try:
@@ -66,22 +107,44 @@ class BaseManager(ABC, Generic[TModel, TUpdate]):
                 query = select(self._model)
                 for option in options:
                     query = query.options(option)
-                query = query.offset(skip).limit(limit)
+                if after_id is not None:
+                    model_id = getattr(self._model, "id")
+                    query = query.where(model_id > after_id).order_by(model_id)
+                else:
+                    query = query.offset(skip)
+                query = query.limit(limit)
                 result = await session.execute(query)
-                if not result.scalars().all():
-                    app_logger.error(f"{self._model.__name__} не найдены")
+                objs = result.scalars().all()
+                if not objs:
+                    app_logger.error("%s не найдены", self._model.__name__)
                     raise ModelNotFoundError(f"{self._model.__name__} не найдены")
-                return result.scalars().all()
+                return objs
         except Exception as e:
-            app_logger.exception(f"{self._model.__name__} не найдены Traceback: {e.__traceback__}")
+            app_logger.exception("%s не найдены Traceback: %s", self._model.__name__, e.__traceback__)
             raise DatabaseError
 
+    async def stream_obj(self, *criteria) -> AsyncIterator[TModel]:
+        """
+        Потоковое чтение объектов по условиям в порядке id (асинхронно).
+        Строки читаются пачками по export_batch_size, весь результат в память не загружается.
+        """
+        async with self.manager.get_async_session() as session:
+            query = (
+                select(self._model)
+                .where(*criteria)
+                .order_by(getattr(self._model, "id"))
+                .execution_options(yield_per=settings.export_batch_size)
+            )
+            result = await session.stream_scalars(query)
+            async for obj in result:
+                yield obj
+
     async def update_obj(self, id: int, updated_obj: TUpdate) -> TModel:
         """Обновление объекта по id (асинхронно)"""
         async with self.manager.get_async_session() as session:
             obj = await session.get(self._model, int(id))
             if not obj:
-                app_logger.error(f"{self._model.__name__} с id {id} не найден")
+                app_logger.error("%s с id %s не найден", self._model.__name__, id)
                 raise ModelNotFoundError(f"{self._model.__name__} с id {id} не найден")
             data = updated_obj.model_dump(exclude_unset=True)
             for key, value in data.items():
@@ -96,8 +159,12 @@ class BaseManager(ABC, Generic[TModel, TUpdate]):
         async with self.manager.get_async_session() as session:
             obj = await session.get(self._model, int(id))
             if not obj:
-                app_logger.error(f"{self._model.__name__} с id {id} не найден")
+                app_logger.error("%s с id %s не найден", self._model.__name__, id)
                 raise ModelNotFoundError(f"{self._model.__name__} с id {id} не найден")
             await session.delete(obj)
             await session.commit()
             return obj
+
+
+if settings.metrics_enabled:
+    _instrument_methods(BaseManager)
@@ -1,5 +1,16 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+
 from database.models.comments import Comment
-from schemas.comment import CommentUpdate
+from schemas.comment import CommentUpdate, CommentThreadOut, CommentPage
+from exceptions.base import DatabaseError
+from core.logger import app_logger
+from core.pagination import encode_cursor, decode_cursor
 from .base_manager import BaseManager
 
 class CommentManager(BaseManager[Comment, CommentUpdate]):
@@ -8,3 +19,58 @@ class CommentManager(BaseManager[Comment, CommentUpdate]):
     """
     def __init__(self):
         super().__init__(Comment)
+
+    async def get_comments_by_history_id(self,
+                                         history_id: int,
+                                         limit: int,
+                                         cursor: Optional[str] = None) -> CommentPage:
+        """
+        Получение страницы комментариев истории с авторами (асинхронно).
+        Keyset-пагинация по индексу (history_id, created_at, id) от старых к новым,
+        автор подгружается в том же запросе.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        try:
+            async with self.manager.get_async_session() as session:
+                query = (
+                    select(Comment)
+                    .options(joinedload(Comment.user))
+                    .where(Comment.history_id == history_id)
+                    .order_by(Comment.created_at.asc(), Comment.id.asc())
+                    .limit(limit + 1)
+                )
+                if position is not None:
+                    query = query.where(tuple_(Comment.created_at, Comment.id) > tuple_(*position))
+                result = await session.execute(query)
+                comments = list(result.scalars().all())
+        except Exception as e:
+            app_logger.exception("Ошибка при получении комментариев истории %s", history_id)
+            raise DatabaseError(f"Ошибка при получении комментариев истории {history_id}")
+
+        next_cursor = None
+        if len(comments) > limit:
+            comments = comments[:limit]
+            next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+        return CommentPage(
+            items=[CommentThreadOut.model_validate(comment) for comment in comments],
+            next_cursor=next_cursor,
+        )
+
+    def stream_comments(self,
+                        since: Optional[datetime] = None,
+                        until: Optional[datetime] = None,
+                        user_id: Optional[int] = None,
+                        history_id: Optional[int] = None) -> AsyncIterator[Comment]:
+        """
+        Потоковое чтение комментариев для экспорта с фильтрами по времени создания, автору и истории
+        """
+        criteria = []
+        if since is not None:
+            criteria.append(Comment.created_at >= since)
+        if until is not None:
+            criteria.append(Comment.created_at < until)
+        if user_id is not None:
+            criteria.append(Comment.user_id == user_id)
+        if history_id is not None:
+            criteria.append(Comment.history_id == history_id)
+        return self.stream_obj(*criteria)
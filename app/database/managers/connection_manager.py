@@ -1,16 +1,247 @@
-from fastapi import WebSocket
+import asyncio
+from dataclasses import dataclass
+from typing import Callable
+
+from fastapi import WebSocket, status
+
+from core.broadcast import BroadcastBackend, create_broadcast_backend
+from core.config import settings
+from core.logger import app_logger
+from core.metrics import metrics_registry
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+QUEUE_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+
+@dataclass
+class HubMetrics:
+    """Счётчики исходящих очередей чата
+        - dropped - сообщения, вытесненные из переполненной очереди (drop_oldest) или из пакета сверх его предела (coalesce)
+        - coalesced - сообщения, объединённые в пакет при переполнении (coalesce)
+        - evicted - медленные клиенты, отключённые из-за переполнения или таймаута отправки
+    """
+    dropped: int = 0
+    coalesced: int = 0
+    evicted: int = 0
+
+
+# Код закрытия прежнего подключения, когда тот же пользователь подключился к комнате заново
+WS_REPLACED = 4000
+
+# Элемент очереди: сообщение или пакет сообщений, объединённых политикой coalesce
+QueueItem = str | list[str]
+
+
+def _frame(item: QueueItem) -> str:
+    """Кадр WebSocket: сообщение как есть, пакет - JSON-массив сообщений"""
+    if isinstance(item, str):
+        return item
+    return "[" + ",".join(item) + "]"
+
+
+class ClientConnection:
+    """
+    WebSocket-подключение с ограниченной очередью исходящих сообщений.
+    Очередь разбирается отдельной задачей записи, поэтому рассылка не ждёт медленных клиентов.
+        - on_slow - клиент не успевает принимать сообщения (политика disconnect или таймаут отправки)
+        - on_error - отправка упала: сокет закрыт или оборван, подключение нужно убрать
+    При политике coalesce переполненная очередь сворачивается в один пакет (JSON-массив)
+    из не более чем max_size последних сообщений, более старые отбрасываются
+    """
+
+    def __init__(self,
+                 websocket: WebSocket,
+                 on_slow: Callable[["ClientConnection"], None],
+                 on_error: Callable[["ClientConnection"], None],
+                 metrics: HubMetrics,
+                 max_size: int,
+                 policy: str) -> None:
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Неизвестная политика очереди: {policy}")
+        self.websocket = websocket
+        self.queue: asyncio.Queue[QueueItem] = asyncio.Queue(maxsize=max_size)
+        self._on_slow = on_slow
+        self._on_error = on_error
+        self._metrics = metrics
+        self._policy = policy
+        self._writer: asyncio.Task | None = None
+        self.evicted = False
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def stop(self) -> None:
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    async def close(self, code: int) -> None:
+        self.stop()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def send(self, message: str) -> None:
+        """Ставит сообщение в очередь, применяя политику переполнения"""
+        if self.evicted:
+            return
+        if self.queue.full():
+            if self._policy == DISCONNECT:
+                self._evict()
+                return
+            if self._policy == DROP_OLDEST:
+                self.queue.get_nowait()
+                self._metrics.dropped += 1
+            else:
+                pending = [self.queue.get_nowait() for _ in range(self.queue.qsize())]
+                messages = [item for entry in pending + [message] for item in ([entry] if isinstance(entry, str) else entry)]
+                batch = messages[-self.queue.maxsize:]
+                self._metrics.coalesced += len(pending)
+                self._metrics.dropped += len(messages) - len(batch)
+                self.queue.put_nowait(batch)
+                return
+        self.queue.put_nowait(message)
+
+    def _evict(self) -> None:
+        if not self.evicted:
+            self.evicted = True
+            self._on_slow(self)
+
+    async def _write_loop(self) -> None:
+        while True:
+            item = await self.queue.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(_frame(item)), timeout=settings.ws_send_timeout_seconds)
+            except asyncio.TimeoutError:
+                self._evict()
+                return
+            except Exception as e:
+                app_logger.info("Отправка в WebSocket не удалась, подключение убирается: %r", e)
+                if not self.evicted:
+                    self.evicted = True
+                    self._on_error(self)
+                return
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: dict[str, dict[str, WebSocket]] = {}
+    """
+    Менеджер WebSocket-подключений чата
+        - active_connections - локальные подключения процесса по комнатам: {room_id: {user_id: connection}}
+        - backend - бэкенд рассылки; процесс подписан на комнату, пока в ней есть его подключения
+        - metrics - счётчики переполнения очередей и отключений медленных клиентов
+    """
+    def __init__(self, backend: BroadcastBackend | None = None):
+        self.active_connections: dict[str, dict[str, ClientConnection]] = {}
+        self.metrics = HubMetrics()
+        self._background: set[asyncio.Task] = set()
+        self.backend = backend or create_broadcast_backend()
+        self.backend.set_handler(self._deliver_local)
+
+    async def start(self):
+        await self.backend.start()
+
+    async def stop(self):
+        await self.backend.stop()
 
     async def connect(self, room_id: str, user_id: str, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections[room_id][user_id] = websocket
+        connection = ClientConnection(
+            websocket,
+            on_slow=lambda conn: self._evict(room_id, user_id, conn),
+            on_error=lambda conn: self._schedule(self.disconnect(user_id, room_id, conn.websocket)),
+            metrics=self.metrics,
+            max_size=settings.ws_send_queue_size,
+            policy=settings.ws_send_queue_policy,
+        )
+        connection.start()
+        if room_id not in self.active_connections:
+            self.active_connections[room_id] = {}
+            await self.backend.subscribe(room_id)
+        previous = self.active_connections[room_id].get(user_id)
+        self.active_connections[room_id][user_id] = connection
+        if previous is not None:
+            # Прежний сокет закрывается: его обработчик получит отключение и выйдет из цикла чтения
+            await previous.close(code=WS_REPLACED)
 
-    async def disconnect(self, user_id: str, room_id: str):
-        self.active_connections[room_id].pop(user_id)
+    async def disconnect(self, user_id: str, room_id: str, websocket: WebSocket | None = None):
+        """Удаляет подключение; если передан websocket, удаляется только он (а не более новое подключение)"""
+        room = self.active_connections.get(room_id)
+        if room is None:
+            return
+        connection = room.get(user_id)
+        if connection is None or (websocket is not None and connection.websocket is not websocket):
+            return
+        del room[user_id]
+        connection.stop()
+        if not room:
+            del self.active_connections[room_id]
+            await self.backend.unsubscribe(room_id)
 
     async def send_to_room(self, room_id: str, message: str):
-        for connection in self.active_connections[room_id].values():
-            await connection.send_text(message)
+        """Публикует сообщение для всех участников комнаты во всех процессах"""
+        try:
+            await self.backend.publish(room_id, message)
+        except Exception as e:
+            app_logger.error("Не удалось опубликовать сообщение в комнату %s: %r", room_id, e)
+
+    def _deliver_local(self, room_id: str, message: str):
+        """Ставит сообщение в очереди локальных подключений комнаты, не дожидаясь отправки"""
+        for connection in list(self.active_connections.get(room_id, {}).values()):
+            connection.send(message)
+
+    def _evict(self, room_id: str, user_id: str, connection: ClientConnection):
+        self.metrics.evicted += 1
+        app_logger.warning("Пользователь %s отключён от комнаты %s: не успевает принимать сообщения", user_id, room_id)
+        self._schedule(self._drop(room_id, user_id, connection))
+
+    def _schedule(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _drop(self, room_id: str, user_id: str, connection: ClientConnection):
+        await self.disconnect(user_id, room_id, connection.websocket)
+        await connection.close(code=status.WS_1013_TRY_AGAIN_LATER)
+
+
+connection_manager: ConnectionManager = ConnectionManager()
+
+
+# Размеры комнат и очередей в метриках без id комнат и пользователей:
+# id комнат выбирают клиенты, а число рядов с ними не ограничено
+WS_ROOM_SIZE_BUCKETS = (1, 2, 5, 10)
+WS_QUEUE_DEPTH_BUCKETS = (0, 1, 10, 50, 100)
+
+
+@metrics_registry.collector("ws_connections", "Активные WebSocket-подключения процесса")
+def _collect_ws_connections():
+    yield {}, sum(len(room) for room in connection_manager.active_connections.values())
+
+
+@metrics_registry.collector("ws_rooms", "Комнаты с подключениями в процессе по числу подключений (le - не больше)")
+def _collect_ws_rooms():
+    sizes = [len(room) for room in connection_manager.active_connections.values()]
+    for bound in WS_ROOM_SIZE_BUCKETS:
+        yield {"le": str(bound)}, sum(size <= bound for size in sizes)
+    yield {"le": "+Inf"}, len(sizes)
+
+
+@metrics_registry.collector("ws_send_queue_depth",
+                            "Подключения процесса по глубине исходящей очереди (le - не больше)")
+def _collect_ws_queue_depths():
+    depths = [
+        connection.queue.qsize()
+        for room in connection_manager.active_connections.values()
+        for connection in room.values()
+    ]
+    for bound in WS_QUEUE_DEPTH_BUCKETS:
+        yield {"le": str(bound)}, sum(depth <= bound for depth in depths)
+    yield {"le": "+Inf"}, len(depths)
+
+
+@metrics_registry.collector("ws_queue_events_total", "События исходящих очередей чата", "counter")
+def _collect_hub_metrics():
+    for event_name, value in vars(connection_manager.metrics).items():
+        yield {"event": event_name}, value
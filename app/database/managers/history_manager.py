@@ -1,15 +1,21 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import List, Optional
 
+from sqlalchemy import and_, func, tuple_
 from sqlalchemy.orm import joinedload
 from sqlalchemy.future import select
 
 from exceptions.histories import HistoryNotFoundError
 from database.managers.base_manager import BaseManager
+from database.models.comments import Comment
 from database.models.history import History
-from schemas.history import HistoryUpdate, HistoryOut, HistoryOutShort
+from database.models.history_like import HistoryLike
+from schemas.history import HistoryUpdate, HistoryOut, HistoryOutShort, HistoryPage
 from exceptions.base import DatabaseError
 
 from core.logger import app_logger
+from core.pagination import encode_cursor, decode_cursor
 
 class HistoryManager(BaseManager[History, HistoryUpdate]):
     """
@@ -26,9 +32,66 @@ class HistoryManager(BaseManager[History, HistoryUpdate]):
             )
                 return result.scalars().first()
         except Exception as e:
-            app_logger.exception(f"История с id {id} не найдена")
+            app_logger.exception("История с id %s не найдена", id)
             raise DatabaseError(f"История с id {id} не найдена")
 
+    async def history_exists(self, id: int) -> bool:
+        """
+        Проверка существования истории по первичному ключу (асинхронно)
+        """
+        try:
+            async with self.manager.get_async_session() as session:
+                result = await session.execute(select(self._model.id).where(self._model.id == id))
+                return result.scalar() is not None
+        except Exception as e:
+            app_logger.exception("Ошибка при проверке истории %s", id)
+            raise DatabaseError(f"Ошибка при проверке истории {id}")
+
+    async def get_history_version(self, id: int, with_comments: bool = False) -> Optional[tuple]:
+        """
+        Лёгкий запрос версии истории для ETag без join автора: (id, created_at, updated_at, likes),
+        а с with_comments - ещё число, максимальный id и updated_at комментариев.
+        None, если истории нет
+        """
+        try:
+            async with self.manager.get_async_session() as session:
+                result = await session.execute(
+                    select(self._model.id, self._model.created_at, self._model.updated_at, self._model.likes)
+                    .where(self._model.id == id)
+                )
+                version = result.first()
+                if version is None:
+                    return None
+                if not with_comments:
+                    return tuple(version)
+                result = await session.execute(
+                    select(func.count(Comment.id), func.max(Comment.id), func.max(Comment.updated_at))
+                    .where(Comment.history_id == id)
+                )
+                return tuple(version) + tuple(result.first())
+        except Exception as e:
+            app_logger.exception("Ошибка при получении версии истории %s", id)
+            raise DatabaseError(f"Ошибка при получении версии истории {id}")
+
+    async def get_histories_digest_by_author_id(self, author_id: int, skip: int = 0, limit: int = 100) -> List[tuple]:
+        """
+        Версии историй автора для ETag страницы: (id, updated_at, likes) тех же строк,
+        что вернёт get_histories_by_author_id, без загрузки текстов
+        """
+        try:
+            async with self.manager.get_async_session() as session:
+                result = await session.execute(
+                    select(self._model.id, self._model.updated_at, self._model.likes)
+                    .where(self._model.author_id == author_id)
+                    .order_by(self._model.id)
+                    .offset(skip)
+                    .limit(limit)
+                )
+                return [tuple(row) for row in result.all()]
+        except Exception as e:
+            app_logger.exception("Ошибка при получении версий историй пользователя %s", author_id)
+            raise DatabaseError(f"Ошибка при получении версий историй пользователя {author_id}")
+
     async def _get_histories_by_author_id(self, author_id: int) -> List[History]:
         try:
             async with self.manager.get_async_session() as session:
@@ -37,24 +100,93 @@ class HistoryManager(BaseManager[History, HistoryUpdate]):
             )
                 return list(result.scalars().all())
         except Exception as e:
-            app_logger.exception(f"Истории с author_id {author_id} не найдены")
+            app_logger.exception("Истории с author_id %s не найдены", author_id)
             raise DatabaseError(f"Истории с author_id {author_id} не найдены")
 
-    async def get_histories_with_authors(self) -> List[HistoryOut]:
+    async def get_histories_with_authors(self,
+                                         limit: int,
+                                         cursor: Optional[str] = None,
+                                         viewer_id: Optional[int] = None) -> HistoryPage:
         """
-        Получение всех историй с авторами (асинхронно)
+        Получение страницы ленты историй с авторами (асинхронно).
+        Keyset-пагинация по (created_at, id) от новых к старым.
+        comments_count и likes_count считаются в том же запросе: id страницы выбираются в CTE,
+        а счётчики - сгруппированными подзапросами только по этим id.
+        Если передан viewer_id, liked_by_me заполняется через LEFT JOIN history_likes.
         """
+        position = decode_cursor(cursor) if cursor else None
+        order = (self._model.created_at.desc(), self._model.id.desc())
+        page = select(self._model.id).order_by(*order).limit(limit + 1)
+        if position is not None:
+            page = page.where(tuple_(self._model.created_at, self._model.id) < tuple_(*position))
+        page = page.cte("page")
+        comment_counts = (
+            select(Comment.history_id, func.count().label("n"))
+            .where(Comment.history_id.in_(select(page.c.id)))
+            .group_by(Comment.history_id)
+            .subquery("comment_counts")
+        )
+        like_counts = (
+            select(HistoryLike.history_id, func.count().label("n"))
+            .where(HistoryLike.history_id.in_(select(page.c.id)))
+            .group_by(HistoryLike.history_id)
+            .subquery("like_counts")
+        )
         try:
             async with self.manager.get_async_session() as session:
-                result = await session.execute(
-                    select(self._model).options(joinedload(self._model.author))
+                query = (
+                    select(
+                        self._model,
+                        func.coalesce(comment_counts.c.n, 0),
+                        func.coalesce(like_counts.c.n, 0),
+                    )
+                    .join(page, page.c.id == self._model.id)
+                    .outerjoin(comment_counts, comment_counts.c.history_id == self._model.id)
+                    .outerjoin(like_counts, like_counts.c.history_id == self._model.id)
+                    .options(joinedload(self._model.author))
+                    .order_by(*order)
                 )
-                histories = result.scalars().all()
-                return [HistoryOut.model_validate(history) for history in histories]
+                if viewer_id is not None:
+                    query = query.add_columns(HistoryLike.id.is_not(None).label("liked_by_me")).outerjoin(
+                        HistoryLike,
+                        and_(HistoryLike.history_id == self._model.id, HistoryLike.user_id == viewer_id),
+                    )
+                result = await session.execute(query)
+                rows = list(result.all())
         except Exception as e:
-            app_logger.exception(f"Ошибка при получении историй")
+            app_logger.exception("Ошибка при получении историй")
             raise DatabaseError(f"Ошибка при получении историй")
 
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][0].created_at, rows[-1][0].id)
+        items = []
+        for row in rows:
+            history_out = HistoryOut.model_validate(row[0])
+            history_out.comments_count = row[1]
+            history_out.likes_count = row[2]
+            if viewer_id is not None:
+                history_out.liked_by_me = bool(row[3])
+            items.append(history_out)
+        return HistoryPage(items=items, next_cursor=next_cursor)
+
+    def stream_histories(self,
+                         since: Optional[datetime] = None,
+                         until: Optional[datetime] = None,
+                         author_id: Optional[int] = None) -> AsyncIterator[History]:
+        """
+        Потоковое чтение историй для экспорта с фильтрами по времени создания и автору
+        """
+        criteria = []
+        if since is not None:
+            criteria.append(self._model.created_at >= since)
+        if until is not None:
+            criteria.append(self._model.created_at < until)
+        if author_id is not None:
+            criteria.append(self._model.author_id == author_id)
+        return self.stream_obj(*criteria)
+
     async def get_histories_by_author_id(self, author_id: int, skip: int = 0, limit: int = 100) -> List[HistoryOutShort]:
         """
         Получение всех историй конкретного пользователя (асинхронно)
@@ -64,13 +196,14 @@ class HistoryManager(BaseManager[History, HistoryUpdate]):
                 result = await session.execute(
                     select(self._model)
                     .where(self._model.author_id == author_id)
+                    .order_by(self._model.id)
                     .offset(skip)
                     .limit(limit)
                 )
                 histories = result.scalars().all()
                 return [HistoryOutShort.model_validate(h) for h in histories] if histories else []
         except Exception as e:
-            app_logger.exception(f"Ошибка при получении историй пользователя {author_id}")
+            app_logger.exception("Ошибка при получении историй пользователя %s", author_id)
             raise DatabaseError(f"Ошибка при получении историй пользователя {author_id}")
 
     async def get_history_by_id_with_author(self, id: int) -> HistoryOut | None:
@@ -87,7 +220,7 @@ class HistoryManager(BaseManager[History, HistoryUpdate]):
                     return None
                 return HistoryOut.model_validate(history)
         except Exception as e:
-            app_logger.exception(f"Ошибка при получении истории {id}")
+            app_logger.exception("Ошибка при получении истории %s", id)
             raise DatabaseError(f"Ошибка при получении истории {id}")
 
     async def create_history_with_response(self, history_obj: History) -> HistoryOut:
@@ -104,7 +237,7 @@ class HistoryManager(BaseManager[History, HistoryUpdate]):
                 history_with_author = result.scalars().first()
                 return HistoryOut.model_validate(history_with_author)
         except Exception as e:
-            app_logger.exception(f"Ошибка при создании истории")
+            app_logger.exception("Ошибка при создании истории")
             raise DatabaseError(f"Ошибка при создании истории") 
 
     async def delete_history_with_response(self, id: int) -> HistoryOut:
@@ -123,5 +256,5 @@ class HistoryManager(BaseManager[History, HistoryUpdate]):
                 await session.commit()
                 return HistoryOut.model_validate(history)
         except Exception as e:
-            app_logger.exception(f"Ошибка при удалении истории {id}")
+            app_logger.exception("Ошибка при удалении истории %s", id)
             raise DatabaseError(f"Ошибка при удалении истории {id}")
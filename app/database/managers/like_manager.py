@@ -1,11 +1,168 @@
+from collections.abc import Sequence
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.exc import IntegrityError
+
+from database.models.history import History
 from database.models.history_like import HistoryLike
 from schemas.like import LikeUpdate
+from exceptions.base import DatabaseError, ModelNotFoundError
+from core.logger import app_logger
 from .base_manager import BaseManager
 
 class LikeManager(BaseManager[HistoryLike, LikeUpdate]):
     """
-    Менеджер для работы с лайками (асинхронный)
+    Менеджер для работы с лайками (асинхронный).
+    Поддерживает денормализованный счётчик History.likes в той же транзакции, что и сам лайк
     """
     def __init__(self):
         super().__init__(HistoryLike)
-        
\ No newline at end of file
+
+    async def create_like(self, user_id: int, history_id: int) -> tuple[HistoryLike, bool]:
+        """
+        Ставит лайк и атомарно увеличивает счётчик истории.
+        Повторный лайк не ошибка: возвращается существующий лайк и created=False, счётчик не меняется
+        """
+        async with self.manager.get_async_session() as session:
+            try:
+                like = HistoryLike(user_id=user_id, history_id=history_id)
+                session.add(like)
+                await session.flush()
+                # updated_at присваивается сам себе: иначе onupdate отметит историю изменённой при каждом лайке
+                result = await session.execute(
+                    update(History)
+                    .where(History.id == history_id)
+                    .values(likes=History.likes + 1, updated_at=History.updated_at)
+                )
+                if result.rowcount == 0:
+                    await session.rollback()
+                    raise ModelNotFoundError(f"History с id {history_id} не найден")
+                await session.commit()
+                await session.refresh(like)
+                return like, True
+            except IntegrityError:
+                # uix_user_history_like: лайк уже есть (или истории не существует)
+                await session.rollback()
+            except ModelNotFoundError:
+                raise
+            except Exception as e:
+                await session.rollback()
+                app_logger.exception("Лайк не создан user_id=%s history_id=%s", user_id, history_id)
+                raise DatabaseError("Ошибка при создании лайка")
+
+            try:
+                result = await session.execute(
+                    select(HistoryLike).where(
+                        HistoryLike.user_id == user_id,
+                        HistoryLike.history_id == history_id,
+                    )
+                )
+                existing = result.scalars().first()
+            except Exception as e:
+                app_logger.exception("Ошибка при получении лайка user_id=%s history_id=%s", user_id, history_id)
+                raise DatabaseError("Ошибка при создании лайка")
+            if existing is None:
+                raise ModelNotFoundError(f"History с id {history_id} не найден")
+            return existing, False
+
+    async def create_obj(self, obj: HistoryLike) -> HistoryLike:
+        """Создание лайка через create_like, чтобы счётчик истории оставался согласованным"""
+        like, _ = await self.create_like(user_id=obj.user_id, history_id=obj.history_id)
+        return like
+
+    async def delete_obj(self, id: int) -> HistoryLike:
+        """Удаление лайка по id с атомарным уменьшением счётчика истории"""
+        async with self.manager.get_async_session() as session:
+            like = await session.get(HistoryLike, int(id))
+            if not like:
+                app_logger.error("HistoryLike с id %s не найден", id)
+                raise ModelNotFoundError(f"HistoryLike с id {id} не найден")
+            try:
+                await session.delete(like)
+                await session.execute(
+                    update(History)
+                    .where(History.id == like.history_id, History.likes > 0)
+                    .values(likes=History.likes - 1, updated_at=History.updated_at)
+                )
+                await session.commit()
+                return like
+            except Exception as e:
+                await session.rollback()
+                app_logger.exception("Лайк %s не удалён", id)
+                raise DatabaseError("Ошибка при удалении лайка")
+
+    async def delete_like(self, user_id: int, history_id: int) -> bool:
+        """
+        Снимает лайк пользователя с истории с атомарным уменьшением счётчика.
+        Возвращает False, если лайка не было
+        """
+        async with self.manager.get_async_session() as session:
+            try:
+                result = await session.execute(
+                    delete(HistoryLike)
+                    .where(HistoryLike.user_id == user_id, HistoryLike.history_id == history_id)
+                )
+                if result.rowcount == 0:
+                    await session.rollback()
+                    return False
+                await session.execute(
+                    update(History)
+                    .where(History.id == history_id, History.likes > 0)
+                    .values(likes=History.likes - 1, updated_at=History.updated_at)
+                )
+                await session.commit()
+                return True
+            except Exception as e:
+                await session.rollback()
+                app_logger.exception("Лайк не снят user_id=%s history_id=%s", user_id, history_id)
+                raise DatabaseError("Ошибка при удалении лайка")
+
+    async def get_liked_history_ids(self, user_id: int, history_ids: Sequence[int]) -> set[int]:
+        """
+        Возвращает те из history_ids, которые лайкнул пользователь.
+        Один запрос IN по индексу uix_user_history_like (user_id, history_id)
+        """
+        if not history_ids:
+            return set()
+        try:
+            async with self.manager.get_async_session() as session:
+                result = await session.execute(
+                    select(HistoryLike.history_id).where(
+                        HistoryLike.user_id == user_id,
+                        HistoryLike.history_id.in_(set(history_ids)),
+                    )
+                )
+                return set(result.scalars().all())
+        except Exception as e:
+            app_logger.exception("Ошибка при получении лайков пользователя %s", user_id)
+            raise DatabaseError("Ошибка при получении лайков")
+
+    async def reconcile_counts(self) -> dict[int, tuple[int, int]]:
+        """
+        Пересчитывает History.likes по таблице history_likes одним запросом на чтение и одним на запись.
+        Возвращает расхождения {history_id: (было, стало)}
+        """
+        actual = (
+            select(func.count(HistoryLike.id))
+            .where(HistoryLike.history_id == History.id)
+            .correlate(History)
+            .scalar_subquery()
+        )
+        try:
+            async with self.manager.get_async_session() as session:
+                result = await session.execute(
+                    select(History.id, History.likes, actual).where(History.likes != actual)
+                )
+                drift = {history_id: (stored, counted) for history_id, stored, counted in result.all()}
+                if drift:
+                    await session.execute(
+                        update(History)
+                        .where(History.id.in_(list(drift)))
+                        .values(likes=actual, updated_at=History.updated_at)
+                        .execution_options(synchronize_session=False)
+                    )
+                    await session.commit()
+                return drift
+        except Exception as e:
+            app_logger.exception("Ошибка при пересчёте счётчиков лайков")
+            raise DatabaseError("Ошибка при пересчёте счётчиков лайков")
@@ -1,6 +1,9 @@
+import hashlib
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, case, exists, func, tuple_
 from sqlalchemy.future import select
 
 from database.managers.user_manager import UserManager
@@ -8,15 +11,28 @@ from database.managers.base_manager import BaseManager
 from database.managers.session_manager import manager
 
 from database.models.message import Message
-from schemas.message import MessageUpdate
+from database.models.user import User
+from schemas.message import MessageUpdate, MessageOut, MessagePage
+from schemas.chat import ChatOut
 
-from exceptions.base import DatabaseError
+from exceptions.base import DatabaseError, ValidationError
 
 from core.logger import app_logger
+from core.pagination import encode_cursor, decode_cursor
 
 
 user_manager = UserManager()
 
+
+def direct_room_id(user1_id: int, user2_id: int) -> str:
+    """
+    Id комнаты личной переписки двух пользователей - MD5 от пары id в порядке возрастания.
+    Комнату без сообщений может занять только пара, для которой она вычислена
+    """
+    low, high = sorted((user1_id, user2_id))
+    return hashlib.md5(f"{low}:{high}".encode()).hexdigest()
+
+
 class MessageManager(BaseManager[Message, MessageUpdate]):
     def __init__(self):
         super().__init__(Message)
@@ -36,9 +52,26 @@ class MessageManager(BaseManager[Message, MessageUpdate]):
                 await session.refresh(message)
                 return message
         except Exception as e:
-            app_logger.exception(f"Ошибка при сохранении сообщения sender_id={sender_id}, receiver_id={receiver_id}")
+            app_logger.exception("Ошибка при сохранении сообщения sender_id=%s, receiver_id=%s", sender_id, receiver_id)
             raise DatabaseError(f"Ошибка при сохранении сообщения sender_id={sender_id}, receiver_id={receiver_id}")
 
+    def stream_messages(self,
+                        user_id: int,
+                        since: Optional[datetime] = None,
+                        until: Optional[datetime] = None,
+                        room_id: Optional[str] = None) -> AsyncIterator[Message]:
+        """
+        Потоковое чтение сообщений пользователя (отправленных и полученных) для экспорта
+        """
+        criteria = [or_(Message.sender_id == user_id, Message.receiver_id == user_id)]
+        if since is not None:
+            criteria.append(Message.timestamp >= since)
+        if until is not None:
+            criteria.append(Message.timestamp < until)
+        if room_id is not None:
+            criteria.append(Message.room_id == room_id)
+        return self.stream_obj(*criteria)
+
     async def get_history(self, room_id: str) -> List[Message]:
         try:
             async with manager.get_async_session() as session:
@@ -47,7 +80,7 @@ class MessageManager(BaseManager[Message, MessageUpdate]):
                 )
                 return list(result.scalars().all())
         except Exception as e:
-            app_logger.exception(f"Ошибка при получении истории сообщений room_id={room_id}")
+            app_logger.exception("Ошибка при получении истории сообщений room_id=%s", room_id)
             raise DatabaseError(f"Ошибка при получении истории сообщений room_id={room_id}")
 
     async def get_room_ids_by_user_id(self, user_id: int) -> List[str]:
@@ -58,7 +91,7 @@ class MessageManager(BaseManager[Message, MessageUpdate]):
                 )
                 return list(result.scalars().all())
         except Exception as e:
-            app_logger.exception(f"Ошибка при получении чатов user_id={user_id}")
+            app_logger.exception("Ошибка при получении чатов user_id=%s", user_id)
             raise DatabaseError(f"Ошибка при получении чатов user_id={user_id}")
 
     async def get_last_message_by_room_id(self, room_id: str) -> Optional[Message]:
@@ -69,14 +102,157 @@ class MessageManager(BaseManager[Message, MessageUpdate]):
                 )
                 return result.scalars().first()
         except Exception as e:
-            app_logger.exception(f"Ошибка при получении последнего сообщения room_id={room_id}")
+            app_logger.exception("Ошибка при получении последнего сообщения room_id=%s", room_id)
             raise DatabaseError(f"Ошибка при получении последнего сообщения room_id={room_id}")
 
-    async def get_history(self, room_id: str) -> List[Message]:
+    async def is_room_member(self, room_id: str, user_id: int) -> bool:
+        """
+        Проверка, что пользователь участвует в переписке комнаты: есть хотя бы одно сообщение комнаты,
+        где он отправитель или получатель. Комната без сообщений не принадлежит никому -
+        её занимает первое сообщение (см. direct_room_id)
+        """
         try:
             async with manager.get_async_session() as session:
-                result = await session.execute(select(Message).where(Message.room_id == room_id))
-                return list(result.scalars().all())
+                result = await session.execute(
+                    select(exists().where(
+                        Message.room_id == room_id,
+                        or_(Message.sender_id == user_id, Message.receiver_id == user_id),
+                    ))
+                )
+                return bool(result.scalar())
         except Exception as e:
-            app_logger.exception(f"Ошибка при получении истории сообщений room_id={room_id}")
+            app_logger.exception("Ошибка при проверке участника комнаты room_id=%s, user_id=%s", room_id, user_id)
+            raise DatabaseError(f"Ошибка при проверке участника комнаты room_id={room_id}")
+
+    async def get_companion_id(self, room_id: str, user_id: int) -> Optional[int]:
+        """Получение id собеседника пользователя в комнате по последнему сообщению"""
+        try:
+            async with manager.get_async_session() as session:
+                result = await session.execute(
+                    select(case((Message.sender_id == user_id, Message.receiver_id), else_=Message.sender_id))
+                    .where(Message.room_id == room_id,
+                           or_(Message.sender_id == user_id, Message.receiver_id == user_id))
+                    .order_by(Message.timestamp.desc(), Message.id.desc())
+                    .limit(1)
+                )
+                return result.scalars().first()
+        except Exception as e:
+            app_logger.exception("Ошибка при получении собеседника room_id=%s, user_id=%s", room_id, user_id)
+            raise DatabaseError(f"Ошибка при получении собеседника room_id={room_id}")
+
+    async def get_chats_by_user_id(self,
+                                   user_id: int,
+                                   limit: Optional[int] = None,
+                                   cursor: Optional[str] = None) -> tuple[List[ChatOut], Optional[str]]:
+        """
+        Получение чатов пользователя одним запросом: последнее сообщение каждой комнаты
+        вместе с логином и аватаром собеседника, по убыванию времени последнего сообщения
+        """
+        position = decode_cursor(cursor) if cursor else None
+        try:
+            async with manager.get_async_session() as session:
+                companion_id = case(
+                    (Message.sender_id == user_id, Message.receiver_id),
+                    else_=Message.sender_id,
+                )
+                ranked = (
+                    select(
+                        Message.id,
+                        Message.room_id,
+                        Message.text,
+                        Message.timestamp,
+                        Message.sender_id,
+                        companion_id.label("companion_id"),
+                        func.row_number().over(
+                            partition_by=Message.room_id,
+                            order_by=(Message.timestamp.desc(), Message.id.desc()),
+                        ).label("rn"),
+                    )
+                    .where(or_(Message.sender_id == user_id, Message.receiver_id == user_id))
+                    .subquery()
+                )
+                query = (
+                    select(ranked, User.login, User.avatar_url)
+                    .join(User, User.id == ranked.c.companion_id)
+                    .where(ranked.c.rn == 1)
+                    .order_by(ranked.c.timestamp.desc(), ranked.c.id.desc())
+                )
+                if position is not None:
+                    query = query.where(tuple_(ranked.c.timestamp, ranked.c.id) < tuple_(*position))
+                if limit is not None:
+                    query = query.limit(limit + 1)
+                rows = (await session.execute(query)).all()
+        except Exception as e:
+            app_logger.exception("Ошибка при получении чатов user_id=%s", user_id)
+            raise DatabaseError(f"Ошибка при получении чатов user_id={user_id}")
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+        chats = [
+            ChatOut(
+                companion_login=row.login,
+                companion_avatar_url=row.avatar_url,
+                last_message=row.text,
+                last_message_time=row.timestamp,
+                room_id=row.room_id,
+                from_me=row.sender_id == user_id,
+            )
+            for row in rows
+        ]
+        return chats, next_cursor
+
+    async def get_room_messages(self,
+                                room_id: str,
+                                user_id: int,
+                                limit: int,
+                                before: Optional[str] = None,
+                                after: Optional[str] = None) -> MessagePage:
+        """
+        Получение страницы сообщений комнаты в хронологическом порядке.
+        Без курсоров возвращаются последние сообщения; before - более старые, after - более новые.
+        Использует индекс (room_id, timestamp, id).
+        """
+        if before and after:
+            raise ValidationError("Нельзя одновременно передавать before и after")
+        position = decode_cursor(after or before) if (after or before) else None
+        key = tuple_(Message.timestamp, Message.id)
+        try:
+            async with manager.get_async_session() as session:
+                query = select(Message).where(Message.room_id == room_id).limit(limit + 1)
+                if after:
+                    query = query.where(key > tuple_(*position)).order_by(Message.timestamp.asc(), Message.id.asc())
+                else:
+                    if position is not None:
+                        query = query.where(key < tuple_(*position))
+                    query = query.order_by(Message.timestamp.desc(), Message.id.desc())
+                result = await session.execute(query)
+                messages = list(result.scalars().all())
+        except Exception as e:
+            app_logger.exception("Ошибка при получении истории сообщений room_id=%s", room_id)
             raise DatabaseError(f"Ошибка при получении истории сообщений room_id={room_id}")
+
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not after:
+            messages.reverse()
+        if not messages:
+            # Новых сообщений нет - клиент продолжает опрос с тем же курсором
+            return MessagePage(items=[], after_cursor=after)
+        has_older = has_more if not after else True
+        return MessagePage(
+            items=[
+                MessageOut(
+                    id=message.id,
+                    sender_id=message.sender_id,
+                    receiver_id=message.receiver_id,
+                    text=message.text,
+                    timestamp=message.timestamp,
+                    from_me=message.sender_id == user_id,
+                )
+                for message in messages
+            ],
+            before_cursor=encode_cursor(messages[0].timestamp, messages[0].id) if has_older else None,
+            after_cursor=encode_cursor(messages[-1].timestamp, messages[-1].id),
+        )
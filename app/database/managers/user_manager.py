@@ -1,23 +1,36 @@
+from typing import Optional
+
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 
-import bcrypt
-
 from database.managers.session_manager import manager
 from database.managers.base_manager import BaseManager
 
 from database.models.user import User
-from schemas.user import UpdateUser, UserAuth, UserCreate
+from schemas.user import UpdateUser, UserAuth, UserCreate, UserOut
 
 from exceptions.users import (
     UserAlreadyExistsError,
     UserNotFoundError,
     InvalidCredentialsError,
 )
-from exceptions.base import DatabaseError
+from exceptions.base import DatabaseError, ServiceUnavailableError
 
 
+from core.cache import TTLCache
+from core.config import settings
 from core.logger import app_logger
+from core.password import hash_password, verify_password, needs_rehash
+
+from services.avatar_storage import is_avatar_url, store_avatar
+
+# Кэш аутентифицированных пользователей по id; сбрасывается при изменении и удалении пользователя.
+# Кэш локален для процесса, в других воркерах устаревшая запись живёт не дольше user_cache_ttl_seconds.
+user_cache: TTLCache[int, User] = TTLCache(
+    max_size=settings.user_cache_max_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
 
 class UserManager(BaseManager[User, UpdateUser]):
     """
@@ -26,6 +39,26 @@ class UserManager(BaseManager[User, UpdateUser]):
     def __init__(self) -> None:
         super().__init__(User)
 
+    async def get_principal(self, id: int) -> User:
+        """Получение пользователя для аутентификации через кэш"""
+        user = user_cache.get(id)
+        if user is None:
+            user = await self.get_obj_by_id(id=id)
+            user_cache.set(id, user)
+        return user
+
+    async def update_obj(self, id: int, updated_obj: UpdateUser) -> User:
+        try:
+            return await super().update_obj(id=id, updated_obj=updated_obj)
+        finally:
+            user_cache.pop(int(id))
+
+    async def delete_obj(self, id: int) -> User:
+        try:
+            return await super().delete_obj(id=id)
+        finally:
+            user_cache.pop(int(id))
+
     async def get_user_by_login(self, login: str) -> User:
         """Получение пользователя по логину"""
         try:
@@ -36,9 +69,35 @@ class UserManager(BaseManager[User, UpdateUser]):
                     raise UserNotFoundError()
                 return user
         except Exception as e:
-            app_logger.exception(f"Неизвестная ошибка при получении пользователя по логину {login} Traceback: {e.__traceback__}")
+            app_logger.exception("Неизвестная ошибка при получении пользователя по логину %s Traceback: %s", login, e.__traceback__)
             raise DatabaseError()
 
+    async def get_profile(self, id: int) -> Optional[UserOut]:
+        """Публичные поля пользователя одним запросом по колонкам, без загрузки ORM-объекта"""
+        try:
+            async with manager.get_async_session() as session:
+                result = await session.execute(
+                    select(User.id, User.login, User.about, User.avatar_url, User.role).where(User.id == id)
+                )
+                row = result.first()
+                return UserOut.model_validate(row._mapping) if row else None
+        except Exception as e:
+            app_logger.exception("Ошибка при получении профиля пользователя %s", id)
+            raise DatabaseError()
+
+    async def get_avatar_url_by_login(self, login: str) -> Optional[str]:
+        """URL аватара по логину (только одна колонка); UserNotFoundError, если пользователя нет"""
+        try:
+            async with manager.get_async_session() as session:
+                result = await session.execute(select(User.avatar_url).where(User.login == login))
+                row = result.first()
+        except Exception as e:
+            app_logger.exception("Ошибка при получении аватара пользователя %s", login)
+            raise DatabaseError()
+        if row is None:
+            raise UserNotFoundError()
+        return row[0]
+
     async def get_user_id_by_login(self, login: str) -> int:
         """Получение id пользователя по логину"""
         try:
@@ -47,15 +106,18 @@ class UserManager(BaseManager[User, UpdateUser]):
                 raise UserNotFoundError()
             return getattr(user, "id", 0)
         except Exception as e:
-            app_logger.exception(f"Неизвестная ошибка при получении id пользователя по логину {login} Traceback: {e.__traceback__}")
+            app_logger.exception("Неизвестная ошибка при получении id пользователя по логину %s Traceback: %s", login, e.__traceback__)
             raise DatabaseError()
 
     async def create_user(self, user_create: UserCreate) -> User:
         """Создание пользователя, если пользователь с таким логином уже существует, то выбрасывается исключение"""
         password = user_create.password
         obj_dict = user_create.model_dump(exclude={"password"})
+        if not is_avatar_url(obj_dict["avatar_url"]):
+            # Встроенное изображение в users.avatar_url не храним, как и в PATCH /user/me
+            obj_dict["avatar_url"] = await store_avatar(obj_dict["avatar_url"])
         user = User(**obj_dict)
-        setattr(user, "password_hash", self._hash_password(password))
+        setattr(user, "password_hash", await self._hash_password(password))
         async with manager.get_async_session() as session:
             try:
                 session.add(user)
@@ -64,11 +126,11 @@ class UserManager(BaseManager[User, UpdateUser]):
                 return user
             except IntegrityError as e:
                 await session.rollback()
-                app_logger.exception(f"Попытка создания пользователя с логином {user_create.login}, который уже существует")
+                app_logger.exception("Попытка создания пользователя с логином %s, который уже существует", user_create.login)
                 raise UserAlreadyExistsError()
             except Exception as e:
                 await session.rollback()
-                app_logger.exception(f"Неизвестная ошибка при создании пользователя Traceback: {e.__traceback__}")
+                app_logger.exception("Неизвестная ошибка при создании пользователя Traceback: %s", e.__traceback__)
                 raise DatabaseError()
 
     async def check_user_data(self, user: UserAuth) -> User:
@@ -76,15 +138,32 @@ class UserManager(BaseManager[User, UpdateUser]):
         try:
             db_user = await self.get_user_by_login(user.login)
             if not db_user:
-                app_logger.warning(f"Пользователь {user.login} не найден")
+                app_logger.warning("Пользователь %s не найден", user.login)
                 raise UserNotFoundError()
             db_password_hash = getattr(db_user, "password_hash", None)
-            if db_password_hash and bcrypt.checkpw(user.password.encode("utf-8"), db_password_hash.encode("utf-8")):
+            if db_password_hash and await verify_password(user.password, db_password_hash):
+                if needs_rehash(db_password_hash):
+                    await self._rehash_password(db_user, user.password)
                 return db_user
             raise InvalidCredentialsError()
+        except (InvalidCredentialsError, ServiceUnavailableError) as e:
+            raise e
         except Exception as e:
-            app_logger.exception(f"Неизвестная ошибка при проверке данных пользователя {user.login} Traceback: {e}")
+            app_logger.exception("Неизвестная ошибка при проверке данных пользователя %s Traceback: %s", user.login, e)
             raise DatabaseError()
 
-    def _hash_password(self, password: str) -> str:
-        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    async def _hash_password(self, password: str) -> str:
+        return await hash_password(password)
+
+    async def _rehash_password(self, user: User, password: str) -> None:
+        """Пересчитывает хэш пароля с текущей стоимостью bcrypt; ошибка не мешает входу"""
+        try:
+            new_hash = await self._hash_password(password)
+            async with manager.get_async_session() as session:
+                await session.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+                await session.commit()
+            setattr(user, "password_hash", new_hash)
+            user_cache.pop(getattr(user, "id", 0))
+            app_logger.info("Хэш пароля пользователя %s пересчитан", user.login)
+        except Exception as e:
+            app_logger.warning("Не удалось пересчитать хэш пароля пользователя %s: %r", user.login, e)
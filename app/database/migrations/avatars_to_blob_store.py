@@ -0,0 +1,94 @@
+"""
+Миграция аватаров: base64 из users.avatar_url переносится в хранилище аватаров,
+в колонке остаётся короткий URL. Повторный запуск безопасен: уже перенесённые строки пропускаются.
+Предел avatar_max_bytes относится к новым загрузкам: уже сохранённые аватары переносятся любого размера,
+большие только учитываются в отчёте (oversize). --clear-invalid очищает лишь строки, которые не декодируются.
+
+Запуск из каталога app:
+    python -m database.migrations.avatars_to_blob_store [--batch-size 100] [--clear-invalid] [--dry-run]
+"""
+import argparse
+import asyncio
+
+from fastapi import HTTPException
+from sqlalchemy import and_, not_, or_, select, update
+
+from database.config import engine
+from database.managers.session_manager import manager
+from database.models.user import User
+from services.avatar_storage import avatar_storage, avatar_url_for, decode_avatar
+
+from core.config import settings
+from core.logger import app_logger
+
+
+def _inline_avatar_filter():
+    """Строки, где в avatar_url лежит не URL, а само изображение"""
+    return and_(
+        User.avatar_url.is_not(None),
+        User.avatar_url != "",
+        not_(or_(
+            User.avatar_url.startswith(settings.avatar_url_prefix + "/"),
+            User.avatar_url.startswith("http://"),
+            User.avatar_url.startswith("https://"),
+        )),
+    )
+
+
+async def migrate(batch_size: int, clear_invalid: bool, dry_run: bool) -> dict[str, int]:
+    stats = {"migrated": 0, "oversize": 0, "invalid": 0, "cleared": 0}
+    last_id = 0
+    while True:
+        async with manager.get_async_session() as session:
+            result = await session.execute(
+                select(User.id, User.avatar_url)
+                .where(User.id > last_id, _inline_avatar_filter())
+                .order_by(User.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            for user_id, encoded in rows:
+                try:
+                    data, ext = decode_avatar(encoded, max_bytes=None)
+                except HTTPException as e:
+                    stats["invalid"] += 1
+                    app_logger.warning("Аватар пользователя %s не перенесён: %s", user_id, e.detail)
+                    if clear_invalid and not dry_run:
+                        await session.execute(update(User).where(User.id == user_id).values(avatar_url=None))
+                        stats["cleared"] += 1
+                    continue
+                if len(data) > settings.avatar_max_bytes:
+                    stats["oversize"] += 1
+                    app_logger.info("Аватар пользователя %s больше avatar_max_bytes (%s байт), перенесён", user_id, len(data))
+                if not dry_run:
+                    key = await avatar_storage.save(data, ext)
+                    await session.execute(
+                        update(User).where(User.id == user_id).values(avatar_url=avatar_url_for(key))
+                    )
+                stats["migrated"] += 1
+            await session.commit()
+            last_id = rows[-1][0]
+    return stats
+
+
+async def main(batch_size: int, clear_invalid: bool, dry_run: bool) -> None:
+    try:
+        stats = await migrate(batch_size, clear_invalid, dry_run)
+    finally:
+        await engine.dispose()
+    mode = " (dry run)" if dry_run else ""
+    app_logger.info(
+        "Миграция аватаров завершена%s: перенесено %s (из них больше avatar_max_bytes %s), некорректных %s, очищено %s",
+        mode, stats['migrated'], stats['oversize'], stats['invalid'], stats['cleared'],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--clear-invalid", action="store_true", help="обнулить avatar_url, который не удалось декодировать")
+    parser.add_argument("--dry-run", action="store_true", help="только проверить, ничего не записывая")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.clear_invalid, args.dry_run))
@@ -4,6 +4,7 @@ from sqlalchemy import (
     Integer,
     ForeignKey,
     DateTime,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -42,3 +43,8 @@ class Comment(Base):
     
     user = relationship('User', back_populates='comments')
     history = relationship('History', back_populates='comments_rel')
+
+    __table_args__ = (
+        # Индекс для keyset-пагинации комментариев истории по (created_at, id)
+        Index('ix_comments_history_id_created_at_id', 'history_id', 'created_at', 'id'),
+    )
@@ -4,6 +4,7 @@ from sqlalchemy import (
     String,
     DateTime,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -52,3 +53,8 @@ class History(Base):
     comments_rel = relationship('Comment',
                                  back_populates='history',
                                  cascade='all, delete')
+
+    __table_args__ = (
+        # Индекс для keyset-пагинации ленты по (created_at, id)
+        Index('ix_histories_created_at_id', 'created_at', 'id'),
+    )
@@ -4,6 +4,7 @@ from sqlalchemy import (
     ForeignKey,
     UniqueConstraint,
     DateTime,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -43,4 +44,6 @@ class HistoryLike(Base):
         UniqueConstraint('user_id',
                          'history_id',
                          name='uix_user_history_like'),
+        # Индекс для подсчёта лайков истории (uix_user_history_like начинается с user_id)
+        Index('ix_history_likes_history_id', 'history_id'),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -20,7 +20,7 @@ class Message(Base):
     receiver_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     room_id = Column(String, nullable=False)
     text = Column(String, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow(), nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     sender = relationship('User',
                             foreign_keys=[sender_id],
@@ -29,3 +29,8 @@ class Message(Base):
     receiver = relationship('User',
                             foreign_keys=[receiver_id],
                             backref='received_messages')
+
+    __table_args__ = (
+        # Индекс для постраничной загрузки переписки комнаты по времени
+        Index('ix_messages_room_id_timestamp_id', 'room_id', 'timestamp', 'id'),
+    )
@@ -0,0 +1,24 @@
+from exceptions.base import (
+    ValidationError, PermissionError, DatabaseError, UnknownDatabaseError, ModelNotFoundError, ServiceUnavailableError,
+    QueryBudgetExceededError,
+)
+from exceptions.users import UserNotFoundError, UserAlreadyExistsError, InvalidCredentialsError, InvalidUserDataError
+from exceptions.comment import CommentNotFoundError, OwnershipCommentError
+from exceptions.histories import HistoryNotFoundError, OwnershipHistoryError
+from exceptions.like import LikeNotFoundError, OwnershipLikeError
+from exceptions.message import MessageNotFoundError, OwnershipMessageError, RoomAccessError
+from exceptions.avatar import InvalidAvatarError, AvatarTooLargeError, AvatarNotFoundError
+from exceptions.auth import MetricsAuthError
+
+# Реестр исключений приложения: для каждого регистрируется обработчик в core.error_middleware
+APP_EXCEPTIONS = (
+    ValidationError, PermissionError, DatabaseError, UnknownDatabaseError, ModelNotFoundError, ServiceUnavailableError,
+    QueryBudgetExceededError,
+    UserNotFoundError, UserAlreadyExistsError, InvalidCredentialsError, InvalidUserDataError,
+    CommentNotFoundError, OwnershipCommentError,
+    HistoryNotFoundError, OwnershipHistoryError,
+    LikeNotFoundError, OwnershipLikeError,
+    MessageNotFoundError, OwnershipMessageError, RoomAccessError,
+    InvalidAvatarError, AvatarTooLargeError, AvatarNotFoundError,
+    MetricsAuthError,
+)
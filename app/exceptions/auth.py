@@ -0,0 +1,8 @@
+from fastapi import HTTPException, status
+
+class MetricsAuthError(HTTPException):
+    """Исключение для запроса метрик без верного токена (settings.metrics_token)"""
+    def __init__(self, detail: str = "Требуется токен доступа к метрикам"):
+        super().__init__(status_code=status.HTTP_401_UNAUTHORIZED,
+                         detail=detail,
+                         headers={"WWW-Authenticate": "Bearer"})
@@ -0,0 +1,16 @@
+from fastapi import HTTPException, status
+
+class InvalidAvatarError(HTTPException):
+    """Исключение для случая, когда аватар не является поддерживаемым изображением"""
+    def __init__(self, detail: str = "Неверный формат аватара"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+class AvatarTooLargeError(HTTPException):
+    """Исключение для случая, когда аватар превышает допустимый размер"""
+    def __init__(self, detail: str = "Аватар слишком большой"):
+        super().__init__(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+class AvatarNotFoundError(HTTPException):
+    """Исключение для случая, когда аватар не найден"""
+    def __init__(self, detail: str = "Аватар не найден"):
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
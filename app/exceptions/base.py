@@ -24,3 +24,15 @@ class ModelNotFoundError(HTTPException):
     """Общее исключение для случая, когда объект модели не найден"""
     def __init__(self, detail: str = "Объект не найден"):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+class ServiceUnavailableError(HTTPException):
+    """Исключение для случая, когда сервис временно перегружен"""
+    def __init__(self, detail: str = "Сервис временно перегружен, попробуйте позже", retry_after: int = 1):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                         detail=detail,
+                         headers={"Retry-After": str(retry_after)})
+
+class QueryBudgetExceededError(HTTPException):
+    """Исключение для случая, когда обработчик выполнил больше SQL-запросов, чем допускает его бюджет"""
+    def __init__(self, detail: str = "Превышен бюджет SQL-запросов маршрута"):
+        super().__init__(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
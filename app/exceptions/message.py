@@ -9,3 +9,8 @@ class OwnershipMessageError(HTTPException):
     """Исключение для случая, когда пользователь не является автором сообщения"""
     def __init__(self, detail: str = "У вас нет прав на удаление этого сообщения"):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+class RoomAccessError(HTTPException):
+    """Исключение для случая, когда пользователь не является участником комнаты"""
+    def __init__(self, detail: str = "У вас нет доступа к этой комнате"):
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
@@ -1,19 +1,46 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.dependencies.auth import require_metrics_token
 from api.router import main_router
 
 from core.config import settings
+from core.logger import app_logger
+from core.password import password_executor
 from database.config import engine
 from database.init_db import init_db
-from core.error_middleware import ErrorHandlerMiddleware
+from database.managers.connection_manager import connection_manager
+from core.access_log import AccessLogMiddleware
+from core.metrics import metrics_registry
+from core.metrics_middleware import MetricsMiddleware
+from core.error_middleware import ErrorHandlerMiddleware, register_exception_handlers
+from services.avatar_thumbnails import thumbnail_executor
+from services.history_cache import history_cache
+from services.like_aggregator import like_aggregator
+from services.like_service import start_like_reconciliation
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await connection_manager.start()
+    if settings.like_buffer_enabled:
+        await like_aggregator.start()
+    reconciliation = start_like_reconciliation()
     yield
+    if reconciliation is not None:
+        reconciliation.cancel()
+        with suppress(asyncio.CancelledError):
+            await reconciliation
+    if like_aggregator.running:
+        await like_aggregator.stop()
+    await connection_manager.stop()
+    password_executor.shutdown()
+    thumbnail_executor.shutdown()
+    await history_cache.close()
     await engine.dispose()
 
 app = FastAPI(
@@ -28,12 +55,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.add_middleware(ErrorHandlerMiddleware)
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+app.add_middleware(AccessLogMiddleware)
+
+register_exception_handlers(app)
+
 app.include_router(router=main_router)
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "app": settings.app_name}
+
+if settings.metrics_enabled and settings.metrics_token:
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+    async def metrics():
+        """Метрики в текстовом формате Prometheus; доступ по Bearer-токену settings.metrics_token"""
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+elif settings.metrics_enabled:
+    app_logger.warning("metrics_token не задан: GET /metrics отключён, метрики только собираются")
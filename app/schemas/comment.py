@@ -1,6 +1,10 @@
-from pydantic import BaseModel
+from typing import List
+
+from pydantic import BaseModel, Field
 from datetime import datetime
 
+from schemas.author import AuthorOut
+
 
 class CommentBase(BaseModel):   
     """Схема для создания комментария"""
@@ -29,3 +33,17 @@ class CommentOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CommentThreadOut(CommentOut):
+    """Схема комментария в ленте истории с автором"""
+    author: AuthorOut = Field(validation_alias="user")
+
+
+class CommentPage(BaseModel):
+    """Страница комментариев истории от старых к новым:
+        - items - комментарии страницы
+        - next_cursor - курсор следующей страницы (None, если страница последняя)
+    """
+    items: List[CommentThreadOut]
+    next_cursor: str | None = None
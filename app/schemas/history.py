@@ -1,7 +1,10 @@
+from typing import List
+
 from pydantic import BaseModel
 from datetime import datetime
 
 from schemas.author import AuthorOut
+from schemas.comment import CommentPage
 
 
 class HistoryCreate(BaseModel):
@@ -11,7 +14,10 @@ class HistoryCreate(BaseModel):
 
 
 class HistoryOut(BaseModel):
-    """Схема для получения статьи"""
+    """Схема для получения статьи
+        - liked_by_me - лайкнул ли статью текущий пользователь (None, если не запрашивалось)
+        - comments_count, likes_count - число комментариев и лайков по таблицам (заполняются в ленте)
+    """
     id: int
     title: str
     description: str | None = None
@@ -19,11 +25,28 @@ class HistoryOut(BaseModel):
     author: AuthorOut | None
     created_at: datetime
     updated_at: datetime | None = None  
+    liked_by_me: bool | None = None
+    comments_count: int | None = None
+    likes_count: int | None = None
 
     class Config:
         from_attributes = True
 
 
+class HistoryDetailOut(HistoryOut):
+    """Схема статьи с первой страницей комментариев (None, если не запрашивалась)"""
+    comments: CommentPage | None = None
+
+
+class HistoryPage(BaseModel):
+    """Страница ленты историй:
+        - items - истории страницы
+        - next_cursor - курсор следующей страницы (None, если страница последняя)
+    """
+    items: List[HistoryOut]
+    next_cursor: str | None = None
+
+
 class HistoryOutShort(BaseModel):
     id: int
     title: str
@@ -36,6 +59,11 @@ class HistoryOutShort(BaseModel):
         from_attributes = True
 
 
+class HistoryExportOut(HistoryOutShort):
+    """Схема истории для экспорта"""
+    author_id: int
+
+
 class HistoryUpdate(BaseModel):
     """Схема для обновления статьи"""
     title: str | None = None
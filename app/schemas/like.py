@@ -31,3 +31,12 @@ class LikeOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class LikeStatusOut(BaseModel):
+    """Схема статуса лайка текущего пользователя:
+        - history_id - id истории
+        - liked - поставил ли пользователь лайк
+    """
+    history_id: int
+    liked: bool
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -13,6 +15,39 @@ class MessageOut(BaseModel):
         from_attributes = True
 
 
+class MessagePage(BaseModel):
+    """Страница сообщений комнаты в хронологическом порядке:
+        - items - сообщения
+        - before_cursor - курсор для загрузки более старых сообщений (None, если их нет)
+        - after_cursor - курсор для загрузки более новых сообщений
+    """
+    items: List[MessageOut]
+    before_cursor: str | None = None
+    after_cursor: str | None = None
+
+
+class RoomMessageOut(BaseModel):
+    """Схема сообщения, рассылаемого участникам комнаты по WebSocket"""
+    id: int
+    sender_id: int
+    receiver_id: int
+    room_id: str
+    text: str
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class MessageIn(BaseModel):
+    """Схема входящего сообщения WebSocket:
+        - text - текст сообщения
+        - receiver_id - id получателя (необязателен; если указан, должен совпадать с собеседником в комнате)
+    """
+    text: str
+    receiver_id: int | None = None
+
+
 class MessageUpdate(BaseModel):
     text: str
 
@@ -1,4 +1,5 @@
 from database.managers.user_manager import UserManager
+from database.models.user import User
 from schemas.user import UserAuth, UserCreate
 
 from core.jwt import create_access_token, create_refresh_token
@@ -9,14 +10,21 @@ from exceptions.users import InvalidCredentialsError
 
 user_manager = UserManager()
 
+def build_access_claims(user: User) -> dict:
+    """
+    Claims access токена: кроме sub содержат login и role,
+    чтобы при auth_trust_token_claims не обращаться к БД
+    """
+    return {"sub": str(user.id), "login": user.login, "role": user.role}
+
 async def register_user(new_user: UserCreate) -> tuple[str, str]:
     """
     Регистрирует нового пользователя и выдает токены
     """
     created_user = await user_manager.create_user(new_user)
-    access_token = create_access_token({"sub": str(created_user.id)})
+    access_token = create_access_token(build_access_claims(created_user))
     refresh_token = create_refresh_token({"sub": str(created_user.id)})
-    app_logger.info(f"Пользователь {new_user.login} зарегистрирован")
+    app_logger.info("Пользователь %s зарегистрирован", new_user.login)
     return access_token, refresh_token
 
 async def login_user(user: UserAuth) -> tuple[str, str]:
@@ -26,7 +34,14 @@ async def login_user(user: UserAuth) -> tuple[str, str]:
     user = await user_manager.check_user_data(user)
     if not user:
         raise InvalidCredentialsError()
-    access_token = create_access_token({"sub": str(user.id)})
+    access_token = create_access_token(build_access_claims(user))
     refresh_token = create_refresh_token({"sub": str(user.id)})
-    app_logger.info(f"Пользователь {user.login} авторизован")
+    app_logger.info("Пользователь %s авторизован", user.login)
     return access_token, refresh_token
+
+async def issue_access_token(user_id: int) -> str:
+    """
+    Выдает новый access токен пользователю по id из refresh токена
+    """
+    user = await user_manager.get_principal(user_id)
+    return create_access_token(build_access_claims(user))
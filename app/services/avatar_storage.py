@@ -0,0 +1,222 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from pathlib import Path
+
+from core.config import settings
+from core.logger import app_logger
+
+from exceptions.avatar import InvalidAvatarError, AvatarTooLargeError
+from exceptions.base import ServiceUnavailableError
+from services.avatar_thumbnails import render_thumbnail, thumbnails_available
+
+# Сигнатуры поддерживаемых форматов: расширение -> (media type, проверка первых байт)
+IMAGE_FORMATS = {
+    "png": ("image/png", lambda head: head.startswith(b"\x89PNG\r\n\x1a\n")),
+    "jpg": ("image/jpeg", lambda head: head.startswith(b"\xff\xd8\xff")),
+    "gif": ("image/gif", lambda head: head[:6] in (b"GIF87a", b"GIF89a")),
+    "webp": ("image/webp", lambda head: head[:4] == b"RIFF" and head[8:12] == b"WEBP"),
+}
+
+# Уменьшенные копии аватара хранятся в WebP
+THUMBNAIL_EXT = "webp"
+
+# Ключ аватара: sha256 содержимого и расширение
+AVATAR_KEY_RE = re.compile(r"^[0-9a-f]{64}\.(png|jpg|gif|webp)$")
+
+_DATA_URL_RE = re.compile(r"^data:[\w/+.-]*;base64,", re.IGNORECASE)
+
+
+def decode_avatar(encoded: str, max_bytes: int | None = settings.avatar_max_bytes) -> tuple[bytes, str]:
+    """
+    Декодирует base64 (или data URL) и проверяет, что это изображение поддерживаемого формата.
+    Возвращает содержимое и расширение
+        - max_bytes - предел размера загружаемого аватара; None - без проверки (перенос уже сохранённых)
+    """
+    encoded = _DATA_URL_RE.sub("", encoded.strip(), count=1)
+    # base64 раздувает данные на треть: отсекаем заведомо большие строки до декодирования
+    if max_bytes is not None and len(encoded) > (max_bytes * 4) // 3 + 4:
+        raise AvatarTooLargeError()
+    try:
+        data = base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidAvatarError("Аватар должен быть строкой base64")
+    if max_bytes is not None and len(data) > max_bytes:
+        raise AvatarTooLargeError()
+    head = data[:16]
+    for ext, (_, matches) in IMAGE_FORMATS.items():
+        if matches(head):
+            return data, ext
+    raise InvalidAvatarError("Поддерживаются аватары PNG, JPEG, GIF и WebP")
+
+
+def media_type_for(key: str) -> str:
+    return IMAGE_FORMATS[key.rsplit(".", 1)[1]][0]
+
+
+def avatar_url_for(key: str) -> str:
+    """Короткий URL аватара, который хранится в users.avatar_url"""
+    return f"{settings.avatar_url_prefix}/{key}"
+
+
+def sized_avatar_url(avatar_url: str | None, size: int) -> str | None:
+    """URL уменьшенной копии для аватара из хранилища; внешние ссылки возвращаются как есть"""
+    if not avatar_url or not avatar_url.startswith(settings.avatar_url_prefix + "/"):
+        return avatar_url
+    return f"{avatar_url}?size={size}"
+
+
+def is_avatar_url(value: str | None) -> bool:
+    """Проверяет, что значение уже является URL аватара из хранилища или внешней ссылкой"""
+    if not value:
+        return True
+    return value.startswith((settings.avatar_url_prefix + "/", "http://", "https://"))
+
+
+class AvatarStorage(ABC):
+    """Хранилище аватаров с адресацией по хэшу содержимого"""
+
+    @abstractmethod
+    async def save(self, data: bytes, ext: str) -> str:
+        """Сохраняет аватар и возвращает его ключ; повторная загрузка того же файла ничего не пишет"""
+
+    @abstractmethod
+    def path(self, key: str) -> Path | None:
+        """Путь к файлу аватара или None, если его нет"""
+
+    @abstractmethod
+    async def save_variant(self, key: str, size: int, data: bytes) -> None:
+        """Сохраняет уменьшенную копию аватара"""
+
+    @abstractmethod
+    def variant_path(self, key: str, size: int) -> Path | None:
+        """Путь к уменьшенной копии аватара или None, если её ещё нет"""
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """Аватары на локальном диске: <root>/<первые 2 символа хэша>/<ключ>"""
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    async def save(self, data: bytes, ext: str) -> str:
+        key = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+        await asyncio.to_thread(self._write, self._path(key), data)
+        return key
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Запись во временный файл и атомарное переименование: читатели не увидят недописанный файл
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    def path(self, key: str) -> Path | None:
+        if not AVATAR_KEY_RE.match(key):
+            return None
+        path = self._path(key)
+        return path if path.is_file() else None
+
+    def _variant_path(self, key: str, size: int) -> Path:
+        return self.root / key[:2] / f"{key.split('.', 1)[0]}.{size}.{THUMBNAIL_EXT}"
+
+    async def save_variant(self, key: str, size: int, data: bytes) -> None:
+        await asyncio.to_thread(self._write, self._variant_path(key, size), data)
+
+    def variant_path(self, key: str, size: int) -> Path | None:
+        if not AVATAR_KEY_RE.match(key):
+            return None
+        path = self._variant_path(key, size)
+        return path if path.is_file() else None
+
+
+def create_avatar_storage() -> AvatarStorage:
+    """Создаёт хранилище согласно settings.avatar_storage_backend"""
+    if settings.avatar_storage_backend == "local":
+        app_logger.info("Хранилище аватаров: %s", Path(settings.avatar_storage_dir).resolve())
+        return LocalAvatarStorage(settings.avatar_storage_dir)
+    raise ValueError(f"Неизвестное хранилище аватаров: {settings.avatar_storage_backend}")
+
+
+avatar_storage: AvatarStorage = create_avatar_storage()
+
+
+# Ссылки на фоновые задачи, чтобы их не собрал сборщик мусора
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _build_variant(key: str, size: int, data: bytes) -> Path | None:
+    try:
+        thumbnail = await render_thumbnail(data, size)
+    except ServiceUnavailableError:
+        raise
+    except Exception as e:
+        app_logger.warning("Не удалось построить копию %spx аватара %s: %r", size, key, e)
+        return None
+    await avatar_storage.save_variant(key, size, thumbnail)
+    return avatar_storage.variant_path(key, size)
+
+
+async def _build_variants(key: str, data: bytes) -> None:
+    for size in settings.avatar_thumbnail_sizes:
+        try:
+            await _build_variant(key, size, data)
+        except ServiceUnavailableError:
+            app_logger.warning("Пул уменьшенных копий занят, аватар %s будет обработан при первом запросе", key)
+            return
+
+
+def schedule_thumbnails(key: str, data: bytes) -> None:
+    """Запускает построение всех уменьшенных копий в фоне"""
+    if not thumbnails_available():
+        return
+    task = asyncio.create_task(_build_variants(key, data))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def get_avatar_path(key: str, size: int | None = None) -> Path | None:
+    """
+    Путь к аватару или к его уменьшенной копии. Недостающая копия строится и кэшируется на диске;
+    без Pillow или при ошибке обработки отдаётся оригинал
+    """
+    path = avatar_storage.path(key)
+    if path is None or size is None or not thumbnails_available():
+        return path
+    variant = avatar_storage.variant_path(key, size)
+    if variant is not None:
+        return variant
+    data = await asyncio.to_thread(path.read_bytes)
+    try:
+        return await _build_variant(key, size, data) or path
+    except ServiceUnavailableError:
+        return path
+
+
+async def store_avatar(encoded: str) -> str:
+    """
+    Декодирует, проверяет и сохраняет аватар, возвращает короткий URL.
+    Уменьшенные копии строятся в фоне
+    """
+    data, ext = decode_avatar(encoded)
+    key = await avatar_storage.save(data, ext)
+    schedule_thumbnails(key, data)
+    return avatar_url_for(key)
@@ -0,0 +1,35 @@
+import io
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow не установлен: уменьшенные копии не строятся, отдаётся оригинал
+    Image = ImageOps = None
+
+from core.config import settings
+from core.executor import BoundedExecutor
+
+thumbnail_executor = BoundedExecutor(
+    name="avatar-thumbnails",
+    max_workers=settings.avatar_thumbnail_max_workers,
+    max_pending=settings.avatar_thumbnail_max_pending,
+)
+
+
+def thumbnails_available() -> bool:
+    return Image is not None
+
+
+def _render(data: bytes, size: int) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+        # Квадрат с обрезкой по центру: аватары показываются в круге/квадрате
+        image = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="WEBP", quality=settings.avatar_thumbnail_quality, method=4)
+        return output.getvalue()
+
+
+async def render_thumbnail(data: bytes, size: int) -> bytes:
+    """Строит квадратную WebP-копию аватара в пуле потоков, не блокируя цикл событий"""
+    return await thumbnail_executor.run(_render, data, size)
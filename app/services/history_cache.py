@@ -0,0 +1,56 @@
+from typing import Awaitable, Callable, Optional
+
+from core.config import settings
+from core.metrics import metrics_registry
+from core.response_cache import ResponseCache, create_response_cache_backend
+
+FEED_GENERATION = "history_feed"
+
+history_cache = ResponseCache(create_response_cache_backend(), settings.response_cache_ttl_seconds)
+
+
+@metrics_registry.collector("history_cache_requests_total", "Обращения к кэшу историй", "counter")
+def _collect_cache_stats():
+    yield {"result": "hit"}, history_cache.hits
+    yield {"result": "miss"}, history_cache.misses
+
+
+def _detail_keys(history_id: int) -> tuple[str, str]:
+    return f"history:{history_id}:0", f"history:{history_id}:1"
+
+
+async def get_feed_page(limit: int, cursor: Optional[str], loader: Callable[[], Awaitable[bytes]]) -> bytes:
+    """
+    Сериализованная страница ленты. Ключ включает поколение ленты: после записи в истории
+    страницы прошлых поколений больше не читаются, даже если их загрузка ещё шла
+    """
+    generation = await history_cache.generation(FEED_GENERATION)
+    if generation is None:
+        return await loader()
+    return await history_cache.get_or_load(
+        f"feed:{generation}:{limit}:{cursor or ''}",
+        loader,
+        ttl=settings.history_feed_cache_ttl_seconds,
+    )
+
+
+async def get_history_detail(history_id: int,
+                             with_comments: bool,
+                             version: str,
+                             loader: Callable[[], Awaitable[bytes]]) -> bytes:
+    """
+    Сериализованная история. Запись хранится вместе с версией (ETag): лайк или новый комментарий
+    меняют версию, и устаревшее тело не отдаётся без явного сброса
+    """
+    return await history_cache.get_or_load(
+        _detail_keys(history_id)[with_comments],
+        loader,
+        version=version,
+    )
+
+
+async def invalidate_history(history_id: Optional[int] = None) -> None:
+    """Сбрасывает кэш истории и все страницы ленты; вызывается после создания, изменения и удаления"""
+    if history_id is not None:
+        await history_cache.invalidate(*_detail_keys(history_id))
+    await history_cache.bump_generation(FEED_GENERATION)
@@ -0,0 +1,186 @@
+import asyncio
+import math
+from collections import Counter
+from contextlib import suppress
+
+from sqlalchemy import select, update, delete, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database.managers.session_manager import manager
+from database.models.history import History
+from database.models.history_like import HistoryLike
+
+from core.config import settings
+from core.logger import app_logger
+
+from exceptions.base import DatabaseError, ServiceUnavailableError
+
+# Реализации INSERT ... ON CONFLICT DO NOTHING для поддерживаемых диалектов
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+class LikeAggregator:
+    """
+    Буфер отложенной записи лайков (write-behind).
+    События like/unlike копятся в памяти с дедупликацией по (user_id, history_id) - побеждает последнее.
+    Раз в flush_ms буфер записывается одной транзакцией: пакетный INSERT ... ON CONFLICT DO NOTHING
+    в history_likes, пакетный DELETE и по одному UPDATE счётчика на историю.
+        - wait_for_flush - вызывающий ждёт фиксации пачки (как при прямой записи, но с групповым коммитом);
+          иначе событие подтверждается сразу и при падении процесса теряется не более flush_ms событий
+        - max_pending - жёсткий предел буфера: при его достижении фоновая запись запускается досрочно,
+          а новые события отклоняются с ServiceUnavailableError (Retry-After), пока буфер не освободится.
+          Так при недоступной БД память не растёт, а запросы не ждут повторных попыток записи
+    """
+
+    def __init__(self,
+                 flush_ms: int = settings.like_buffer_flush_ms,
+                 max_pending: int = settings.like_buffer_max_pending,
+                 wait_for_flush: bool = settings.like_buffer_wait_for_flush) -> None:
+        self.flush_interval = flush_ms / 1000
+        self.max_pending = max_pending
+        self.wait_for_flush = wait_for_flush
+        self._pending: dict[tuple[int, int], bool] = {}
+        self._waiters: list[asyncio.Future] = []
+        self._lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = True
+
+    @property
+    def running(self) -> bool:
+        return not self._closed
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._run())
+            app_logger.info("Буфер лайков запущен, интервал записи %.0f мс", self.flush_interval * 1000)
+
+    async def stop(self) -> None:
+        """Останавливает фоновую запись и сбрасывает оставшиеся события в БД"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+        app_logger.info("Буфер лайков остановлен")
+
+    async def like(self, user_id: int, history_id: int) -> None:
+        await self._submit(user_id, history_id, True)
+
+    async def unlike(self, user_id: int, history_id: int) -> None:
+        await self._submit(user_id, history_id, False)
+
+    async def _submit(self, user_id: int, history_id: int, liked: bool) -> None:
+        if self._closed:
+            raise ServiceUnavailableError("Буфер лайков остановлен")
+        key = (user_id, history_id)
+        if key not in self._pending and len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+            raise ServiceUnavailableError("Буфер лайков переполнен, попробуйте позже",
+                                          retry_after=max(math.ceil(self.flush_interval), 1))
+        self._pending[key] = liked
+        waiter = None
+        if self.wait_for_flush:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        if len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+        if waiter is not None:
+            await waiter
+
+    async def _run(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                app_logger.error("Ошибка фоновой записи лайков: %r", e)
+                # При недоступной БД досрочная запись не повторяется чаще интервала
+                await asyncio.sleep(self.flush_interval)
+
+    async def flush(self) -> None:
+        """Записывает накопленные события одной транзакцией"""
+        async with self._lock:
+            if not self._pending and not self._waiters:
+                return
+            batch, self._pending = self._pending, {}
+            waiters, self._waiters = self._waiters, []
+            try:
+                if batch:
+                    await self._write(batch)
+            except Exception as e:
+                app_logger.exception("Не удалось записать пачку из %s событий лайков", len(batch))
+                if waiters:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(DatabaseError("Ошибка при сохранении лайка"))
+                else:
+                    # Подтверждённые события не теряем: возвращаем их в буфер, более новые события важнее.
+                    # Буфер может ненадолго превысить max_pending, но новые события до записи не принимаются
+                    for key, liked in batch.items():
+                        self._pending.setdefault(key, liked)
+                raise
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def _write(self, batch: dict[tuple[int, int], bool]) -> None:
+        async with manager.get_async_session() as session:
+            try:
+                insert = _INSERTS.get(session.bind.dialect.name)
+                if insert is None:
+                    raise DatabaseError(f"Буфер лайков не поддерживает диалект {session.bind.dialect.name}")
+
+                history_ids = {history_id for _, history_id in batch}
+                result = await session.execute(select(History.id).where(History.id.in_(history_ids)))
+                existing = set(result.scalars().all())
+                likes = [key for key, liked in batch.items() if liked and key[1] in existing]
+                unlikes = [key for key, liked in batch.items() if not liked and key[1] in existing]
+
+                delta: Counter[int] = Counter()
+                if likes:
+                    result = await session.execute(
+                        insert(HistoryLike)
+                        .values([{"user_id": user_id, "history_id": history_id} for user_id, history_id in likes])
+                        .on_conflict_do_nothing(index_elements=["user_id", "history_id"])
+                        .returning(HistoryLike.history_id)
+                    )
+                    delta.update(result.scalars().all())
+                if unlikes:
+                    result = await session.execute(
+                        delete(HistoryLike)
+                        .where(tuple_(HistoryLike.user_id, HistoryLike.history_id).in_(unlikes))
+                        .returning(HistoryLike.history_id)
+                    )
+                    delta.subtract(result.scalars().all())
+
+                for history_id, change in sorted(delta.items()):
+                    if change:
+                        await session.execute(
+                            update(History)
+                            .where(History.id == history_id)
+                            .values(likes=History.likes + change, updated_at=History.updated_at)
+                        )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+        skipped = len(batch) - len(likes) - len(unlikes)
+        app_logger.debug(
+            "Записана пачка лайков: +%d -%d, историй %d, пропущено (нет истории) %d",
+            len(likes), len(unlikes), len(delta), skipped,
+        )
+
+
+like_aggregator = LikeAggregator()
@@ -0,0 +1,40 @@
+import asyncio
+
+from database.managers.like_manager import LikeManager
+
+from core.config import settings
+from core.logger import app_logger
+
+
+like_manager = LikeManager()
+
+async def reconcile_like_counts() -> dict[int, tuple[int, int]]:
+    """
+    Сверяет History.likes с таблицей history_likes и исправляет расхождения
+    """
+    drift = await like_manager.reconcile_counts()
+    if drift:
+        details = ", ".join(f"{history_id}: {stored} -> {counted}" for history_id, (stored, counted) in drift.items())
+        app_logger.warning("Исправлены счётчики лайков для %s историй (%s)", len(drift), details)
+    else:
+        app_logger.info("Счётчики лайков согласованы")
+    return drift
+
+async def run_like_reconciliation(interval: float) -> None:
+    """
+    Фоновая задача: периодически пересчитывает счётчики лайков
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile_like_counts()
+        except Exception as e:
+            app_logger.error("Ошибка фоновой сверки счётчиков лайков: %s", e)
+
+def start_like_reconciliation() -> asyncio.Task | None:
+    """
+    Запускает фоновую сверку, если like_reconcile_interval_seconds > 0
+    """
+    if settings.like_reconcile_interval_seconds <= 0:
+        return None
+    return asyncio.create_task(run_like_reconciliation(settings.like_reconcile_interval_seconds))
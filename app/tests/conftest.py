@@ -0,0 +1,63 @@
+"""
+Общие настройки тестов. Запуск из каталога app: python -m pytest tests
+Окружение задаётся до импорта модулей приложения: настройки, движок БД и логгеры создаются при импорте
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+_TMP_DIR = tempfile.mkdtemp(prefix="syrup-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_TMP_DIR}/test.db")
+os.environ.setdefault("LOG_DIR", os.path.join(_TMP_DIR, "logs"))
+os.environ.setdefault("LOG_HANDLERS", '["file"]')
+os.environ.setdefault("AVATAR_STORAGE_DIR", os.path.join(_TMP_DIR, "avatars"))
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("METRICS_TOKEN", "test-metrics-token")
+
+from tests.fake_redis import FakeRedisServer  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def fake_redis():
+    """Локальный fake-сервер Redis на свободном порту; отдаёт его URL"""
+    server = FakeRedisServer()
+    await server.start()
+    try:
+        yield server
+    finally:
+        await server.stop()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient приложения с запущенным lifespan; одна БД на всю сессию тестов"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def login_as(client):
+    """Регистрирует (или авторизует) пользователя и ставит его cookies клиенту; возвращает id пользователя"""
+    def login(name: str, password: str = "password") -> int:
+        client.cookies.clear()
+        credentials = {"login": name, "password": password}
+        response = client.post("/auth/register", json=credentials)
+        if response.status_code != 200:
+            response = client.post("/auth/login", json=credentials)
+        assert response.status_code == 200, response.text
+        return client.get("/user/me").json()["id"]
+    return login
@@ -0,0 +1,131 @@
+import asyncio
+from collections import defaultdict
+from typing import Optional
+
+
+def _bulk(data: bytes) -> bytes:
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _push(kind: bytes, channel: bytes, payload: bytes) -> bytes:
+    return b"*3\r\n" + _bulk(kind) + _bulk(channel) + payload
+
+
+class FakeRedisServer:
+    """
+    Локальный fake-сервер Redis для тестов (протокол RESP2) поверх asyncio streams.
+    Поддерживает команды, которыми пользуется приложение:
+        - SUBSCRIBE, UNSUBSCRIBE, PUBLISH - рассылка комнат чата (core.broadcast)
+        - GET, SET (с PX), DEL, INCR - кэш ответов (core.response_cache)
+    Остальные команды (AUTH, SELECT, ...) отвечают +OK. commands - счётчик полученных команд
+    """
+
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        self.host = host
+        self.port = 0
+        self.commands: dict[str, int] = defaultdict(int)
+        self._data: dict[bytes, tuple[bytes, Optional[float]]] = {}
+        self._channels: dict[bytes, set[asyncio.StreamWriter]] = defaultdict(set)
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self.drop_connections()
+            await self._server.wait_closed()
+            self._server = None
+
+    def drop_connections(self) -> None:
+        """Обрывает все клиентские соединения (имитация перезапуска Redis)"""
+        for writer in list(self._clients):
+            writer.close()
+
+    def subscribers(self, channel: str) -> int:
+        return len(self._channels.get(channel.encode("utf-8"), ()))
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Optional[list[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= asyncio.get_running_loop().time():
+            del self._data[key]
+            return None
+        return value
+
+    def _execute(self, writer: asyncio.StreamWriter, subscribed: set[bytes], args: list[bytes]) -> bytes:
+        command, args = args[0].upper(), args[1:]
+        self.commands[command.decode("ascii")] += 1
+        if command == b"SUBSCRIBE":
+            reply = b""
+            for channel in args:
+                self._channels[channel].add(writer)
+                subscribed.add(channel)
+                reply += _push(b"subscribe", channel, b":%d\r\n" % len(subscribed))
+            return reply
+        if command == b"UNSUBSCRIBE":
+            reply = b""
+            for channel in args:
+                self._channels[channel].discard(writer)
+                subscribed.discard(channel)
+                reply += _push(b"unsubscribe", channel, b":%d\r\n" % len(subscribed))
+            return reply
+        if command == b"PUBLISH":
+            channel, message = args
+            receivers = list(self._channels.get(channel, ()))
+            for receiver in receivers:
+                receiver.write(_push(b"message", channel, _bulk(message)))
+            return b":%d\r\n" % len(receivers)
+        if command == b"GET":
+            value = self._get(args[0])
+            return b"$-1\r\n" if value is None else _bulk(value)
+        if command == b"SET":
+            expires_at = None
+            if len(args) >= 4 and args[2].upper() == b"PX":
+                expires_at = asyncio.get_running_loop().time() + int(args[3]) / 1000
+            self._data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            return b":%d\r\n" % sum(self._data.pop(key, None) is not None for key in args)
+        if command == b"INCR":
+            value = int(self._get(args[0]) or 0) + 1
+            self._data[args[0]] = (str(value).encode("ascii"), None)
+            return b":%d\r\n" % value
+        return b"+OK\r\n"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        subscribed: set[bytes] = set()
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                writer.write(self._execute(writer, subscribed, args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self._channels[channel].discard(writer)
+            self._clients.discard(writer)
+            writer.close()
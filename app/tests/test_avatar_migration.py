@@ -0,0 +1,36 @@
+import base64
+
+from sqlalchemy import select, update
+
+from core.config import settings
+from database.managers.session_manager import manager
+from database.migrations.avatars_to_blob_store import migrate
+from database.models.user import User
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+async def _set_avatar(user_id: int, avatar_url: str) -> None:
+    async with manager.get_async_session() as session:
+        await session.execute(update(User).where(User.id == user_id).values(avatar_url=avatar_url))
+        await session.commit()
+
+
+async def _get_avatar(user_id: int) -> str | None:
+    async with manager.get_async_session() as session:
+        return (await session.execute(select(User.avatar_url).where(User.id == user_id))).scalar()
+
+
+def test_oversize_avatars_are_migrated_not_cleared(client, login_as):
+    oversize_id = login_as("avatar-oversize")
+    broken_id = login_as("avatar-broken")
+    oversize = PNG_HEADER + b"\0" * (settings.avatar_max_bytes + 1)
+    client.portal.call(_set_avatar, oversize_id, base64.b64encode(oversize).decode())
+    client.portal.call(_set_avatar, broken_id, "not an image")
+
+    stats = client.portal.call(migrate, 100, True, False)
+
+    assert stats["migrated"] == stats["oversize"] == 1
+    assert stats["invalid"] == stats["cleared"] == 1
+    assert client.portal.call(_get_avatar, oversize_id).startswith(settings.avatar_url_prefix + "/")
+    assert client.portal.call(_get_avatar, broken_id) is None
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from core.broadcast import RedisBroadcastBackend
+
+pytestmark = pytest.mark.anyio
+
+PREFIX = "test:room:"
+
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("Условие не выполнено за отведённое время")
+        await asyncio.sleep(0.01)
+
+
+def _backend(url: str) -> tuple[RedisBroadcastBackend, list[tuple[str, str]]]:
+    received: list[tuple[str, str]] = []
+    backend = RedisBroadcastBackend(url, PREFIX, reconnect_delay=0.05)
+    backend.set_handler(lambda room_id, message: received.append((room_id, message)))
+    return backend, received
+
+
+@pytest.fixture
+async def backends(fake_redis):
+    first, first_received = _backend(fake_redis.url)
+    second, second_received = _backend(fake_redis.url)
+    await first.start()
+    await second.start()
+    await _wait_for(lambda: first._pubsub is not None and second._pubsub is not None)
+    try:
+        yield fake_redis, (first, first_received), (second, second_received)
+    finally:
+        await first.stop()
+        await second.stop()
+
+
+async def test_message_reaches_other_worker(backends):
+    server, (first, first_received), (second, second_received) = backends
+    await first.subscribe("r1")
+    await _wait_for(lambda: server.subscribers(PREFIX + "r1") == 1)
+
+    await second.publish("r1", '{"text":"hi"}')
+
+    await _wait_for(lambda: first_received)
+    assert first_received == [("r1", '{"text":"hi"}')]
+    assert second_received == []
+
+
+async def test_only_subscribed_rooms_are_delivered(backends):
+    server, (first, first_received), (second, second_received) = backends
+    await first.subscribe("r1")
+    await second.subscribe("r2")
+    await _wait_for(lambda: server.subscribers(PREFIX + "r1") == 1 and server.subscribers(PREFIX + "r2") == 1)
+
+    await first.publish("r2", "to-r2")
+    await second.publish("r1", "to-r1")
+
+    await _wait_for(lambda: first_received and second_received)
+    assert first_received == [("r1", "to-r1")]
+    assert second_received == [("r2", "to-r2")]
+
+
+async def test_unsubscribe_stops_delivery(backends):
+    server, (first, first_received), (second, _) = backends
+    await first.subscribe("r1")
+    await _wait_for(lambda: server.subscribers(PREFIX + "r1") == 1)
+    await first.unsubscribe("r1")
+    await _wait_for(lambda: server.subscribers(PREFIX + "r1") == 0)
+
+    await second.publish("r1", "late")
+    await asyncio.sleep(0.05)
+    assert first_received == []
+
+
+async def test_subscriptions_restored_after_reconnect(backends):
+    server, (first, first_received), (second, _) = backends
+    await first.subscribe("r1")
+    await _wait_for(lambda: server.subscribers(PREFIX + "r1") == 1)
+
+    server.drop_connections()
+    await _wait_for(lambda: server.subscribers(PREFIX + "r1") == 0)
+    await _wait_for(lambda: server.subscribers(PREFIX + "r1") == 1)
+
+    # Соединение публикации обрывается вместе с сервером: первая публикация падает, следующая переподключается
+    with pytest.raises(ConnectionError):
+        await second.publish("r1", "lost")
+    await second.publish("r1", "after-restart")
+    await _wait_for(lambda: first_received)
+    assert first_received == [("r1", "after-restart")]
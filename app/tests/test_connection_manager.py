@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import pytest
+
+from core.broadcast import MemoryBroadcastBackend
+from core.config import settings
+from database.managers.connection_manager import WS_REPLACED, ConnectionManager
+
+pytestmark = pytest.mark.anyio
+
+ROOM = "room"
+
+
+class StubWebSocket:
+    """WebSocket, у которого send_text ждёт release (медленный клиент) или падает (оборванный сокет)"""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+        self.release = asyncio.Event()
+        self.fail = fail
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        if self.fail:
+            raise RuntimeError("Cannot call send once a close message has been sent")
+        await self.release.wait()
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+def _message(number: int) -> str:
+    return json.dumps({"i": number})
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    monkeypatch.setattr(settings, "ws_send_queue_size", 3)
+    monkeypatch.setattr(settings, "ws_send_timeout_seconds", 5.0)
+
+    def make(policy: str) -> ConnectionManager:
+        monkeypatch.setattr(settings, "ws_send_queue_policy", policy)
+        return ConnectionManager(MemoryBroadcastBackend())
+    return make
+
+
+async def _overflow(manager: ConnectionManager, websocket: StubWebSocket) -> None:
+    """Первое сообщение застревает в send_text, следующие четыре переполняют очередь из трёх"""
+    await manager.connect(ROOM, "1", websocket)
+    await manager.send_to_room(ROOM, _message(0))
+    await asyncio.sleep(0)
+    for number in range(1, 5):
+        await manager.send_to_room(ROOM, _message(number))
+
+
+async def test_drop_oldest_discards_oldest_message(hub):
+    manager, websocket = hub("drop_oldest"), StubWebSocket()
+    await _overflow(manager, websocket)
+
+    assert manager.metrics.dropped == 1
+    websocket.release.set()
+    await asyncio.sleep(0.01)
+    assert websocket.sent == [_message(number) for number in (0, 2, 3, 4)]
+
+
+async def test_coalesce_sends_bounded_array_frame(hub):
+    manager, websocket = hub("coalesce"), StubWebSocket()
+    await _overflow(manager, websocket)
+
+    websocket.release.set()
+    await asyncio.sleep(0.01)
+    assert websocket.sent[0] == _message(0)
+    # Пакет - JSON-массив не более чем из ws_send_queue_size последних сообщений
+    assert json.loads(websocket.sent[1]) == [{"i": 2}, {"i": 3}, {"i": 4}]
+    assert manager.metrics.dropped == 1
+    assert manager.metrics.coalesced == 3
+
+
+async def test_disconnect_policy_evicts_with_1013(hub):
+    manager, websocket = hub("disconnect"), StubWebSocket()
+    await _overflow(manager, websocket)
+    await asyncio.sleep(0.01)
+
+    assert manager.metrics.evicted == 1
+    assert websocket.closed_with == 1013
+    assert ROOM not in manager.active_connections
+
+
+async def test_send_timeout_evicts_with_1013(hub, monkeypatch):
+    manager, websocket = hub("drop_oldest"), StubWebSocket()
+    monkeypatch.setattr(settings, "ws_send_timeout_seconds", 0.01)
+    await manager.connect(ROOM, "1", websocket)
+    await manager.send_to_room(ROOM, _message(0))
+    await asyncio.sleep(0.05)
+
+    assert manager.metrics.evicted == 1
+    assert websocket.closed_with == 1013
+    assert ROOM not in manager.active_connections
+
+
+async def test_broken_socket_is_removed(hub):
+    manager, websocket = hub("drop_oldest"), StubWebSocket(fail=True)
+    await manager.connect(ROOM, "1", websocket)
+    await manager.send_to_room(ROOM, _message(0))
+    await asyncio.sleep(0.01)
+
+    assert ROOM not in manager.active_connections
+    assert manager.metrics.evicted == 0
+
+
+async def test_reconnect_closes_previous_socket(hub):
+    manager = hub("drop_oldest")
+    first, second = StubWebSocket(), StubWebSocket()
+    await manager.connect(ROOM, "1", first)
+    await manager.connect(ROOM, "1", second)
+
+    assert first.closed_with == WS_REPLACED
+    assert manager.active_connections[ROOM]["1"].websocket is second
+    await manager.disconnect("1", ROOM, first)
+    assert manager.active_connections[ROOM]["1"].websocket is second
@@ -0,0 +1,43 @@
+from services.history_cache import FEED_GENERATION, _detail_keys, history_cache
+
+
+def _cached(client, key: str):
+    return client.portal.call(history_cache.backend.get, key)
+
+
+def _generation(client) -> int:
+    return client.portal.call(history_cache.generation, FEED_GENERATION)
+
+
+def test_create_history_invalidates_feed(client, login_as):
+    login_as("cache-author")
+    first_id = client.post("/history/", json={"title": "Первая"}).json()["id"]
+    feed = client.get("/history/?limit=5").json()
+    assert feed["items"][0]["id"] == first_id
+
+    generation = _generation(client)
+    second_id = client.post("/history/", json={"title": "Вторая"}).json()["id"]
+
+    assert _generation(client) == generation + 1
+    assert client.get("/history/?limit=5").json()["items"][0]["id"] == second_id
+
+
+def test_update_and_delete_invalidate_history(client, login_as):
+    login_as("cache-editor")
+    history_id = client.post("/history/", json={"title": "До"}).json()["id"]
+    client.get(f"/history/{history_id}")
+    key = _detail_keys(history_id)[False]
+    assert _cached(client, key) is not None
+
+    generation = _generation(client)
+    response = client.put(f"/history/{history_id}", json={"title": "После"})
+    assert response.status_code == 200, response.text
+    assert _cached(client, key) is None
+    assert _generation(client) == generation + 1
+    assert client.get(f"/history/{history_id}").json()["title"] == "После"
+
+    assert _cached(client, key) is not None
+    assert client.delete(f"/history/{history_id}").status_code in (200, 204)
+    assert _cached(client, key) is None
+    assert _generation(client) == generation + 2
+    assert client.get(f"/history/{history_id}").status_code == 404
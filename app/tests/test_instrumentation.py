@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from core.request_context import track_operation
+from database.config import engine
+from database.instrumentation import parameters_shape, statement_shape
+
+
+def test_statement_shape_normalizes_placeholders():
+    assert statement_shape("SELECT a FROM t WHERE id IN (?, ?, ?)\n  AND x = :x") == "SELECT a FROM t WHERE id IN (?, ...) AND x = ?"
+    assert statement_shape("SELECT a FROM t WHERE id = $1 AND y = %(name)s") == "SELECT a FROM t WHERE id = ? AND y = ?"
+
+
+def test_parameters_shape_hides_values():
+    assert parameters_shape((1, "secret"), False) == "(int, str)"
+    assert parameters_shape([(1, "a"), (2, "b")], True) == "[2 x (int, str)]"
+    assert parameters_shape({"password": "secret"}, False) == "{password: str}"
+
+
+async def _fail_then_query() -> tuple[int, dict]:
+    async with engine.connect() as conn:
+        with track_operation() as stats:
+            for _ in range(3):
+                with pytest.raises(DBAPIError):
+                    await conn.execute(text("SELECT * FROM missing_table"))
+            await conn.execute(text("SELECT 1"))
+        return stats.queries, dict(conn.sync_connection.info)
+
+
+def test_failed_statements_leave_no_state_on_connection(client):
+    queries, info = client.portal.call(_fail_then_query)
+
+    assert queries == 1
+    assert not any(isinstance(value, list) for value in info.values())
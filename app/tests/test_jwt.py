@@ -0,0 +1,40 @@
+import json
+import time
+
+import pytest
+from jose import JWTError
+
+from core.jwt import HS256Signer, JoseSigner, _b64encode
+
+SECRET = "test-secret"
+
+
+def _signed(signer: HS256Signer, header, payload) -> str:
+    header_segment = _b64encode(json.dumps(header).encode()).decode()
+    payload_segment = _b64encode(json.dumps(payload).encode()).decode()
+    signature = _b64encode(signer._sign(f"{header_segment}.{payload_segment}".encode())).decode()
+    return f"{header_segment}.{payload_segment}.{signature}"
+
+
+def test_native_signer_reads_jose_tokens():
+    token = JoseSigner(SECRET, "HS256").encode({"sub": "1", "exp": int(time.time()) + 60})
+    assert HS256Signer(SECRET).decode(token)["sub"] == "1"
+
+
+@pytest.mark.parametrize("header, payload", [
+    (["HS256"], {"sub": "1"}),
+    ("HS256", {"sub": "1"}),
+    ({"alg": "HS256"}, {"sub": "1", "exp": "tomorrow"}),
+    ({"alg": "HS256"}, {"sub": "1", "exp": True}),
+    ({"alg": "HS256"}, {"sub": "1", "exp": [1]}),
+])
+def test_malformed_claims_raise_jwt_error(header, payload):
+    signer = HS256Signer(SECRET)
+    with pytest.raises(JWTError):
+        signer.decode(_signed(signer, header, payload))
+
+
+@pytest.mark.parametrize("token", ["", "a.b", "ё.a.b", "a.b.c", "!!.??.**"])
+def test_malformed_token_raises_jwt_error(token):
+    with pytest.raises(JWTError):
+        HS256Signer(SECRET).decode(token)
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from exceptions.base import ServiceUnavailableError
+from services.like_aggregator import LikeAggregator
+
+pytestmark = pytest.mark.anyio
+
+
+class FlakyAggregator(LikeAggregator):
+    """Буфер, у которого запись в БД падает, пока failing=True; записанные пачки копятся в written"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.failing = True
+        self.attempts = 0
+        self.written: list[dict] = []
+
+    async def _write(self, batch):
+        self.attempts += 1
+        if self.failing:
+            raise ConnectionError("БД недоступна")
+        self.written.append(dict(batch))
+
+
+@pytest.fixture
+async def aggregator():
+    aggregator = FlakyAggregator(flush_ms=20, max_pending=3, wait_for_flush=False)
+    await aggregator.start()
+    try:
+        yield aggregator
+    finally:
+        aggregator.failing = False
+        await aggregator.stop()
+
+
+async def test_max_pending_is_a_hard_limit(aggregator):
+    for history_id in range(3):
+        await aggregator.like(1, history_id)
+
+    with pytest.raises(ServiceUnavailableError) as error:
+        await aggregator.like(1, 100)
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == "1"
+
+    # Изменение уже буферизованного события принимается: буфер не растёт
+    await aggregator.unlike(1, 0)
+    assert len(aggregator) <= aggregator.max_pending
+
+
+async def test_rejected_likes_do_not_flush_inline(aggregator):
+    for history_id in range(3):
+        await aggregator.like(1, history_id)
+    await asyncio.sleep(0.05)
+    attempts = aggregator.attempts
+
+    for _ in range(50):
+        with pytest.raises(ServiceUnavailableError):
+            await aggregator.like(2, 100)
+    assert aggregator.attempts - attempts <= 1
+    assert len(aggregator) == 3
+
+
+async def test_buffer_drains_after_recovery(aggregator):
+    for history_id in range(3):
+        await aggregator.like(1, history_id)
+    await asyncio.sleep(0.05)
+    aggregator.failing = False
+    await asyncio.sleep(0.1)
+
+    assert len(aggregator) == 0
+    assert {key for batch in aggregator.written for key in batch} == {(1, 0), (1, 1), (1, 2)}
+    await aggregator.like(1, 100)
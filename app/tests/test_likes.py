@@ -0,0 +1,72 @@
+import pytest
+
+
+def test_like_does_not_touch_updated_at(client, login_as):
+    login_as("like-author")
+    history_id = client.post("/history/", json={"title": "История"}).json()["id"]
+    before = client.get(f"/history/{history_id}").json()
+
+    login_as("like-reader")
+    assert client.put(f"/likes/history/{history_id}").status_code == 204
+    liked = client.get(f"/history/{history_id}").json()
+    assert client.delete(f"/likes/history/{history_id}").status_code == 204
+    unliked = client.get(f"/history/{history_id}").json()
+
+    assert liked["likes"] == before["likes"] + 1
+    assert unliked["likes"] == before["likes"]
+    assert liked["updated_at"] == unliked["updated_at"] == before["updated_at"]
+
+
+def test_reconcile_does_not_touch_updated_at(client, login_as):
+    from database.managers.like_manager import LikeManager
+
+    login_as("reconcile-author")
+    history_id = client.post("/history/", json={"title": "История"}).json()["id"]
+    client.put(f"/likes/history/{history_id}")
+    before = client.get(f"/history/{history_id}").json()
+
+    client.portal.call(_set_likes, history_id, 5)
+    drift = client.portal.call(LikeManager().reconcile_counts)
+    after = client.get(f"/history/{history_id}").json()
+
+    assert drift[history_id] == (5, 1)
+    assert after["likes"] == 1
+    assert after["updated_at"] == before["updated_at"]
+
+
+async def _set_likes(history_id: int, likes: int) -> None:
+    from sqlalchemy import update
+
+    from database.managers.session_manager import manager
+    from database.models.history import History
+
+    async with manager.get_async_session() as session:
+        await session.execute(
+            update(History).where(History.id == history_id).values(likes=likes, updated_at=History.updated_at)
+        )
+        await session.commit()
+
+
+def test_buffered_like_does_not_touch_updated_at(client, login_as):
+    from services.like_aggregator import LikeAggregator
+
+    user_id = login_as("buffer-author")
+    history_id = client.post("/history/", json={"title": "История"}).json()["id"]
+    before = client.get(f"/history/{history_id}").json()
+
+    client.portal.call(LikeAggregator()._write, {(user_id, history_id): True})
+    after = client.get(f"/history/{history_id}").json()
+
+    assert after["likes"] == before["likes"] + 1
+    assert after["updated_at"] == before["updated_at"]
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_like_missing_history_is_404(client, login_as, monkeypatch, buffered):
+    from core.config import settings
+
+    monkeypatch.setattr(settings, "like_buffer_enabled", buffered)
+    login_as("like-missing")
+
+    assert client.put("/likes/history/999999").status_code == 404
+    assert client.delete("/likes/history/999999").status_code == 404
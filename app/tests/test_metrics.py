@@ -0,0 +1,24 @@
+from core.config import settings
+
+
+def test_metrics_require_token(client):
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_metrics_do_not_expose_room_ids(client, login_as):
+    from database.managers.message_manager import direct_room_id
+
+    first_id = login_as("metrics-first")
+    second_id = login_as("metrics-second")
+    room_id = direct_room_id(first_id, second_id)
+
+    with client.websocket_connect(f"/ws/{room_id}?receiver_id={first_id}"):
+        response = client.get("/metrics", headers={"Authorization": f"Bearer {settings.metrics_token}"})
+
+    assert response.status_code == 200
+    assert room_id not in response.text
+    assert "ws_connections 1" in response.text
+    assert 'ws_rooms{le="1"} 1' in response.text
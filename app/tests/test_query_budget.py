@@ -0,0 +1,88 @@
+"""
+Все маршруты с @query_budget вызываются в строгом режиме на данных, где N+1 был бы заметен:
+несколько историй с комментариями и лайками, переписка из нескольких сообщений, промахи кэша ответов
+"""
+import json
+
+import pytest
+
+from core.config import settings
+from core.query_budget import query_budget
+from database.managers.message_manager import direct_room_id
+from database.managers.user_manager import UserManager
+from exceptions.base import QueryBudgetExceededError
+from main import app
+
+HISTORIES = 4
+
+
+def _budgeted_routes(routes=None) -> set[str]:
+    """Пути маршрутов с @query_budget; включённые роутеры обходятся рекурсивно"""
+    paths = set()
+    for route in app.routes if routes is None else routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            paths |= _budgeted_routes(included.routes)
+        elif getattr(getattr(route, "endpoint", None), "query_budget", None) is not None:
+            paths.add(route.path)
+    return paths
+
+
+@pytest.fixture
+def strict_budgets(monkeypatch):
+    monkeypatch.setattr(settings, "query_budget_strict", True)
+
+
+@pytest.fixture
+def seeded(client, login_as):
+    reader_id = login_as("budget-reader")
+    author_id = login_as("budget-author")
+    history_ids = []
+    for number in range(HISTORIES):
+        history_id = client.post("/history/", json={"title": f"История {number}"}).json()["id"]
+        history_ids.append(history_id)
+        for comment in range(3):
+            response = client.post("/comments/", json={"content": f"Комментарий {comment}", "history_id": history_id})
+            assert response.status_code == 201, response.text
+        assert client.put(f"/likes/history/{history_id}").status_code == 204
+
+    room_id = direct_room_id(author_id, reader_id)
+    with client.websocket_connect(f"/ws/{room_id}?receiver_id={reader_id}") as websocket:
+        for number in range(3):
+            websocket.send_text(json.dumps({"text": f"Сообщение {number}"}))
+            websocket.receive_text()
+    return {"author_id": author_id, "history_ids": history_ids, "room_id": room_id}
+
+
+def test_budgeted_routes_stay_within_budget(client, seeded, strict_budgets):
+    author_id, history_ids, room_id = seeded["author_id"], seeded["history_ids"], seeded["room_id"]
+    # Первые обращения к истории - промахи кэша: новые истории ещё не запрашивались
+    requests = [
+        ("/history/", "/history/?limit=10"),
+        ("/history/", "/history/?limit=10&with_liked=true"),
+        ("/history/{id}", f"/history/{history_ids[0]}"),
+        ("/history/{id}", f"/history/{history_ids[1]}?with_comments=true"),
+        ("/history/{id}/comments", f"/history/{history_ids[0]}/comments"),
+        ("/likes/status", "/likes/status?" + "&".join(f"history_ids={history_id}" for history_id in history_ids)),
+        ("/messages/chats", "/messages/chats"),
+        ("/messages/{room_id}", f"/messages/{room_id}"),
+        ("/user/histories/{id}", f"/user/histories/{author_id}"),
+        ("/user/me", "/user/me"),
+        ("/user/me/histories", "/user/me/histories"),
+    ]
+    for _, url in requests:
+        response = client.get(url)
+        assert response.status_code == 200, f"{url}: {response.text}"
+
+    assert {route for route, _ in requests} == _budgeted_routes()
+
+
+def test_exceeded_budget_fails_in_strict_mode(client, login_as, strict_budgets):
+    user_id = login_as("budget-exceeded")
+
+    @query_budget(lambda user_id: 0)
+    async def handler(user_id: int):
+        await UserManager().get_profile(user_id)
+
+    with pytest.raises(QueryBudgetExceededError):
+        client.portal.call(lambda: handler(user_id=user_id))
@@ -0,0 +1,36 @@
+import base64
+
+from core.config import settings
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 16
+
+
+def _register(client, login: str, avatar_url: str | None):
+    client.cookies.clear()
+    return client.post(
+        "/auth/register",
+        json={"login": login, "password": "password", "avatar_url": avatar_url},
+    )
+
+
+def test_register_stores_inline_avatar(client):
+    response = _register(client, "register-avatar", base64.b64encode(PNG).decode())
+
+    assert response.status_code == 200, response.text
+    avatar_url = client.get("/user/me").json()["avatar_url"]
+    assert avatar_url.startswith(settings.avatar_url_prefix + "/")
+    assert client.get(avatar_url).content == PNG
+
+
+def test_register_keeps_external_avatar_url(client):
+    response = _register(client, "register-external", "https://example.com/a.png")
+
+    assert response.status_code == 200, response.text
+    assert client.get("/user/me").json()["avatar_url"] == "https://example.com/a.png"
+
+
+def test_register_rejects_invalid_avatar(client):
+    response = _register(client, "register-invalid", base64.b64encode(b"not an image").decode())
+
+    assert response.status_code == 400
+    assert client.post("/auth/login", json={"login": "register-invalid", "password": "password"}).status_code != 200
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from core.response_cache import MemoryResponseCacheBackend, RedisResponseCacheBackend, ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def make_cache(request, fake_redis):
+    """Фабрика кэшей ответов; для redis все кэши одного теста делят fake-сервер, как процессы делят Redis"""
+    caches = []
+
+    def make() -> ResponseCache:
+        if request.param == "memory":
+            backend = MemoryResponseCacheBackend(max_size=100, ttl=60)
+        else:
+            backend = RedisResponseCacheBackend(fake_redis.url, "test:cache:")
+        cache = ResponseCache(backend, ttl=60)
+        caches.append(cache)
+        return cache
+
+    try:
+        yield make
+    finally:
+        for cache in caches:
+            await cache.close()
+
+
+class CountingLoader:
+    def __init__(self, value: bytes = b"body", delay: float = 0.02) -> None:
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> bytes:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+async def test_concurrent_misses_share_one_load(make_cache):
+    cache = make_cache()
+    loader = CountingLoader()
+
+    bodies = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(10)))
+
+    assert bodies == [b"body"] * 10
+    assert loader.calls == 1
+    assert await cache.get_or_load("k", loader) == b"body"
+    assert loader.calls == 1
+    assert cache.hits == 1
+
+
+async def test_failed_load_is_shared_and_not_cached(make_cache):
+    cache = make_cache()
+
+    async def failing() -> bytes:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("БД недоступна")
+
+    results = await asyncio.gather(*(cache.get_or_load("k", failing) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    loader = CountingLoader()
+    assert await cache.get_or_load("k", loader) == b"body"
+    assert loader.calls == 1
+
+
+async def test_other_version_is_a_miss(make_cache):
+    cache = make_cache()
+    await cache.get_or_load("k", CountingLoader(b"v1"), version='W/"1"')
+
+    loader = CountingLoader(b"v2")
+    assert await cache.get_or_load("k", loader, version='W/"2"') == b"v2"
+    assert await cache.get_or_load("k", loader, version='W/"2"') == b"v2"
+    assert loader.calls == 1
+
+
+async def test_invalidate_drops_key(make_cache):
+    cache = make_cache()
+    await cache.get_or_load("k", CountingLoader(b"old"))
+    await cache.invalidate("k")
+
+    assert await cache.get_or_load("k", CountingLoader(b"new")) == b"new"
+
+
+async def test_generation_bump(make_cache):
+    cache = make_cache()
+    assert await cache.generation("feed") == 0
+    await cache.bump_generation("feed")
+    await cache.bump_generation("feed")
+    assert await cache.generation("feed") == 2
+
+
+async def test_redis_invalidation_is_seen_by_other_workers(fake_redis):
+    first = ResponseCache(RedisResponseCacheBackend(fake_redis.url, "test:cache:"), ttl=60)
+    second = ResponseCache(RedisResponseCacheBackend(fake_redis.url, "test:cache:"), ttl=60)
+    try:
+        await first.get_or_load("k", CountingLoader(b"old"))
+        assert await second.get_or_load("k", CountingLoader(b"unused")) == b"old"
+
+        await second.invalidate("k")
+        await second.bump_generation("feed")
+
+        assert await first.get_or_load("k", CountingLoader(b"new")) == b"new"
+        assert await first.generation("feed") == 1
+    finally:
+        await first.close()
+        await second.close()
+
+
+async def test_redis_outage_falls_back_to_loader(fake_redis):
+    cache = ResponseCache(RedisResponseCacheBackend(fake_redis.url, "test:cache:"), ttl=60)
+    await fake_redis.stop()
+    try:
+        loader = CountingLoader()
+        assert await cache.get_or_load("k", loader) == b"body"
+        assert await cache.generation("feed") is None
+        assert loader.calls == 1
+    finally:
+        await cache.close()